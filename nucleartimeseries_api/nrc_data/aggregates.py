@@ -0,0 +1,92 @@
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import Coalesce
+from nrc_data.models import Reactor, ReactorStatus, FleetDailySummary
+from nrc_data.regions import region_for_unit
+
+REGIONS = [code for code, _ in Reactor.REGION_CHOICES]
+
+SUMMARY_FIELDS = ['unit_count', 'power_total', 'avg_power', 'units_at_zero', 'units_changed', 'scram_total']
+
+
+def _summary_rows(qs):
+    """Aggregate status rows per (report_date, region) in a single grouped query."""
+    return (
+        qs.filter(reactor__region__in=REGIONS)
+        .values('report_date', 'reactor__region')
+        .annotate(
+            unit_count=Count('id'),
+            power_total=Sum('power'),
+            avg_power=Avg('power'),
+            units_at_zero=Count('id', filter=Q(power=0)),
+            units_changed=Count('id', filter=Q(changed=True)),
+            scram_total=Coalesce(Sum('scrams'), 0),
+        )
+        .order_by('report_date', 'reactor__region')
+    )
+
+
+def _upsert(rows):
+    summaries = [
+        FleetDailySummary(
+            report_date=row['report_date'],
+            region=row['reactor__region'],
+            **{field: row[field] for field in SUMMARY_FIELDS},
+        )
+        for row in rows
+    ]
+    FleetDailySummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['report_date', 'region'],
+        update_fields=SUMMARY_FIELDS,
+    )
+    return len(summaries)
+
+
+def refresh_daily_summary(report_date):
+    """Recompute the regional aggregates for one date. Called by ingestion after each save."""
+    rows = list(_summary_rows(ReactorStatus.objects.filter(report_date=report_date)))
+    with transaction.atomic():
+        # Regions that no longer have any units on this date
+        FleetDailySummary.objects.filter(report_date=report_date).exclude(
+            region__in=[row['reactor__region'] for row in rows]
+        ).delete()
+        return _upsert(rows)
+
+
+def backfill_regions():
+    """
+    Set the region of reactors created before regions were recorded, which
+    the aggregates would otherwise leave out. Returns how many were updated.
+    """
+    reactors = list(Reactor.objects.filter(region=''))
+    for reactor in reactors:
+        reactor.region = region_for_unit(reactor.name)
+    Reactor.objects.bulk_update(reactors, ['region'])
+    return len(reactors)
+
+
+def rebuild_summaries(start=None, end=None, batch_size=5000):
+    """Backfill the aggregates for a date range (the full history by default)."""
+    backfill_regions()
+    qs = ReactorStatus.objects.all()
+    summaries = FleetDailySummary.objects.all()
+    if start:
+        qs = qs.filter(report_date__gte=start)
+        summaries = summaries.filter(report_date__gte=start)
+    if end:
+        qs = qs.filter(report_date__lte=end)
+        summaries = summaries.filter(report_date__lte=end)
+
+    written = 0
+    with transaction.atomic():
+        summaries.delete()
+        batch = []
+        for row in _summary_rows(qs).iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                written += _upsert(batch)
+                batch = []
+        written += _upsert(batch)
+    return written
@@ -0,0 +1,119 @@
+from django.http import HttpResponse
+from django.views import View
+from .cache import aget_entry, conditional_response, snapshot_key, detail_key
+from .models import Reactor, ReactorStatus
+from .renderers import ORJSONRenderer
+from .serializers import ReactorDetailSerializer, ReactorBatchSerializer, SnapshotSerializer, LatestStatusSerializer
+from .views import (
+    SERIES_RESOLUTIONS,
+    batch_queryset,
+    detail_queryset,
+    parse_batch_params,
+    parse_date_range,
+    parse_report_date,
+    series_payload,
+    series_queryset,
+    summary_payload,
+    summary_querysets,
+    validate_region,
+)
+
+# Async variants of the read endpoints in views.py for ASGI deployments.
+#
+# They run the same queries through Django's async ORM, so a request waiting
+# on the database doesn't hold a worker thread. DRF's APIView is sync-only,
+# so these are plain Django views rendering with the same orjson renderer.
+
+
+def json_response(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), content_type='application/json', status=status)
+
+
+def error_response(message, status=400):
+    return json_response({"error": message}, status=status)
+
+
+def not_found(model):
+    # Same body DRF produces for get_object_or_404 in the sync views
+    return json_response({"detail": f"No {model._meta.object_name} matches the given query."}, status=404)
+
+
+class AsyncReactorView(View):
+    async def get(self, request, report_date):
+        report_date = parse_report_date(report_date)
+        if not report_date:
+            return error_response("Date parameter is required")
+
+        async def build():
+            rows = [row async for row in SnapshotSerializer.rows(report_date)]
+            return SnapshotSerializer.serialize(rows)
+
+        entry = await aget_entry(snapshot_key(report_date), report_date, build)
+        return conditional_response(request, entry, json_response(entry['data']))
+
+
+class AsyncReactorDetailView(View):
+    async def get(self, request, report_date, reactor_id):
+        report_date = parse_report_date(report_date)
+        if not report_date:
+            return error_response("Date parameter is required")
+
+        async def build():
+            reactorstatus = await detail_queryset().aget(reactor_id=reactor_id, report_date=report_date)
+            return ReactorDetailSerializer(reactorstatus).data
+
+        try:
+            entry = await aget_entry(detail_key(report_date, reactor_id), report_date, build)
+        except ReactorStatus.DoesNotExist:
+            return not_found(ReactorStatus)
+        return conditional_response(request, entry, json_response(entry['data']))
+
+
+class AsyncReactorBatchView(View):
+    async def get(self, request, report_date):
+        report_date = parse_report_date(report_date)
+        if not report_date:
+            return error_response("Date parameter is required")
+        filters, fields, error = parse_batch_params(request.GET)
+        if error:
+            return error_response(error)
+
+        # Async iteration runs the prefetches too
+        statuses = [status async for status in batch_queryset(report_date, filters, fields)]
+        return json_response(ReactorBatchSerializer(statuses, many=True, fields=fields).data)
+
+
+class AsyncLatestStatusView(View):
+    async def get(self, request):
+        rows = [row async for row in LatestStatusSerializer.rows()]
+        return json_response(LatestStatusSerializer.serialize(rows))
+
+
+class AsyncReactorSeriesView(View):
+    async def get(self, request, reactor_id):
+        resolution = request.GET.get('resolution', 'daily')
+        if resolution not in SERIES_RESOLUTIONS:
+            return error_response(f"resolution must be one of {', '.join(SERIES_RESOLUTIONS)}")
+        dates, error = parse_date_range(request.GET)
+        if error:
+            return error_response(error)
+
+        reactor_name = await Reactor.objects.filter(id=reactor_id).values_list('name', flat=True).afirst()
+        if reactor_name is None:
+            return not_found(Reactor)
+        rows = [row async for row in series_queryset(reactor_id, resolution, dates)]
+        return json_response(series_payload(reactor_name, resolution, rows))
+
+
+class AsyncFleetSummaryView(View):
+    async def get(self, request):
+        region = request.GET.get('region')
+        dates, error = parse_date_range(request.GET)
+        error = validate_region(region) or error
+        if error:
+            return error_response(error)
+
+        region_qs, total_qs = summary_querysets(region, dates)
+        region_rows = [row async for row in region_qs]
+        total_rows = [row async for row in total_qs]
+        return json_response(summary_payload(region_rows, total_rows))
@@ -0,0 +1,159 @@
+import math
+from datetime import timedelta
+from nrc_data.fit_sandbox import FitLimitExceeded, fit_sandbox
+from nrc_data.forecast import build_prophet
+from nrc_data.models import BacktestMetric, Reactor, ReactorStatus
+
+# Rolling-origin backtests of the forecast config: for each reactor, fit on
+# the history up to a cutoff ("origin"), forecast the config's horizon and
+# score it against what was actually reported, for a series of origins.
+#
+# - each reactor's history is loaded once (one query) and every origin trains
+#   on a slice of it
+# - origins run oldest first and each fit is warm-started from the previous
+#   origin's parameters, so Stan starts close to the optimum
+# - errors are accumulated per horizon (days after the cutoff) and stored as
+#   BacktestMetric rows, so configs can be compared per unit and fleet-wide
+#
+# Reactors are independent, the backtest command runs them in parallel processes.
+
+# Cutoffs with less training history than this are skipped
+MIN_TRAINING_DAYS = 365
+
+# Horizons shown in reports
+REPORT_HORIZONS = (1, 7, 14, 30)
+
+
+def rolling_origins(last_date, horizon, origins, step):
+    """`origins` cutoffs `step` days apart, oldest first; the last one leaves `horizon` days to score."""
+    last_origin = last_date - timedelta(days=horizon)
+    return [last_origin - timedelta(days=step * k) for k in range(origins - 1, -1, -1)]
+
+
+def warm_start_params(model):
+    # The fitted MAP estimates as Stan inits for the next fit, as in Prophet's docs
+    params = {name: model.params[name][0][0] for name in ('k', 'm', 'sigma_obs')}
+    params.update({name: model.params[name][0] for name in ('delta', 'beta')})
+    return params
+
+
+def prophet_forecast(history, config, init=None, cutoff=None):
+    """
+    Fit Prophet on a ds/y frame and forecast the config's horizon after `cutoff`
+    (default: the last day in the history). Returns the forecast (ds, yhat,
+    yhat_lower, yhat_upper) and the inits for the next fit.
+    """
+    import pandas as pd
+
+    model = build_prophet(history, config)
+    if init:
+        try:
+            model.fit(history, init=init)
+        except (RuntimeError, ValueError):
+            # Parameter shapes changed (e.g. the first outage entered the window), fit cold
+            model = build_prophet(history, config)
+            model.fit(history)
+    else:
+        model.fit(history)
+    # From the cutoff rather than the last report, which is earlier when the days before it weren't reported
+    start = (cutoff if cutoff is not None else history['ds'].iloc[-1]) + pd.Timedelta(days=1)
+    future = pd.DataFrame({'ds': pd.date_range(start, periods=config['horizon_days'])})
+    forecast = model.predict(future)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+    return forecast, warm_start_params(model)
+
+
+def score(stats, forecast, actuals, origin):
+    """Add a forecast's errors to `stats`, {horizon: [count, abs, squared, signed, covered]}."""
+    for ds, yhat, lower, upper in forecast.itertuples(index=False):
+        actual = actuals.get(ds)
+        horizon = (ds - origin).days
+        if actual is None or horizon < 1:  # No report that day, or in the training data
+            continue
+        error = yhat - actual
+        totals = stats.setdefault(horizon, [0, 0.0, 0.0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += abs(error)
+        totals[2] += error * error
+        totals[3] += error
+        totals[4] += lower <= actual <= upper
+
+
+def backtest_unit(reactor_id, origins, config, window_days=None, warm_start=True, forecaster=None):
+    """
+    Backtest one reactor at each of `origins` (oldest first). Returns
+    (reactor_id, per-horizon stats, fits, failed fits).
+    """
+    import pandas as pd
+
+    forecaster = forecaster or prophet_forecast
+    horizon = config['horizon_days']
+    qs = ReactorStatus.objects.filter(reactor_id=reactor_id, report_date__lte=origins[-1] + timedelta(days=horizon))
+    if window_days:
+        qs = qs.filter(report_date__gt=origins[0] - timedelta(days=window_days))
+    history = pd.DataFrame(list(qs.order_by('report_date').values_list('report_date', 'power')), columns=['ds', 'y'])
+    history['ds'] = pd.to_datetime(history['ds'])
+    actuals = dict(zip(history['ds'], history['y']))
+    name = Reactor.objects.filter(pk=reactor_id).values_list('name', flat=True).first()
+
+    stats = {}
+    fits = failed = 0
+    init = None
+    for origin in origins:
+        cutoff = pd.Timestamp(origin)
+        end = history['ds'].searchsorted(cutoff, side='right')
+        start = history['ds'].searchsorted(cutoff - pd.Timedelta(days=window_days), side='right') if window_days else 0
+        train = history.iloc[start:end]
+        if len(train) < MIN_TRAINING_DAYS:
+            continue
+        try:
+            with fit_sandbox(f"{name} backtest"):
+                forecast, params = forecaster(train, config, init, cutoff)
+        except FitLimitExceeded:
+            failed += 1
+            init = None
+            continue
+        fits += 1
+        if warm_start:
+            init = params
+        score(stats, forecast, actuals, cutoff)
+    return reactor_id, stats, fits, failed
+
+
+def save_metrics(run, reactor_id, stats):
+    BacktestMetric.objects.bulk_create([
+        BacktestMetric(
+            run=run,
+            reactor_id=reactor_id,
+            horizon=horizon,
+            count=count,
+            mae=abs_total / count,
+            rmse=math.sqrt(squared / count),
+            bias=signed / count,
+            coverage=covered / count,
+        )
+        for horizon, (count, abs_total, squared, signed, covered) in sorted(stats.items())
+    ])
+
+
+def horizon_summary(run):
+    """Fleet-wide errors of a run per horizon, each reactor weighted by its forecast count."""
+    totals = {}
+    for horizon, count, mae, rmse, bias, coverage in run.metrics.values_list(
+        'horizon', 'count', 'mae', 'rmse', 'bias', 'coverage'
+    ):
+        sums = totals.setdefault(horizon, [0, 0.0, 0.0, 0.0, 0.0])
+        sums[0] += count
+        sums[1] += count * mae
+        sums[2] += count * rmse * rmse
+        sums[3] += count * bias
+        sums[4] += count * coverage
+    return {
+        horizon: {
+            'count': count,
+            'mae': mae / count,
+            'rmse': math.sqrt(squared / count),
+            'bias': bias / count,
+            'coverage': coverage / count,
+        }
+        for horizon, (count, mae, squared, bias, coverage) in sorted(totals.items())
+    }
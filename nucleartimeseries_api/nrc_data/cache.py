@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import orjson
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Response cache for the date-keyed reactor endpoints.
+#
+# Entries hold the serialized payload together with its ETag and the time it
+# was built, so repeat requests skip both the database and the serializers and
+# conditional requests can be answered with a 304. Ingestion and forecasting
+# call invalidate_date / invalidate_reactor whenever they write rows that show
+# up in these responses.
+
+
+def snapshot_key(report_date):
+    return f"reactor:{report_date}:snapshot"
+
+
+def detail_key(report_date, reactor_id):
+    return f"reactor:{report_date}:detail:{reactor_id}"
+
+
+def ttl_for(report_date):
+    """Past dates rarely change, so they are cached much longer than recent ones."""
+    recent_cutoff = timezone.now().date() - timedelta(days=settings.NRC_CACHE_RECENT_DAYS)
+    if report_date < recent_cutoff:
+        return settings.NRC_CACHE_HISTORICAL_TTL
+    return settings.NRC_CACHE_RECENT_TTL
+
+
+def _build_entry(data):
+    payload = orjson.dumps(data, default=DjangoJSONEncoder().default, option=orjson.OPT_SORT_KEYS)
+    return {
+        'data': data,
+        'etag': hashlib.md5(payload).hexdigest(),
+        'last_modified': int(timezone.now().timestamp()),
+    }
+
+
+def get_entry(key, report_date, build):
+    """Return the cache entry for `key`, building it with `build()` on a miss."""
+    entry = _get(key)
+    if entry is None:
+        entry = _build_entry(build())
+        _set(key, entry, ttl_for(report_date))
+    return entry
+
+
+async def aget_entry(key, report_date, build):
+    """Async get_entry for the ASGI views; `build` is a coroutine function."""
+    entry = await _aget(key)
+    if entry is None:
+        entry = _build_entry(await build())
+        await _aset(key, entry, ttl_for(report_date))
+    return entry
+
+
+def conditional_response(request, entry, response):
+    """
+    Add the entry's validators to `response`, or return 304 Not Modified when
+    the request's If-None-Match or If-Modified-Since validators match.
+    """
+    etag = quote_etag(entry['etag'])
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(entry['last_modified'])
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=entry['last_modified'], response=response
+    )
+    return not_modified or response
+
+
+def cached_response(request, key, report_date, build):
+    """Serve `key` from the cache, building it with `build()` on a miss."""
+    entry = get_entry(key, report_date, build)
+    return conditional_response(request, entry, Response(entry['data']))
+
+
+def invalidate_date(report_date, reactor_ids=None):
+    """Drop the snapshot and every detail entry for `report_date`."""
+    if reactor_ids is None:
+        from nrc_data.models import ReactorStatus
+        reactor_ids = ReactorStatus.objects.filter(report_date=report_date).values_list('reactor_id', flat=True)
+    keys = [snapshot_key(report_date)] + [detail_key(report_date, reactor_id) for reactor_id in reactor_ids]
+    _delete_many(keys)
+
+
+def invalidate_reactor(report_date, reactor_id):
+    """Drop the detail entry for one reactor on `report_date`."""
+    _delete_many([detail_key(report_date, reactor_id)])
+
+
+# A cache outage should slow the API down, not take it down, so backend
+# errors are logged and treated as misses.
+
+def _get(key):
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return None
+
+
+def _set(key, value, timeout):
+    try:
+        cache.set(key, value, timeout)
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+
+
+async def _aget(key):
+    try:
+        return await cache.aget(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return None
+
+
+async def _aset(key, value, timeout):
+    try:
+        await cache.aset(key, value, timeout)
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+
+
+def _delete_many(keys):
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
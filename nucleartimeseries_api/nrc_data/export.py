@@ -0,0 +1,130 @@
+import csv
+from io import StringIO
+from nrc_data.models import ReactorStatus
+
+# Bulk export of the ReactorStatus history.
+#
+# Rows are read with QuerySet.iterator() (a server-side cursor on PostgreSQL)
+# and encoded one chunk at a time, so memory stays flat no matter how many
+# rows are exported. Both the export endpoint and the export_history command
+# stream from these generators.
+
+EXPORT_COLUMNS = ['report_date', 'unit', 'region', 'power', 'down_date', 'reason', 'changed', 'scrams']
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def export_rows(unit=None, region=None, start=None, end=None):
+    """Return the filtered status history as value tuples in EXPORT_COLUMNS order."""
+    qs = ReactorStatus.objects.all()
+    if unit:
+        qs = qs.filter(reactor__name=unit)
+    if region:
+        qs = qs.filter(reactor__region=region)
+    if start:
+        qs = qs.filter(report_date__gte=start)
+    if end:
+        qs = qs.filter(report_date__lte=end)
+    return qs.order_by('report_date', 'reactor_id').values_list(
+        'report_date', 'reactor__name', 'reactor__region', 'power', 'down_date', 'reason__text', 'changed', 'scrams'
+    )
+
+
+def iter_csv(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the CSV encoding of `rows`, one chunk of rows per string."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for i, row in enumerate(rows.iterator(chunk_size=chunk_size), 1):
+        writer.writerow(row)
+        if i % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def load_pyarrow():
+    """Import pyarrow, which is only needed for Parquet exports."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+class _ParquetSink:
+    """Write-only file object whose contents are drained after every row group."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_parquet(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield a Parquet file for `rows`, writing one row group per chunk."""
+    pa = load_pyarrow()
+    schema = pa.schema([
+        ('report_date', pa.date32()),
+        ('unit', pa.string()),
+        ('region', pa.string()),
+        ('power', pa.int32()),
+        ('down_date', pa.date32()),
+        ('reason', pa.string()),
+        ('changed', pa.bool_()),
+        ('scrams', pa.int32()),
+    ])
+
+    def to_table(batch):
+        columns = list(zip(*batch))
+        return pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+    sink = _ParquetSink()
+    writer = pa.parquet.ParquetWriter(sink, schema)
+    batch = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            writer.write_table(to_table(batch))
+            batch = []
+            yield sink.drain()
+    if batch:
+        writer.write_table(to_table(batch))
+    writer.close()
+    yield sink.drain()
+
+
+def iter_export(rows, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    if file_format == 'parquet':
+        return iter_parquet(rows, chunk_size)
+    return iter_csv(rows, chunk_size)
@@ -0,0 +1,184 @@
+import errno
+import gc
+import os
+import resource
+import shutil
+import signal
+import tempfile
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+
+# Limits around a single Prophet fit, so one pathological reactor can't bloat
+# or stall a long-lived `cpu` worker:
+#
+# - memory: the soft RLIMIT_DATA of the process (and the Stan binary it
+#   spawns, which inherits it) is capped at NRC_FIT_MEMORY_MB for the fit, so
+#   a runaway allocation fails that fit instead of the OOM killer taking the
+#   worker. In Python that's a MemoryError; in Stan the binary dies and
+#   cmdstanpy/Prophet raise a RuntimeError carrying its output, which is
+#   recognised by MEMORY_ERRORS
+# - time: a SIGALRM after NRC_FIT_TIME_LIMIT seconds. The alarm interrupts
+#   Python waiting on the Stan binary, so the binary (any process the fit
+#   started) is killed first rather than left running. The Celery task also
+#   has a hard time_limit a bit above it that kills the pool child if Python
+#   is stuck where the alarm can't interrupt it
+#
+# Both limits surface as FitLimitExceeded.
+# - temp files: cmdstanpy writes its inputs and CSV outputs to a per-process
+#   temp dir that it only cleans at exit; whatever a fit adds there (or to the
+#   fit's own tempfile.tempdir) is removed afterwards
+#
+# Recycling of the worker processes themselves is Celery's job
+# (--max-tasks-per-child / --max-memory-per-child, see settings).
+#
+# All of this acts on the whole process, so it only applies on the main
+# thread: a prefork pool child or manage.py. Under a threads, gevent or
+# eventlet pool (or a threaded manage.py) the other tasks in the process would
+# get the memory cap, lose their Stan binaries and temp files, so fits there
+# run without limits or cleanup.
+
+
+class FitLimitExceeded(Exception):
+    pass
+
+
+# How running out of memory reads in the errors of a failed Stan run
+MEMORY_ERRORS = ('bad_alloc', 'cannot allocate memory', 'out of memory', 'memoryerror')
+
+
+def out_of_memory(error):
+    if isinstance(error, OSError) and error.errno == errno.ENOMEM:
+        return True
+    return any(marker in str(error).lower() for marker in MEMORY_ERRORS)
+
+
+def child_pids():
+    """Direct child processes of this one (Linux /proc; empty elsewhere)."""
+    pids = set()
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return pids
+    me = os.getpid()
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # "pid (comm) state ppid ...", comm can contain spaces and parentheses
+        if int(stat.rsplit(')', 1)[1].split()[1]) == me:
+            pids.add(int(entry))
+    return pids
+
+
+def kill_new_children(before):
+    """Kill (and reap) the child processes started since `before` was taken."""
+    for pid in child_pids() - before:
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+
+def stan_tmpdir():
+    try:
+        # Imported here, not first inside a fit, so its temp dir isn't created in (and removed with) the fit's own
+        import cmdstanpy
+    except ImportError:
+        return None
+    path = getattr(cmdstanpy, '_TMPDIR', None)
+    return path if path and os.path.isdir(path) else None
+
+
+def _remove_new_entries(directory, before):
+    for name in set(os.listdir(directory)) - before:
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def on_main_thread():
+    return threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def memory_limit(megabytes):
+    # RLIMIT_DATA is process-wide, see time_limit
+    if not megabytes or not hasattr(resource, 'RLIMIT_DATA') or not on_main_thread():
+        yield
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_DATA)
+    limit = megabytes * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_DATA, (limit, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_DATA, (soft, hard))
+
+
+@contextmanager
+def time_limit(seconds, name, children=frozenset()):
+    # Signals only reach the main thread (prefork pool children, manage.py)
+    if not seconds or not on_main_thread():
+        yield
+        return
+
+    def expired(signum, frame):
+        # Python is most likely waiting on the Stan binary, which would keep running
+        kill_new_children(children)
+        raise FitLimitExceeded(f"{name} fit took longer than {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@contextmanager
+def fit_sandbox(name):
+    """Run one forecast fit under the memory/time limits and clean up its temp files."""
+    if not on_main_thread():
+        # The limits and the cleanup would reach the other tasks in this process
+        yield
+        return
+    stan_dir = stan_tmpdir()
+    stan_before = set(os.listdir(stan_dir)) if stan_dir else set()
+    fit_tmp = tempfile.mkdtemp(prefix='nrc-fit-')
+    previous_tmp = tempfile.tempdir
+    tempfile.tempdir = fit_tmp
+    children = child_pids()
+    megabytes = settings.NRC_FIT_MEMORY_MB
+    try:
+        with memory_limit(megabytes), time_limit(settings.NRC_FIT_TIME_LIMIT, name, children):
+            yield
+    except MemoryError:
+        raise FitLimitExceeded(f"{name} fit needed more than {megabytes} MB")
+    except (OSError, RuntimeError) as e:
+        # The Stan binary ran out of memory under the inherited limit
+        if megabytes and out_of_memory(e):
+            raise FitLimitExceeded(f"{name} fit needed more than {megabytes} MB: {e}") from e
+        raise
+    finally:
+        # Whatever the fit started and left behind, e.g. after an error
+        kill_new_children(children)
+        tempfile.tempdir = previous_tmp
+        shutil.rmtree(fit_tmp, ignore_errors=True)
+        if stan_dir:
+            _remove_new_entries(stan_dir, stan_before)
+        # Prophet keeps the Stan fit and the big frames in reference cycles
+        gc.collect()
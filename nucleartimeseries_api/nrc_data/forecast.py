@@ -1,85 +1,141 @@
-import os
-import pandas as pd
-import plotly.graph_objects as go
-import boto3
-from io import BytesIO, StringIO
-from datetime import timedelta
-from prophet import Prophet
+import logging
+from io import StringIO
 from nrc_data.outage_detection import detect_stub_outages_for_reactor
-import django
-from django.conf import settings
+from nrc_data.cache import invalidate_reactor
+from nrc_data.latest import refresh_latest_status
+from nrc_data.forecast_runs import config_hash, save_forecast_run
+from nrc_data.storage import forecast_storage
+from nrc_data.routers import pin_primary, reactor_scopes
+from nrc_data.metrics import ARTIFACT_BYTES, track_forecast_step, track_stage
+from nrc_data.profiling import profiled
+from nrc_data.fit_sandbox import fit_sandbox
+from nrc_data.models import ForecastRun, Reactor, ReactorStatus
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nucleartimeseries_api.settings")
-django.setup()
+logger = logging.getLogger(__name__)
 
-from nrc_data.models import Reactor, ReactorStatus, ReactorForecast
+# pandas, Prophet and plotly are imported inside the functions that use them:
+# this module is pulled in by nrc_data.tasks, so importing them here would
+# load the whole forecasting stack (seconds, hundreds of MB) into every Celery
+# process, beat and manage.py shell. See HEAVY_MODULES in bench_startup.
 
-def generate_and_upload_forecast(unit_name):
-    # Step 1: Load data
-    qs = ReactorStatus.objects.filter(unit=unit_name).order_by('report_date')
-    latest_status = qs.last()
-    df = pd.DataFrame(list(qs.values("report_date", "power")))
-    print("qs")
-    print(qs)
-    print("df")
-    print(df)
-    if df.empty:
-        raise ValueError(f"No data found for {unit_name}")
-    
-    df_prophet = df.rename(columns={"report_date": "ds", "power": "y"})
+FORECAST_ENGINE = 'prophet'
+
+# Everything that changes the model; hashed into ForecastRun.config_hash
+PROPHET_CONFIG = {
+    'daily_seasonality': False,
+    'yearly_seasonality': True,
+    'weekly_seasonality': False,
+    'changepoint_prior_scale': 0.5,
+    'monthly_fourier_order': 5,
+    'outage_upper_window': 5,
+    'horizon_days': 30,
+}
+
+def build_prophet(df_prophet, config):
+    """
+    Unfitted Prophet model for a ds/y history, with its refueling outages
+    (y == 0) as holidays. Shared by fit_forecast and the backtests.
+    """
+    import pandas as pd
+    from prophet import Prophet
 
-    # Step 2: Identify refueling outages (y == 0)
     refuel_days = df_prophet[df_prophet["y"] == 0]
     holidays = pd.DataFrame({
         "holiday": "refueling_outage",
         "ds": refuel_days["ds"],
         "lower_window": 0,
-        "upper_window": 5
+        "upper_window": config['outage_upper_window']
     })
-
-    # Step 3: Train model
     model = Prophet(
-        daily_seasonality=False,
-        yearly_seasonality=True,
-        weekly_seasonality=False,
-        changepoint_prior_scale=0.5,
+        daily_seasonality=config['daily_seasonality'],
+        yearly_seasonality=config['yearly_seasonality'],
+        weekly_seasonality=config['weekly_seasonality'],
+        changepoint_prior_scale=config['changepoint_prior_scale'],
         holidays=holidays
     )
-    model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
-    model.fit(df_prophet)
+    model.add_seasonality(name='monthly', period=30.5, fourier_order=config['monthly_fourier_order'])
+    return model
 
-    # Step 4: Forecast
-    future = model.make_future_dataframe(periods=30)
-    forecast = model.predict(future)
-    latest_date = pd.to_datetime(df_prophet['ds'].max())
-    next_day = latest_date + timedelta(days=1)
-    day30 = latest_date + timedelta(days=30)
 
+def fit_forecast(unit_name, force=False):
+    """
+    Fit Prophet on the reactor's history and store the run (all horizons).
+
+    If a run with the current config already exists for the latest report
+    date it's returned as is, unless `force`, so retried tasks don't refit.
+    """
+    import pandas as pd
+
+    # Step 1: Load data
     reactor_obj = Reactor.objects.get(name=unit_name)
-    for day in [next_day, day30]:
-        row = forecast[forecast['ds'] == day]
-        if not row.empty:
-            # Upload forecast row to DB
-            ReactorForecast.objects.update_or_create(
-                reactor=reactor_obj,
-                df=day,
-                defaults={
-                    'yhat': row['yhat'].values[0],
-                    'yhat_lower': row['yhat_lower'].values[0],
-                    'yhat_upper': row['yhat_upper'].values[0],
-                },
-                reactorstatus = latest_status
-            )
+    qs = ReactorStatus.objects.filter(reactor=reactor_obj).order_by('report_date')
+    latest_status = qs.last()
+    if latest_status is None:
+        raise ValueError(f"No data found for {unit_name}")
+    if not force:
+        existing = ForecastRun.objects.filter(
+            reactor=reactor_obj,
+            trained_through=latest_status.report_date,
+            engine=FORECAST_ENGINE,
+            config_hash=config_hash(PROPHET_CONFIG),
+        ).first()
+        if existing:
+            return existing
+
+    df = pd.DataFrame(list(qs.values("report_date", "power")))
+    df_prophet = df.rename(columns={"report_date": "ds", "power": "y"})
+
+    # Steps 2-3: Refueling outages as holidays, then train
+    model = build_prophet(df_prophet, PROPHET_CONFIG)
+    # Memory/time capped, Stan temp files removed afterwards (nrc_data/fit_sandbox.py)
+    with fit_sandbox(unit_name):
+        with track_forecast_step(unit_name, 'fit'):
+            model.fit(df_prophet)
+
+        # Step 4: Forecast
+        future = model.make_future_dataframe(periods=PROPHET_CONFIG['horizon_days'])
+        with track_forecast_step(unit_name, 'predict'):
+            forecast = model.predict(future)
+    latest_date = pd.to_datetime(df_prophet['ds'].max())
     forecast_30 = forecast[forecast["ds"] > latest_date]
 
+    # Upload every horizon as one run; re-running the same cutoff replaces it
+    run = save_forecast_run(
+        reactor_obj,
+        latest_status,
+        FORECAST_ENGINE,
+        PROPHET_CONFIG,
+        [
+            (row.ds.date(), row.yhat, row.yhat_lower, row.yhat_upper)
+            for row in forecast_30[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].itertuples(index=False)
+        ],
+    )
+    # The forecasts hang off the latest status, so its detail response is stale
+    pin_primary(reactor_scopes(latest_status.report_date, reactor_obj.id))
+    invalidate_reactor(latest_status.report_date, reactor_obj.id)
+    refresh_latest_status([reactor_obj.id])
+    return run
+
+
+def render_forecast_html(run):
+    """Plot a stored run against the actuals it was trained on, as HTML bytes."""
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    actual = pd.DataFrame(list(
+        ReactorStatus.objects.filter(reactor_id=run.reactor_id, report_date__lte=run.trained_through)
+        .order_by('report_date').values('report_date', 'power')
+    ))
+    forecast_30 = pd.DataFrame(list(run.forecasts.order_by('horizon').values('df', 'yhat', 'yhat_lower', 'yhat_upper')))
+
     # Step 5: Plot actual vs forecast
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df_prophet['ds'], y=df_prophet['y'], mode='lines', name='Actual'))
-    fig.add_trace(go.Scatter(x=forecast_30['ds'], y=forecast_30['yhat'], mode='lines', name='Forecast'))
-    fig.add_trace(go.Scatter(x=forecast_30['ds'], y=forecast_30['yhat_upper'], mode='lines', line=dict(width=0), showlegend=False))
-    fig.add_trace(go.Scatter(x=forecast_30['ds'], y=forecast_30['yhat_lower'], mode='lines', fill='tonexty', line=dict(width=1), showlegend=False))
+    fig.add_trace(go.Scatter(x=actual['report_date'], y=actual['power'], mode='lines', name='Actual'))
+    fig.add_trace(go.Scatter(x=forecast_30['df'], y=forecast_30['yhat'], mode='lines', name='Forecast'))
+    fig.add_trace(go.Scatter(x=forecast_30['df'], y=forecast_30['yhat_upper'], mode='lines', line=dict(width=0), showlegend=False))
+    fig.add_trace(go.Scatter(x=forecast_30['df'], y=forecast_30['yhat_lower'], mode='lines', fill='tonexty', line=dict(width=1), showlegend=False))
     fig.update_layout(
-        title=f"{unit_name} – Next 30 Day Forecast",
+        title=f"{run.reactor.name} – Next 30 Day Forecast",
         xaxis_title="Date",
         yaxis_title="Power (%)",
         xaxis=dict(rangeslider=dict(visible=True), type="date"),
@@ -89,21 +145,35 @@ def generate_and_upload_forecast(unit_name):
     # Step 6: Save to HTML in memory
     html_buffer = StringIO()
     fig.write_html(html_buffer)
-    html_str = html_buffer.getvalue().encode("utf-8")  # Convert str to bytes
-    html_bytes = BytesIO(html_str)
-
-    # Step 7: Upload to S3
-    s3 = boto3.client('s3', aws_access_key_id=settings.AWS_ACCESS_KEY_ID, aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY)
-    bucket = settings.AWS_STORAGE_BUCKET_NAME
-    s3_path = f"{settings.S3_FORECAST_FOLDER}{unit_name.replace(' ', '_')}.html"
-    try:
-        s3.upload_fileobj(html_bytes, bucket, s3_path, ExtraArgs={'ContentType': 'text/html'})
-    except Exception as e:
-        print(f"❌ Failed to upload to S3 for {unit_name}: {e}")
-        return
-
-    # Step 8: Return public URL
-    url = f"https://{bucket}.s3.amazonaws.com/{s3_path}"
-    ReactorForecast.objects.filter(reactor=reactor_obj, df__in=[next_day, day30]).update(image_url=url)
-    detect_stub_outages_for_reactor(reactor_obj.name)
+    html = html_buffer.getvalue().encode("utf-8")
+    ARTIFACT_BYTES.labels('forecast_plot').observe(len(html))
+    return html
+
+
+def upload_forecast_html(run, html):
+    """Publish the plot and link it from the run. Returns the public URL."""
+    # Step 7: Upload to storage (S3 in production)
+    with track_stage('upload'):
+        url = forecast_storage().save(f"{run.reactor.name.replace(' ', '_')}.html", html, 'text/html')
+
+    run.image_url = url
+    run.save(update_fields=['image_url'])
+    pin_primary(reactor_scopes(run.trained_through, run.reactor_id))
+    invalidate_reactor(run.trained_through, run.reactor_id)
+    return url
+
+
+def generate_and_upload_forecast(unit_name, profile=False):
+    """
+    Fit, plot, publish and check for outages in one go (the pipeline runs these
+    as separate tasks). `profile` writes a cProfile of the whole run to NRC_PROFILE_DIR.
+    """
+    with profiled(f"forecast-{unit_name}", enabled=profile):
+        run = fit_forecast(unit_name, force=True)
+        try:
+            url = upload_forecast_html(run, render_forecast_html(run))
+        except Exception:
+            logger.exception("Failed to upload forecast plot for %s", unit_name)
+            raise
+        detect_stub_outages_for_reactor(unit_name)
     return url
@@ -0,0 +1,85 @@
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from nrc_data.models import ForecastRun, ReactorForecast
+
+# Horizons shown in the reactor detail API: next day and 30 days out
+DETAIL_HORIZONS = (1, 30)
+
+
+def config_hash(config):
+    """Stable hash of an engine's settings, so a config change starts new runs."""
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@transaction.atomic
+def save_forecast_run(reactor, reactorstatus, engine, config, rows):
+    """
+    Store a run trained through `reactorstatus.report_date`, with one
+    ReactorForecast per (df, yhat, yhat_lower, yhat_upper) row in `rows`.
+
+    Re-running the same reactor, cutoff, engine and config replaces that run's
+    horizons rather than adding rows.
+    """
+    trained_through = reactorstatus.report_date
+    run, created = ForecastRun.objects.get_or_create(
+        reactor=reactor,
+        trained_through=trained_through,
+        engine=engine,
+        config_hash=config_hash(config),
+    )
+    if not created:
+        run.forecasts.all().delete()
+        if run.compacted:
+            run.compacted = False
+            run.save(update_fields=['compacted'])
+
+    ReactorForecast.objects.bulk_create([
+        ReactorForecast(
+            run=run,
+            horizon=(df - trained_through).days,
+            reactor=reactor,
+            reactorstatus=reactorstatus,
+            df=df,
+            yhat=yhat,
+            yhat_lower=yhat_lower,
+            yhat_upper=yhat_upper,
+        )
+        for df, yhat, yhat_lower, yhat_upper in rows
+    ])
+    return run
+
+
+def latest_run(reactor_id):
+    # Backward scan of forecastrun_latest_idx
+    return ForecastRun.objects.filter(reactor_id=reactor_id).order_by('-trained_through', '-created_at').first()
+
+
+def compact_forecast_runs(full_days=None, keep_horizons=None, dry_run=False):
+    """
+    Trim runs trained more than `full_days` ago to the `keep_horizons` used for
+    accuracy tracking. The latest run of each reactor is always kept whole.
+
+    Returns (runs compacted, forecast rows deleted).
+    """
+    full_days = settings.NRC_FORECAST_FULL_DAYS if full_days is None else full_days
+    keep_horizons = settings.NRC_FORECAST_KEEP_HORIZONS if keep_horizons is None else keep_horizons
+    cutoff = timezone.now().date() - timedelta(days=full_days)
+
+    newer_run = ForecastRun.objects.filter(
+        reactor=OuterRef('reactor'), trained_through__gt=OuterRef('trained_through')
+    )
+    runs = ForecastRun.objects.filter(compacted=False, trained_through__lt=cutoff).filter(Exists(newer_run))
+    forecasts = ReactorForecast.objects.filter(run__in=runs).exclude(horizon__in=keep_horizons)
+    if dry_run:
+        return runs.count(), forecasts.count()
+
+    with transaction.atomic():
+        run_ids = list(runs.values_list('id', flat=True))
+        deleted, _ = ReactorForecast.objects.filter(run_id__in=run_ids).exclude(horizon__in=keep_horizons).delete()
+        ForecastRun.objects.filter(id__in=run_ids).update(compacted=True)
+    return len(run_ids), deleted
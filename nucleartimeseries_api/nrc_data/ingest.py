@@ -0,0 +1,178 @@
+import time
+import requests
+from datetime import timedelta
+from django.utils import timezone
+from nrc_data.metrics import ARTIFACT_BYTES, record_rows_saved, track_stage
+from nrc_data.models import IngestRun, ReactorStatus
+
+# Stages of the nightly ingestion pipeline, one report date at a time:
+#
+#   fetch -> parse -> save -> forecast + detect (per reactor) -> done
+#
+# Each stage records its output on the date's IngestRun and returns early if
+# the run is already past it, so any stage can be retried or the whole
+# pipeline re-run and it resumes after the last completed stage. The Celery
+# tasks wiring these together live in nrc_data/tasks.py.
+#
+# pandas and BeautifulSoup are imported where they're used so importing the
+# tasks module (every Celery process, beat) stays cheap.
+
+REPORT_URL = "https://www.nrc.gov/reading-rm/doc-collections/event-status/reactor-status/{year}/{date}ps.html"
+REPORT_COLUMNS = ['Unit', 'Power', 'Down', 'Reason', 'Change', 'Scrams']
+
+# Unfinished runs older than this aren't resumed any more
+RESUME_DAYS = 7
+
+
+class ReportNotPublished(Exception):
+    pass
+
+
+def fetch_report_html(date_str, timeout=60):
+    """Download the power reactor status report for a YYYYMMDD date."""
+    response = requests.get(REPORT_URL.format(year=date_str[:4], date=date_str), timeout=timeout)
+    if response.status_code == 404:
+        raise ReportNotPublished(f"No report published for {date_str}")
+    response.raise_for_status()
+    return response.text
+
+
+def parse_report_html(html, log=None):
+    """
+    Parse a status report into a DataFrame with REPORT_COLUMNS, or None if it
+    has no reactor tables. `log` gets progress messages if given.
+    """
+    import pandas as pd
+    from bs4 import BeautifulSoup
+
+    log = log or (lambda message: None)
+    soup = BeautifulSoup(html, 'lxml')
+    all_tables = soup.find_all('table', class_='power')
+    log(f"Found {len(all_tables)} table(s)")
+
+    # Try to find 6-column tables first (preferred format)
+    all_rows = []
+    six_col_tables = 0
+    for i, table in enumerate(all_tables):
+        rows = table.find_all('tr')[1:]  # Skip header
+        six_col_rows = []
+        for row in rows:
+            cells = [td.get_text(strip=True) for td in row.find_all('td')]
+            if len(cells) == 6:
+                all_rows.append(cells)
+                six_col_rows.append(cells)
+
+        if six_col_rows:
+            six_col_tables += 1
+            log(f"  Table {i+1}: {len(six_col_rows)} rows with 6 columns")
+
+    # If no 6-column tables found, try 2-column tables (simplified format)
+    if not all_rows:
+        log("No 6-column tables found, trying 2-column format...")
+        for i, table in enumerate(all_tables):
+            rows = table.find_all('tr')[1:]  # Skip header
+            two_col_rows = []
+            for row in rows:
+                cells = [td.get_text(strip=True) for td in row.find_all('td')]
+                if len(cells) == 2:
+                    # Convert 2-column to 6-column format with defaults
+                    unit, power = cells
+                    expanded_row = [unit, power, '', '', '', '']  # Add empty fields for Down, Reason, Change, Scrams
+                    all_rows.append(expanded_row)
+                    two_col_rows.append(expanded_row)
+
+            if two_col_rows:
+                log(f"  Table {i+1}: {len(two_col_rows)} rows with 2 columns (converted to 6)")
+
+    if not all_rows:
+        return None
+
+    df = pd.DataFrame(all_rows, columns=REPORT_COLUMNS)
+    df.replace('', pd.NA, inplace=True)
+    log(f"Parsed {len(df)} reactor rows using {'6-column' if six_col_tables > 0 else '2-column'} format")
+    return df
+
+
+def get_run(report_date):
+    return IngestRun.objects.get_or_create(report_date=report_date)[0]
+
+
+def completed(run, stage):
+    return IngestRun.STAGES.index(run.stage) >= IngestRun.STAGES.index(stage)
+
+
+def advance(run, stage):
+    run.stage = stage
+    run.error = ''
+    run.save()
+
+
+def fetch_stage(report_date):
+    run = get_run(report_date)
+    if completed(run, 'fetched'):
+        return
+    with track_stage('fetch'):
+        run.report_html = fetch_report_html(report_date.strftime('%Y%m%d'))
+    ARTIFACT_BYTES.labels('report_html').observe(len(run.report_html.encode()))
+    advance(run, 'fetched')
+
+
+def parse_stage(report_date):
+    run = get_run(report_date)
+    if completed(run, 'parsed'):
+        return
+    with track_stage('parse'):
+        df = parse_report_html(run.report_html)
+    if df is None:
+        raise ValueError(f"No reactor tables in the {report_date} report")
+    run.rows = df.astype(object).where(df.notna(), None).values.tolist()
+    advance(run, 'parsed')
+
+
+def save_stage(report_date):
+    """Save the parsed rows; returns the names of the reactors reported that day."""
+    import pandas as pd
+    from nrc_data.management.commands.seed import Command as SeedCommand
+
+    run = get_run(report_date)
+    if completed(run, 'saved'):
+        return run.reactors
+    df = pd.DataFrame(run.rows, columns=REPORT_COLUMNS)
+    started = time.perf_counter()
+    with track_stage('save'):
+        saved = SeedCommand().save_dataframe_to_db(df, report_date.strftime('%Y%m%d'))
+    record_rows_saved(saved, time.perf_counter() - started)
+
+    run.reactors = list(
+        ReactorStatus.objects.filter(report_date=report_date).order_by('reactor__name').values_list('reactor__name', flat=True)
+    )
+    # The rows are in ReactorStatus now
+    run.report_html = ''
+    run.rows = None
+    advance(run, 'saved')
+    return run.reactors
+
+
+def finish(report_date):
+    advance(get_run(report_date), 'done')
+
+
+def record_failure(report_date, error):
+    IngestRun.objects.filter(report_date=report_date).update(error=f"{type(error).__name__}: {error}")
+
+
+def dates_to_ingest():
+    """Recent unfinished runs, then the day after the latest report if it's due."""
+    today = timezone.now().date()
+    dates = list(
+        IngestRun.objects.exclude(stage='done')
+        .filter(report_date__gte=today - timedelta(days=RESUME_DAYS))
+        .order_by('report_date')
+        .values_list('report_date', flat=True)
+    )
+    latest = ReactorStatus.objects.order_by('-report_date').values_list('report_date', flat=True).first()
+    if latest:
+        next_date = latest + timedelta(days=1)
+        if next_date <= today and next_date not in dates:
+            dates.append(next_date)
+    return dates
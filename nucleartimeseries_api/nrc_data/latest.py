@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.db.models import OuterRef, Subquery
+from nrc_data.models import Reactor, ReactorStatus, ReactorForecast, StubOutage, ReactorLatestStatus
+
+LATEST_FIELDS = [
+    'report_date', 'power', 'down_date', 'reason',
+    'forecast_date', 'yhat', 'yhat_lower', 'yhat_upper', 'stuboutage', 'updated_at',
+]
+
+
+def refresh_latest_status(reactor_ids=None):
+    """
+    Upsert the ReactorLatestStatus rows for `reactor_ids` (every reactor if None).
+
+    Costs four reads (latest dates, latest statuses, their next-day forecasts,
+    their stub outages) and one bulk upsert, however many reactors are refreshed.
+    """
+    reactors = Reactor.objects.all()
+    if reactor_ids is not None:
+        reactor_ids = list(reactor_ids)
+        if not reactor_ids:
+            return 0
+        reactors = reactors.filter(id__in=reactor_ids)
+
+    # Latest date of each reactor, one status_reactor_date_idx lookup per reactor
+    newest = ReactorStatus.objects.filter(reactor_id=OuterRef('pk')).order_by('-report_date').values('report_date')[:1]
+    latest_dates = dict(
+        reactors.annotate(latest=Subquery(newest)).filter(latest__isnull=False).values_list('id', 'latest')
+    )
+    if not latest_dates:
+        return 0
+    # Latest dates are mostly the same, so the statuses are read from the few
+    # partitions/dates involved rather than matched per reactor
+    latest = [
+        status
+        for status in ReactorStatus.objects.select_related('reason').filter(
+            reactor_id__in=list(latest_dates), report_date__in=set(latest_dates.values()),
+        )
+        if status.report_date == latest_dates[status.reactor_id]
+    ]
+
+    # Next-day forecast for each reactor's latest date; newest run wins
+    next_days = {s.reactor_id: s.report_date + timedelta(days=1) for s in latest}
+    forecasts = {}
+    candidates = ReactorForecast.objects.filter(reactor_id__in=list(next_days), df__in=set(next_days.values()))
+    for forecast in candidates.order_by('run__trained_through', 'run__created_at'):
+        if forecast.df == next_days[forecast.reactor_id]:
+            forecasts[forecast.reactor_id] = forecast
+
+    outage_status_ids = set(
+        StubOutage.objects.filter(reactorstatus_id__in=[s.id for s in latest]).values_list('reactorstatus_id', flat=True)
+    )
+
+    rows = []
+    for status in latest:
+        forecast = forecasts.get(status.reactor_id)
+        rows.append(ReactorLatestStatus(
+            reactor_id=status.reactor_id,
+            report_date=status.report_date,
+            power=status.power,
+            down_date=status.down_date,
+            reason=status.reason.text if status.reason else None,
+            forecast_date=forecast.df if forecast else None,
+            yhat=forecast.yhat if forecast else None,
+            yhat_lower=forecast.yhat_lower if forecast else None,
+            yhat_upper=forecast.yhat_upper if forecast else None,
+            stuboutage=status.id in outage_status_ids,
+        ))
+
+    ReactorLatestStatus.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['reactor'],
+        update_fields=LATEST_FIELDS,
+    )
+    return len(rows)
@@ -0,0 +1,65 @@
+import logging
+import redis
+from contextlib import contextmanager
+from django.conf import settings
+from redis.exceptions import LockError
+
+logger = logging.getLogger(__name__)
+
+# Cross-worker coordination for the Celery tasks in nrc_data/tasks.py.
+#
+# task_lock() is a Redis lock held while a task runs, so the same date/stage
+# or reactor is never processed twice at once; it expires on its own if the
+# worker dies. Idempotency keys (claim / mark_done / is_done) are plain SET NX
+# keys that outlive the task, so duplicate submissions of work that already
+# finished are dropped with one Redis round trip instead of a DB query.
+
+_client = None
+
+
+class LockNotAcquired(Exception):
+    pass
+
+
+def redis_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.NRC_LOCK_REDIS_URL)
+    return _client
+
+
+@contextmanager
+def task_lock(name, timeout=None, wait=0):
+    """
+    Hold the lock `name` for the block, waiting up to `wait` seconds for it.
+    Raises LockNotAcquired if another worker holds it.
+    """
+    lock = redis_client().lock(
+        f"nrc:lock:{name}",
+        timeout=timeout or settings.NRC_TASK_LOCK_TIMEOUT,
+        blocking_timeout=wait,
+        thread_local=False,
+    )
+    if not lock.acquire(blocking=wait > 0):
+        raise LockNotAcquired(f"{name} is already being processed")
+    try:
+        yield
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            # Expired mid-task; someone else may have taken over already
+            logger.warning(f"Lock {name} expired before it was released")
+
+
+def claim(key, ttl):
+    """Claim `key` for `ttl` seconds. Returns False if it's already claimed."""
+    return bool(redis_client().set(f"nrc:idem:{key}", 1, nx=True, ex=ttl))
+
+
+def mark_done(key, ttl=None):
+    redis_client().set(f"nrc:done:{key}", 1, ex=ttl or settings.NRC_IDEMPOTENCY_TTL)
+
+
+def is_done(key):
+    return bool(redis_client().exists(f"nrc:done:{key}"))
@@ -0,0 +1,218 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max
+from datetime import datetime
+from nrc_data.backtest import REPORT_HORIZONS, backtest_unit, horizon_summary, rolling_origins, save_metrics
+from nrc_data.forecast import FORECAST_ENGINE, PROPHET_CONFIG
+from nrc_data.forecast_runs import config_hash
+from nrc_data.management.commands.bench_forecast import parse_overrides
+from nrc_data.models import BacktestRun, Reactor, ReactorStatus
+import multiprocessing
+import os
+import time
+
+_job = None
+
+
+def _backtest_unit(reactor_id):
+    # Runs in a forked worker process with its own database connection
+    return backtest_unit(reactor_id, **_job)
+
+
+class Command(BaseCommand):
+    help = "Rolling-origin backtest of the forecast config, stores per-horizon errors per reactor"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--units',
+            nargs='+',
+            help='Reactor names to backtest (default: all)',
+        )
+        parser.add_argument(
+            '--prefix',
+            type=str,
+            help='Only reactors whose name starts with this, e.g. SYN- for the synthetic fleet',
+        )
+        parser.add_argument(
+            '--origins',
+            type=int,
+            default=12,
+            help='Training cutoffs per reactor (default: 12)',
+        )
+        parser.add_argument(
+            '--step',
+            type=int,
+            default=30,
+            help='Days between cutoffs (default: 30)',
+        )
+        parser.add_argument(
+            '--window-years',
+            type=float,
+            help='Only train on this many years before each cutoff (default: all history)',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            help='Last report date scored (YYYYMMDD format, default: latest report)',
+        )
+        parser.add_argument(
+            '--set',
+            action='append',
+            metavar='KEY=VALUE',
+            help='Override a PROPHET_CONFIG value for the run, can be repeated',
+        )
+        parser.add_argument(
+            '--no-warm-start',
+            action='store_true',
+            help='Fit every cutoff from scratch',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Reactors backtested in parallel (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--compare',
+            type=int,
+            metavar='RUN_ID',
+            help='Show the errors next to an earlier run',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List stored runs with their fleet errors and exit',
+        )
+
+    def handle(self, *args, **options):
+        global _job
+
+        if options['list']:
+            return self.list_runs()
+        if options['origins'] < 1 or options['step'] < 1:
+            raise CommandError("--origins and --step must be positive")
+        baseline = None
+        if options['compare']:
+            baseline = BacktestRun.objects.filter(pk=options['compare']).first()
+            if baseline is None:
+                raise CommandError(f"No backtest run {options['compare']}")
+
+        overrides = parse_overrides(options['set'])
+        config = dict(PROPHET_CONFIG, **overrides)
+        if overrides:
+            self.stdout.write(f"Config overrides: {overrides}")
+
+        reactors = Reactor.objects.order_by('name')
+        if options['units']:
+            reactors = reactors.filter(name__in=options['units'])
+        if options['prefix']:
+            reactors = reactors.filter(name__startswith=options['prefix'])
+        reactor_ids = list(reactors.values_list('id', flat=True))
+        if not reactor_ids:
+            raise CommandError("No reactors to backtest")
+
+        if options['end_date']:
+            end_date = datetime.strptime(options['end_date'], '%Y%m%d').date()
+        else:
+            end_date = ReactorStatus.objects.filter(reactor_id__in=reactor_ids).aggregate(Max('report_date'))['report_date__max']
+            if end_date is None:
+                raise CommandError("No status data to backtest against")
+        origins = rolling_origins(end_date, config['horizon_days'], options['origins'], options['step'])
+        window_days = round(options['window_years'] * 365.25) if options['window_years'] else None
+
+        # A run without `seconds` was interrupted, its metrics are partial
+        run = BacktestRun.objects.create(
+            engine=FORECAST_ENGINE,
+            config=config,
+            config_hash=config_hash(config),
+            origins=len(origins),
+            step_days=options['step'],
+            window_days=window_days,
+            last_origin=origins[-1],
+            warm_start=not options['no_warm_start'],
+        )
+        self.stdout.write(
+            f"Backtest {run.pk}: {len(reactor_ids)} reactors x {len(origins)} cutoffs "
+            f"({origins[0]} to {origins[-1]}, every {options['step']} days), {config['horizon_days']}-day horizon"
+        )
+
+        job = {'origins': origins, 'config': config, 'window_days': window_days, 'warm_start': run.warm_start}
+        started = time.perf_counter()
+        workers = max(1, min(options['workers'] or 1, len(reactor_ids)))
+        if workers == 1:
+            results = (backtest_unit(reactor_id, **job) for reactor_id in reactor_ids)
+            pool = None
+        else:
+            # Children inherit the job; each opens its own connection
+            _job = job
+            connections.close_all()
+            pool = multiprocessing.get_context('fork').Pool(workers)
+            results = pool.imap_unordered(_backtest_unit, reactor_ids)
+        try:
+            for reactor_id, stats, fits, failed in results:
+                save_metrics(run, reactor_id, stats)
+                run.units += 1
+                run.fits += fits
+                run.failed_fits += failed
+                if run.units % 10 == 0 or run.units == len(reactor_ids):
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"  {run.units:6d}/{len(reactor_ids)} reactors, {run.fits:,} fits ({run.fits / elapsed:.2f} fits/s)"
+                    )
+        except BaseException:
+            # Don't wait for the other workers to finish their reactors
+            if pool:
+                pool.terminate()
+            raise
+        else:
+            if pool:
+                pool.close()
+        finally:
+            if pool:
+                pool.join()
+                _job = None
+
+        run.seconds = time.perf_counter() - started
+        run.save()
+
+        self.stdout.write(self.style.SUCCESS(f"\n🎯 Backtest {run.pk} done in {run.seconds:.1f}s"))
+        self.stdout.write(f"Fits: {run.fits:,} ({run.failed_fits} over the fit limits)")
+        self.report(run, baseline)
+
+    def report(self, run, baseline=None):
+        summary = horizon_summary(run)
+        before = horizon_summary(baseline) if baseline else {}
+        if baseline:
+            self.stdout.write(f"Compared with run {baseline.pk} ({config_diff(baseline.config, run.config) or 'same config'})")
+        for horizon in REPORT_HORIZONS:
+            if horizon not in summary:
+                continue
+            errors = summary[horizon]
+            line = (
+                f"  h={horizon:<3d} MAE {errors['mae']:6.2f}  RMSE {errors['rmse']:6.2f}  "
+                f"bias {errors['bias']:+6.2f}  coverage {errors['coverage']:6.1%}  n={errors['count']:,}"
+            )
+            if horizon in before:
+                line += f"  (MAE {errors['mae'] - before[horizon]['mae']:+.2f})"
+            self.stdout.write(line)
+
+    def list_runs(self):
+        runs = BacktestRun.objects.filter(seconds__isnull=False).order_by('created_at')
+        if not runs:
+            self.stdout.write("No backtest runs yet")
+            return
+        for run in runs:
+            summary = horizon_summary(run)
+            maes = "  ".join(
+                f"h={horizon} {summary[horizon]['mae']:.2f}" for horizon in REPORT_HORIZONS if horizon in summary
+            )
+            self.stdout.write(
+                f"  {run.pk:4d}  {run.created_at:%Y-%m-%d %H:%M}  {run.units} reactors x {run.origins} cutoffs  "
+                f"MAE {maes}  [{config_diff(PROPHET_CONFIG, run.config) or 'current config'}]"
+            )
+
+
+def config_diff(before, after):
+    return ", ".join(
+        f"{key}={after.get(key)!r}" for key in sorted(set(before) | set(after)) if before.get(key) != after.get(key)
+    )
@@ -0,0 +1,198 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from datetime import timedelta
+from nrc_data import forecast
+from nrc_data.forecast import fit_forecast, render_forecast_html, upload_forecast_html
+from nrc_data.models import Reactor
+from nrc_data.synthetic import BENCH_PREFIX, ensure_partitions, history_days, save_history, synthetic_units
+from prometheus_client import REGISTRY
+from unittest.mock import patch
+import json
+import resource
+import statistics
+import tempfile
+import time
+
+STAGES = ['load+save', 'fit', 'predict', 'render', 'publish']
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+def parse_overrides(pairs):
+    """KEY=VALUE pairs as PROPHET_CONFIG overrides, values parsed as JSON where they can be."""
+    overrides = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition('=')
+        if not sep or key not in forecast.PROPHET_CONFIG:
+            raise CommandError(f"--set expects KEY=VALUE with KEY one of {', '.join(forecast.PROPHET_CONFIG)}")
+        try:
+            overrides[key] = json.loads(value)
+        except ValueError:
+            overrides[key] = value
+    return overrides
+
+
+def last_step_seconds(unit, step):
+    # Set by track_forecast_step inside fit_forecast
+    return REGISTRY.get_sample_value('nrc_forecast_last_step_seconds', {'unit': unit, 'step': step}) or 0.0
+
+
+class Command(BaseCommand):
+    help = "Benchmarks forecast fit/predict/plot/publish and accuracy on synthetic fleets (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--units',
+            type=int,
+            nargs='+',
+            default=[100],
+            help='Fleet sizes to build (default: 100)',
+        )
+        parser.add_argument(
+            '--years',
+            type=float,
+            nargs='+',
+            default=[5],
+            help='History lengths in years (default: 5)',
+        )
+        parser.add_argument(
+            '--holdout',
+            type=int,
+            default=30,
+            help='Most recent days kept out of training and scored against (default: 30)',
+        )
+        parser.add_argument(
+            '--fit-units',
+            type=int,
+            help='Only forecast this many units of each fleet (default: all)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the synthetic histories (default: 0)',
+        )
+        parser.add_argument(
+            '--set',
+            action='append',
+            metavar='KEY=VALUE',
+            help='Override a PROPHET_CONFIG value for the run, can be repeated',
+        )
+        parser.add_argument(
+            '--json',
+            type=str,
+            help='Also write the results to this file',
+        )
+
+    def handle(self, *args, **options):
+        if Reactor.objects.filter(name__startswith=BENCH_PREFIX).exists():
+            raise CommandError(f"{BENCH_PREFIX} reactors already exist (left by an interrupted run?), remove them first")
+        if options['holdout'] < 1:
+            raise CommandError("--holdout must be at least 1 day")
+        if options['holdout'] >= history_days(min(options['years'])):
+            raise CommandError("--holdout must be shorter than the history (--years)")
+        overrides = parse_overrides(options['set'])
+        if overrides:
+            self.stdout.write(f"Config overrides: {overrides}")
+
+        results = []
+        with tempfile.TemporaryDirectory() as plots, patch.dict(forecast.PROPHET_CONFIG, overrides), override_settings(
+            NRC_FORECAST_STORAGE='nrc_data.storage.LocalForecastStorage',
+            NRC_FORECAST_LOCAL_DIR=plots,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            for units in options['units']:
+                for years in options['years']:
+                    results.append(self.run_level(units, years, options))
+
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump({'config': dict(forecast.PROPHET_CONFIG, **overrides), 'results': results}, f, indent=2)
+            self.stdout.write(f"Results written to {options['json']}")
+        self.stdout.write(self.style.SUCCESS("\n🏁 Forecast benchmark complete"))
+
+    def run_level(self, units, years, options):
+        holdout = options['holdout']
+        end_date = timezone.now().date() - timedelta(days=1)
+        cutoff = end_date - timedelta(days=holdout)
+        self.stdout.write(f"\n📈 {units} units x {years:g} years (held out: {holdout} days)")
+
+        timings = {stage: [] for stage in STAGES}
+        errors = []
+        with transaction.atomic():
+            started = time.perf_counter()
+            truth = {}
+            rows = 0
+            for name, region, first_date, powers in synthetic_units(
+                units, years, end_date, options['seed'], prefix=BENCH_PREFIX,
+            ):
+                if not truth:
+                    ensure_partitions(first_date, end_date)
+                split = len(powers) - holdout
+                save_history(name, region, first_date, powers[:split])
+                rows += split
+                truth[name] = {cutoff + timedelta(days=i + 1): power for i, power in enumerate(powers[split:])}
+            build_seconds = time.perf_counter() - started
+            self.stdout.write(f"  Built {rows:,} status rows in {build_seconds:.1f}s")
+
+            names = list(truth)[:options['fit_units']]
+            for name in names:
+                started = time.perf_counter()
+                run = fit_forecast(name, force=True)
+                total = time.perf_counter() - started
+                fit, predict = last_step_seconds(name, 'fit'), last_step_seconds(name, 'predict')
+                timings['fit'].append(fit)
+                timings['predict'].append(predict)
+                timings['load+save'].append(max(total - fit - predict, 0.0))
+
+                started = time.perf_counter()
+                html = render_forecast_html(run)
+                timings['render'].append(time.perf_counter() - started)
+                started = time.perf_counter()
+                upload_forecast_html(run, html)
+                timings['publish'].append(time.perf_counter() - started)
+
+                errors += [
+                    abs(yhat - truth[name][df])
+                    for df, yhat in run.forecasts.values_list('df', 'yhat')
+                    if df in truth[name]
+                ]
+            # Leave the database as it was
+            transaction.set_rollback(True)
+
+        result = {
+            'units': units,
+            'years': years,
+            'rows': rows,
+            'build_seconds': build_seconds,
+            'forecast_units': len(names),
+            'mae': statistics.mean(errors) if errors else None,
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'peak_child_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+            'stages': {},
+        }
+        for stage in STAGES:
+            values = sorted(timings[stage])
+            result['stages'][stage] = {
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'total': sum(values),
+            }
+            self.stdout.write(
+                f"  {stage:10s} p50 {result['stages'][stage]['p50'] * 1000:8.1f} ms  "
+                f"p95 {result['stages'][stage]['p95'] * 1000:8.1f} ms  total {result['stages'][stage]['total']:7.1f}s"
+            )
+        mae = f"{result['mae']:.2f} points" if errors else "n/a"
+        self.stdout.write(
+            f"  MAE {mae} over {len(errors):,} held-out days, peak RSS {result['peak_rss_mb']:.0f} MB "
+            f"(Stan processes {result['peak_child_rss_mb']:.0f} MB)"
+        )
+        return result
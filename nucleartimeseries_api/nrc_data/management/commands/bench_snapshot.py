@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Prefetch
+from nrc_data.models import Reactor, ReactorStatus
+from nrc_data.renderers import ORJSONRenderer
+from nrc_data.serializers import ReactorSerializer, SnapshotSerializer
+from rest_framework.renderers import JSONRenderer
+import time
+
+
+class Command(BaseCommand):
+    help = "Compares snapshot requests/sec for the ModelSerializer path and the fast values()/orjson path"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Report date to serialize (YYYY-MM-DD, default: latest in database)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Snapshots built per path (default: 50)',
+        )
+
+    def handle(self, *args, **options):
+        report_date = options['date']
+        if not report_date:
+            report_date = ReactorStatus.objects.aggregate(Max('report_date'))['report_date__max']
+            if not report_date:
+                raise CommandError("No reactor status data found. Seed the database first.")
+
+        def model_serializers():
+            reactors = Reactor.objects.filter(reactorstatus__report_date=report_date).distinct().prefetch_related(
+                Prefetch(
+                    'reactorstatus',
+                    queryset=ReactorStatus.objects.filter(report_date=report_date).select_related('reason'),
+                    to_attr='statuses_for_date',
+                )
+            )
+            return JSONRenderer().render(ReactorSerializer(reactors, many=True).data)
+
+        def fast_path():
+            return ORJSONRenderer().render(SnapshotSerializer.serialize(SnapshotSerializer.rows(report_date)))
+
+        self.stdout.write(f"Serializing the {report_date} snapshot {options['iterations']} times per path...")
+        results = {}
+        for name, build in (('ModelSerializer + JSONRenderer', model_serializers), ('values() + orjson', fast_path)):
+            build()  # warm up
+            started = time.perf_counter()
+            for _ in range(options['iterations']):
+                body = build()
+            elapsed = time.perf_counter() - started
+            results[name] = options['iterations'] / elapsed
+            self.stdout.write(f"  {name:32s} {results[name]:8.1f} req/s  ({len(body):,} bytes)")
+
+        baseline, fast = results.values()
+        self.stdout.write(self.style.SUCCESS(f"\n🚀 Fast path is {fast / baseline:.1f}x the ModelSerializer throughput"))
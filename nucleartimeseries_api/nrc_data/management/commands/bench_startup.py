@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Libraries only the forecasting / ingestion code paths need. None of them may
+# be imported just by starting a web worker, running manage.py or loading the
+# Celery tasks; they're imported inside the functions that use them.
+HEAVY_MODULES = ('pandas', 'numpy', 'prophet', 'cmdstanpy', 'plotly', 'boto3', 'bs4', 'lxml', 'pyarrow')
+
+# What each kind of process does before it can serve its first request/task
+SCENARIOS = {
+    'web': (
+        "from django.core.wsgi import get_wsgi_application\n"
+        "get_wsgi_application()\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    'manage': (
+        "from django.core.management import execute_from_command_line\n"
+        "execute_from_command_line(['manage.py', 'check'])\n"
+    ),
+    'celery': (
+        "import django\n"
+        "django.setup()\n"
+        "from nucleartimeseries_api.celery import app\n"
+        "app.loader.import_default_modules()\n"
+        "assert 'nrc_data.tasks.fetch_latest_nrc_data' in app.tasks\n"
+    ),
+}
+
+PROBE = """
+import time
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+import json, resource, sys
+print(json.dumps({{
+    'seconds': elapsed,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy': sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def measure(scenario, importtime=False):
+    """Run a scenario in a fresh interpreter; returns its timings and the heavy modules it loaded."""
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'nucleartimeseries_api.settings')
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + [
+        '-c', PROBE.format(code=SCENARIOS[scenario], heavy=HEAVY_MODULES),
+    ]
+    proc = subprocess.run(cmd, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise CommandError(f"{scenario} startup failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if importtime:
+        result['imports'] = parse_importtime(proc.stderr)
+    return result
+
+
+def parse_importtime(stderr):
+    """(cumulative microseconds, module) for the top-level imports in -X importtime output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):  # nested imports are indented by two spaces per level
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)
+
+
+class Command(BaseCommand):
+    help = "Measures cold start of web workers, manage.py and Celery and checks no heavy library is imported"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            choices=list(SCENARIOS),
+            action='append',
+            help='Scenario to measure, can be repeated (default: all)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Fresh processes started per scenario (default: 5)',
+        )
+        parser.add_argument(
+            '--max-seconds',
+            type=float,
+            help='Fail if a scenario\'s median startup is slower than this',
+        )
+        parser.add_argument(
+            '--importtime',
+            type=int,
+            metavar='N',
+            help='Also show the N slowest top-level imports of each scenario',
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+        for scenario in options['scenario'] or SCENARIOS:
+            runs = [measure(scenario) for _ in range(options['repeat'])]
+            seconds = sorted(run['seconds'] for run in runs)
+            median = statistics.median(seconds)
+            heavy = sorted({m for run in runs for m in run['heavy']})
+            self.stdout.write(
+                f"  {scenario:8s} median {median * 1000:7.0f} ms  min {seconds[0] * 1000:7.0f} ms  "
+                f"peak RSS {max(run['rss_mb'] for run in runs):6.1f} MB"
+            )
+            if heavy:
+                failures.append(f"{scenario} imports {', '.join(heavy)}")
+                self.stdout.write(self.style.ERROR(f"    ✗ heavy modules loaded: {', '.join(heavy)}"))
+            if options['max_seconds'] and median > options['max_seconds']:
+                failures.append(f"{scenario} took {median:.2f}s (limit {options['max_seconds']}s)")
+
+            if options['importtime']:
+                for cumulative, name in measure(scenario, importtime=True)['imports'][:options['importtime']]:
+                    self.stdout.write(f"    {cumulative / 1000:7.1f} ms  {name}")
+
+        if failures:
+            raise CommandError("Startup check failed: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("\n🚀 No heavy imports at startup"))
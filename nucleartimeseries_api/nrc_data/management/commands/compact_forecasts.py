@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from nrc_data.forecast_runs import compact_forecast_runs
+
+
+class Command(BaseCommand):
+    help = "Trims old forecast runs down to the horizons kept for accuracy tracking"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full-days',
+            type=int,
+            default=settings.NRC_FORECAST_FULL_DAYS,
+            help='Runs trained within this many days keep every horizon',
+        )
+        parser.add_argument(
+            '--horizons',
+            type=str,
+            default=','.join(str(h) for h in settings.NRC_FORECAST_KEEP_HORIZONS),
+            help='Comma-separated horizons (days ahead) to keep in compacted runs',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        horizons = [int(h) for h in options['horizons'].split(',') if h.strip()]
+        runs, deleted = compact_forecast_runs(
+            full_days=options['full_days'],
+            keep_horizons=horizons,
+            dry_run=options['dry_run'],
+        )
+        verb = "Would compact" if options['dry_run'] else "Compacted"
+        self.stdout.write(self.style.SUCCESS(
+            f"🗜️ {verb} {runs:,} forecast runs, {deleted:,} horizon rows {'to delete' if options['dry_run'] else 'deleted'}"
+        ))
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from nrc_data.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_rows, iter_export, load_pyarrow
+from nrc_data.models import Reactor
+
+
+class Command(BaseCommand):
+    help = "Streams the ReactorStatus history to a CSV or Parquet file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=list(EXPORT_FORMATS),
+            default='csv',
+            help='Output format (default: csv)',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='File to write (default: stdout, CSV only)',
+        )
+        parser.add_argument(
+            '--unit',
+            type=str,
+            help='Only export this unit (e.g. "Beaver Valley 1")',
+        )
+        parser.add_argument(
+            '--region',
+            choices=[code for code, _ in Reactor.REGION_CHOICES],
+            help='Only export reactors in this NRC region',
+        )
+        parser.add_argument(
+            '--start',
+            type=str,
+            help='First report date to export (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--end',
+            type=str,
+            help='Last report date to export (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows fetched per database round trip and per Parquet row group (default: {DEFAULT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format']
+        output = options['output']
+        if file_format == 'parquet':
+            if not output:
+                raise CommandError("--output is required for Parquet exports")
+            try:
+                load_pyarrow()
+            except ImportError as e:
+                raise CommandError(str(e))
+
+        dates = {}
+        for option in ('start', 'end'):
+            dates[option] = parse_date(options[option]) if options[option] else None
+            if options[option] and not dates[option]:
+                raise CommandError(f"--{option} must be a YYYY-MM-DD date")
+
+        rows = export_rows(unit=options['unit'], region=options['region'], **dates)
+        chunks = iter_export(rows, file_format, options['chunk_size'])
+
+        if not output:
+            for chunk in chunks:
+                # CSV only, Parquet needs --output; chunks carry their own newlines
+                self.stdout.write(chunk, ending='')
+            return
+
+        if file_format == 'parquet':
+            f = open(output, 'wb')
+        else:
+            f = open(output, 'w', newline='')
+
+        written = 0
+        with f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"✅ Exported to {output} ({written:,} bytes)"))
@@ -0,0 +1,143 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+from datetime import datetime, timedelta
+from nrc_data.models import Reactor
+from nrc_data.synthetic import SYNTHETIC_PREFIX, FleetPlan, drop_fleet
+import multiprocessing
+import time
+
+# Operating US power reactors, the 1x of --scale
+REAL_FLEET_SIZE = 94
+
+_plan = None
+
+
+def _write_units(indexes):
+    # Runs in a forked worker process with its own database connection
+    return _plan.write_units(indexes)
+
+
+class Command(BaseCommand):
+    help = "Generates a synthetic fleet (reactors, daily status, forecasts, stub outages) for benchmarks and scale tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1,
+            help=f'Fleet size as a multiple of the real fleet ({REAL_FLEET_SIZE} units), e.g. 1, 10, 100 (default: 1)',
+        )
+        parser.add_argument(
+            '--units',
+            type=int,
+            help='Exact number of units, instead of --scale',
+        )
+        parser.add_argument(
+            '--years',
+            type=float,
+            default=26,
+            help='Years of daily history per unit (default: 26, like the real 1999-2025 data)',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            help='Last report date (YYYYMMDD format, default: yesterday)',
+        )
+        parser.add_argument(
+            '--forecast-days',
+            type=int,
+            default=30,
+            help='Most recent days with a forecast run per unit (default: 30)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed; the same seed generates the same fleet (default: 0)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processes writing units in parallel (default: 1)',
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Delete an existing synthetic fleet first',
+        )
+
+    def handle(self, *args, **options):
+        global _plan
+
+        units = options['units'] or round(REAL_FLEET_SIZE * options['scale'])
+        if units < 1:
+            raise CommandError("The fleet needs at least one unit")
+        if options['end_date']:
+            end_date = datetime.strptime(options['end_date'], '%Y%m%d').date()
+        else:
+            end_date = timezone.now().date() - timedelta(days=1)
+
+        if Reactor.objects.filter(name__startswith=SYNTHETIC_PREFIX).exists():
+            if not options['replace']:
+                raise CommandError("A synthetic fleet already exists; pass --replace to regenerate it")
+            self.stdout.write("Deleting the existing synthetic fleet...")
+            self.stdout.write(f"Deleted {drop_fleet()} synthetic units")
+
+        plan = FleetPlan(units, options['years'], end_date, options['forecast_days'], options['seed'])
+        self.stdout.write(
+            f"Generating {units} units x {plan.days:,} days ({units * plan.days:,} status rows) "
+            f"from {plan.first_date} to {end_date}, {'COPY' if connection.vendor == 'postgresql' else 'bulk_create'} path"
+        )
+        started = time.perf_counter()
+        plan.prepare()
+
+        workers = max(1, min(options['workers'], units))
+        chunks = [range(start, min(start + 10, units)) for start in range(0, units, 10)]
+        totals = dict.fromkeys(('statuses', 'runs', 'forecasts', 'outages'), 0)
+        if workers == 1:
+            results = map(plan.write_units, chunks)
+            pool = None
+        else:
+            # Children inherit the plan; each opens its own connection
+            _plan = plan
+            connections.close_all()
+            pool = multiprocessing.get_context('fork').Pool(workers)
+            results = pool.imap_unordered(_write_units, chunks)
+        try:
+            done = 0
+            for counts in results:
+                for key, value in counts.items():
+                    totals[key] += value
+                done += 1
+                if done % 10 == 0 or done == len(chunks):
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"  {min(done * 10, units):6d}/{units} units, {totals['statuses']:,} status rows "
+                        f"({totals['statuses'] / elapsed:,.0f} rows/s)"
+                    )
+        except BaseException:
+            # Don't wait for the other workers to finish their chunks
+            if pool:
+                pool.terminate()
+            raise
+        else:
+            if pool:
+                pool.close()
+        finally:
+            if pool:
+                pool.join()
+                _plan = None
+
+        write_seconds = time.perf_counter() - started
+        self.stdout.write("Updating latest status and fleet summaries...")
+        plan.finish()
+        total_seconds = time.perf_counter() - started
+
+        rows = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(f"\n🏭 Generated {units} synthetic units in {total_seconds:.1f}s"))
+        self.stdout.write(f"Status rows: {totals['statuses']:,}")
+        self.stdout.write(f"Forecast runs: {totals['runs']:,}, forecasts: {totals['forecasts']:,}")
+        self.stdout.write(f"Stub outages: {totals['outages']:,}")
+        self.stdout.write(f"Write throughput: {rows / write_seconds:,.0f} rows/s")
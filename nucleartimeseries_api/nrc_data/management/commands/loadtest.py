@@ -0,0 +1,308 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max
+from django.test import Client
+from django.utils import timezone
+from nrc_data.metrics import count_queries
+from nrc_data.models import Reactor, ReactorStatus
+from nrc_data.synthetic import drop_fleet, seed_fleet
+from nrc_data.views import parse_report_date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.error import HTTPError
+from urllib.request import urlopen
+import json
+import statistics
+import subprocess
+import time
+
+
+def process_rss_mb(pid):
+    """Resident memory of a process and its children in MB (Linux /proc only)."""
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+
+    total_kb = 0
+    for p in pids:
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+# Request paths per endpoint of nrc_data/urls.py, given the prefix, report date and reactor ids
+ENDPOINTS = {
+    'snapshot': lambda prefix, day, ids: [f"{prefix}/reactor/{day}/"],
+    'detail': lambda prefix, day, ids: [f"{prefix}/reactor/{day}/{reactor_id}/" for reactor_id in ids],
+    'batch': lambda prefix, day, ids: [
+        f"{prefix}/reactor/{day}/batch/?region={region}" for region, _ in Reactor.REGION_CHOICES
+    ],
+    'latest': lambda prefix, day, ids: [f"{prefix}/reactor/latest/"],
+    'series': lambda prefix, day, ids: [
+        path
+        for reactor_id in ids
+        for path in (
+            f"{prefix}/reactor/{reactor_id}/series/?start={day - timedelta(days=365)}",
+            f"{prefix}/reactor/{reactor_id}/series/?resolution=monthly",
+        )
+    ],
+    'summary': lambda prefix, day, ids: [f"{prefix}/fleet/summary/?start={day - timedelta(days=90)}"],
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(results, elapsed):
+    latencies = sorted(latency for latency, _, _ in results)
+    queries = [count for _, _, count in results if count is not None]
+    return {
+        'requests': len(latencies),
+        'errors': sum(1 for _, status_code, _ in results if status_code != 200),
+        'rps': len(latencies) / elapsed,
+        # An endpoint can get no requests at all when --requests is below the number of endpoints
+        'mean_ms': statistics.mean(latencies) if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'queries_per_request': statistics.mean(queries) if queries else None,
+    }
+
+
+class Command(BaseCommand):
+    help = "Drives the reactor API endpoints with concurrent requests and reports latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint',
+            choices=list(ENDPOINTS) + ['all'],
+            action='append',
+            help='Endpoint to load, can be repeated; requests alternate between them (default: detail)',
+        )
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Report date to request (YYYY-MM-DD, default: latest in database)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Total number of requests to send (default: 500)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Number of concurrent client threads (default: 8)',
+        )
+        parser.add_argument(
+            '--prefix',
+            type=str,
+            default='/api',
+            help='URL prefix of the API; use /api/async for the async views (default: /api)',
+        )
+        parser.add_argument(
+            '--url',
+            type=str,
+            help='Base URL of a running server (e.g. http://127.0.0.1:8000) instead of the in-process test client',
+        )
+        parser.add_argument(
+            '--server-pid',
+            type=int,
+            help='PID of the server under test (with --url), to report its resident memory',
+        )
+        parser.add_argument(
+            '--synthetic',
+            type=int,
+            metavar='UNITS',
+            help='Seed a synthetic fleet of this many units first (replaces any previous synthetic fleet)',
+        )
+        parser.add_argument(
+            '--years',
+            type=float,
+            default=2,
+            help='History per synthetic unit in years (default: 2)',
+        )
+        parser.add_argument(
+            '--drop-synthetic',
+            action='store_true',
+            help='Delete the synthetic fleet after the run',
+        )
+        parser.add_argument(
+            '--results',
+            type=str,
+            default=settings.NRC_LOADTEST_RESULTS,
+            help='JSON-lines file the results are appended to (default: NRC_LOADTEST_RESULTS)',
+        )
+        parser.add_argument(
+            '--no-save',
+            action='store_true',
+            help="Don't record this run in the results file",
+        )
+
+    def handle(self, *args, **options):
+        day = None
+        if options['date']:
+            # Before seeding, a typo shouldn't cost a fleet build
+            day = parse_report_date(options['date'])
+            if day is None:
+                raise CommandError("--date must be a YYYY-MM-DD date")
+        if options['synthetic']:
+            day = day or timezone.now().date() - timedelta(days=1)
+            self.stdout.write(f"Seeding {options['synthetic']} synthetic units with {options['years']:g} years of history...")
+            started = time.perf_counter()
+            seed_fleet(options['synthetic'], options['years'], day)
+            self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+        if day is None:
+            day = ReactorStatus.objects.aggregate(Max('report_date'))['report_date__max']
+            if not day:
+                raise CommandError("No reactor status data found. Seed the database first (or pass --synthetic).")
+        report_date = day.isoformat()
+
+        endpoints = options['endpoint'] or ['detail']
+        if 'all' in endpoints:
+            endpoints = list(ENDPOINTS)
+        endpoints = list(dict.fromkeys(endpoints))
+        reactor_ids = list(ReactorStatus.objects.filter(report_date=day).values_list('reactor_id', flat=True))
+        if not reactor_ids:
+            raise CommandError(f"No reactors reported on {report_date}")
+        prefix = options['prefix'].rstrip('/')
+        paths = {endpoint: ENDPOINTS[endpoint](prefix, day, reactor_ids) for endpoint in endpoints}
+
+        total = options['requests']
+        concurrency = options['concurrency']
+        base_url = options['url'].rstrip('/') if options['url'] else None
+        server_pid = options['server_pid']
+        self.stdout.write(
+            f"Sending {total} requests ({', '.join(endpoints)}) to {base_url or 'the test client'}{prefix} "
+            f"for {report_date} with concurrency {concurrency}..."
+        )
+        if server_pid:
+            rss_before = process_rss_mb(server_pid)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            batches = [range(i, total, concurrency) for i in range(concurrency)]
+            results = list(pool.map(lambda batch: self.run_batch(batch, endpoints, paths, base_url), batches))
+        elapsed = time.perf_counter() - started
+        results = [result for batch in results for result in batch]
+
+        by_endpoint = {
+            endpoint: summarize([result[1:] for result in results if result[0] == endpoint], elapsed)
+            for endpoint in endpoints
+        }
+        overall = summarize([result[1:] for result in results], elapsed)
+
+        self.stdout.write(self.style.SUCCESS("\n📊 Load test results:"))
+        for name, stats in list(by_endpoint.items()) + ([('all', overall)] if len(endpoints) > 1 else []):
+            queries = f"{stats['queries_per_request']:.1f}" if stats['queries_per_request'] is not None else 'n/a'
+            self.stdout.write(
+                f"  {name:9s} {stats['requests']:6d} req  {stats['errors']:4d} errors  {stats['rps']:8.1f} req/s  "
+                f"p50 {stats['p50_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  p99 {stats['p99_ms']:7.2f} ms  "
+                f"{queries} queries/req"
+            )
+        server_rss = None
+        if server_pid:
+            server_rss = process_rss_mb(server_pid)
+            self.stdout.write(f"Server RSS: {rss_before:.1f} MB before, {server_rss:.1f} MB after")
+
+        if not options['no_save']:
+            self.save_results(options['results'], {
+                'timestamp': timezone.now().isoformat(),
+                'revision': git_revision(),
+                'target': 'url' if base_url else 'test-client',
+                'prefix': prefix,
+                'report_date': report_date,
+                'concurrency': concurrency,
+                'mix': endpoints,
+                'synthetic_units': options['synthetic'],
+                'endpoints': by_endpoint,
+                'overall': overall,
+                'server_rss_mb': server_rss,
+            })
+
+        if options['drop_synthetic']:
+            self.stdout.write(f"Dropped {drop_fleet()} synthetic units")
+
+    def save_results(self, path, record):
+        """Append the run and compare it with the last comparable one (same target, prefix, concurrency and endpoints)."""
+        previous = None
+        try:
+            with open(path) as f:
+                for line in f:
+                    old = json.loads(line)
+                    if all(old.get(key) == record[key] for key in ('target', 'prefix', 'concurrency', 'mix')):
+                        previous = old
+        except FileNotFoundError:
+            pass
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        self.stdout.write(f"Results appended to {path}")
+
+        if not previous:
+            return
+        self.stdout.write(f"\nCompared with {previous['revision'] or 'the previous run'} ({previous['timestamp'][:16]}):")
+        for endpoint, stats in record['endpoints'].items():
+            old = previous['endpoints'].get(endpoint)
+            if not old:
+                continue
+            changes = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'rps'):
+                if old[key]:
+                    changes.append(f"{key.replace('_ms', '')} {(stats[key] - old[key]) / old[key] * 100:+.0f}%")
+            self.stdout.write(f"  {endpoint:9s} {'  '.join(changes)}")
+
+    def run_batch(self, batch, endpoints, paths, base_url=None):
+        """Send the requests in `batch` sequentially from one thread; requests alternate between the endpoints."""
+        client = Client(HTTP_HOST='localhost')
+        results = []
+        try:
+            for i in batch:
+                endpoint = endpoints[i % len(endpoints)]
+                endpoint_paths = paths[endpoint]
+                path = endpoint_paths[(i // len(endpoints)) % len(endpoint_paths)]
+                started = time.perf_counter()
+                if base_url:
+                    status_code, queries = self.fetch(base_url + path), None
+                else:
+                    # Counts this thread's queries only, i.e. this request's
+                    with count_queries() as counter:
+                        status_code = client.get(path).status_code
+                    queries = counter.count
+                results.append((endpoint, (time.perf_counter() - started) * 1000, status_code, queries))
+        finally:
+            # Each thread opened its own database connection
+            connections.close_all()
+        return results
+
+    def fetch(self, url):
+        try:
+            with urlopen(url, timeout=30) as response:
+                response.read()
+                return response.status
+        except HTTPError as e:
+            return e.code
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from nrc_data.aggregates import rebuild_summaries
+import time
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily fleet/regional aggregates from ReactorStatus"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            type=str,
+            help='First report date to rebuild (YYYY-MM-DD, default: start of history)',
+        )
+        parser.add_argument(
+            '--end',
+            type=str,
+            help='Last report date to rebuild (YYYY-MM-DD, default: end of history)',
+        )
+
+    def handle(self, *args, **options):
+        dates = {}
+        for option in ('start', 'end'):
+            dates[option] = parse_date(options[option]) if options[option] else None
+            if options[option] and not dates[option]:
+                raise CommandError(f"--{option} must be a YYYY-MM-DD date")
+
+        started = time.perf_counter()
+        written = rebuild_summaries(**dates)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {written:,} daily summary rows in {elapsed:.1f}s"))
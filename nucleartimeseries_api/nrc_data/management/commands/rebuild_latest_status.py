@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from nrc_data.latest import refresh_latest_status
+import time
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the latest-status snapshot row of every reactor"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = refresh_latest_status()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"✅ Refreshed {written:,} latest-status rows in {elapsed:.1f}s"))
@@ -1,12 +1,19 @@
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.db import models
-from nrc_data.models import ReactorStatus, Reactor
+from nrc_data.models import ReactorStatus, Reactor, OutageReason
+from nrc_data.cache import invalidate_date
+from nrc_data.aggregates import refresh_daily_summary
+from nrc_data.latest import refresh_latest_status
+from nrc_data.partitions import ensure_partition, is_partitioned, reload_partition
+from nrc_data.routers import ingest_scopes, pin_primary
+from nrc_data.ingest import ReportNotPublished, fetch_report_html, parse_report_html
+from nrc_data.profiling import profiled
+from nrc_data.regions import region_for_unit
 from django.utils import timezone
 from datetime import datetime, timedelta
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
 import time
 import re
 from typing import Optional
@@ -58,9 +65,28 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what dates would be processed without actually scraping',
         )
+        parser.add_argument(
+            '--reload',
+            action='store_true',
+            help='Truncate and re-ingest each year in the range (partitioned PostgreSQL table only)',
+        )
+        parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Run under cProfile and print the hottest functions at the end',
+        )
+        parser.add_argument(
+            '--profile-dir',
+            type=str,
+            help='Where to write the profile (default: NRC_PROFILE_DIR)',
+        )
 
     def handle(self, *args, **options):
         """Main command handler."""
+        with profiled('seed', enabled=options['profile'], directory=options['profile_dir'], log=self.stdout.write):
+            self.seed(options)
+
+    def seed(self, options):
         self.setup_session()
         
         start_year = options['start_year']
@@ -75,6 +101,12 @@ class Command(BaseCommand):
         # Store verbose flag for use in other methods
         self._verbose = verbose
 
+        if options['reload']:
+            if resume_from or max_dates:
+                raise CommandError("--reload replaces whole years; it can't be combined with --resume-from or --max-dates")
+            if not is_partitioned() and not dry_run:
+                raise CommandError("--reload needs the year-partitioned ReactorStatus table (PostgreSQL)")
+
         # Clear existing data if requested
         if clear_existing and not dry_run:
             self.stdout.write("Clearing existing reactor status data...")
@@ -106,6 +138,11 @@ class Command(BaseCommand):
             if len(dates) > 20:
                 self.stdout.write(f"  ... and {len(dates) - 20} more dates")
             return
+
+        if options['reload']:
+            self.reload_years(dates, delay)
+            self.show_database_stats()
+            return
         
         # Process dates
         successful = 0
@@ -181,6 +218,30 @@ class Command(BaseCommand):
         # Show database stats
         self.show_database_stats()
 
+    def reload_years(self, dates, delay):
+        """Re-ingest whole years, truncating each year's partition and reloading it."""
+        dates_by_year = {}
+        for date_str in dates:
+            dates_by_year.setdefault(date_str[:4], []).append(date_str)
+
+        for year, year_dates in dates_by_year.items():
+            # Fetch everything first so the partition is only locked while rows are written
+            self.stdout.write(f"Fetching {len(year_dates)} reports for {year}...")
+            frames = []
+            for date_str in year_dates:
+                reactor_df = self.fetch_nrc_reactor_status(year, date_str)
+                if reactor_df is not None and not reactor_df.empty:
+                    frames.append((date_str, reactor_df))
+                time.sleep(delay)
+
+            if not frames:
+                self.stdout.write(self.style.WARNING(f"No reports fetched for {year}, leaving its partition alone"))
+                continue
+
+            with reload_partition(year):
+                total = sum(self.save_dataframe_to_db(df, date_str) for date_str, df in frames)
+            self.stdout.write(self.style.SUCCESS(f"🔁 Reloaded {year}: {total:,} records from {len(frames)} reports"))
+
     def setup_session(self):
         """Set up requests session with proper headers."""
         self.session = requests.Session()
@@ -222,90 +283,33 @@ class Command(BaseCommand):
         Returns:
             pandas DataFrame or None if failed
         """
-        url = f"https://www.nrc.gov/reading-rm/doc-collections/event-status/reactor-status/{year}/{date}ps.html"
-        
+        verbose = hasattr(self, '_verbose') and self._verbose
         try:
-            response = requests.get(url, timeout=60)  # Increased timeout
-            response.raise_for_status()
+            html = fetch_report_html(date)
+        except ReportNotPublished:
+            if verbose:
+                self.stdout.write(self.style.WARNING(f"No report published for {date} - 404 error"))
+            return None
         except requests.exceptions.RequestException as e:
             # Store more detailed error info for debugging
-            if hasattr(self, '_verbose') and self._verbose:
-                if "404" in str(e):
-                    self.stdout.write(self.style.WARNING(f"No report published for {date} - 404 error"))
-                elif "timeout" in str(e).lower():
+            if verbose:
+                if "timeout" in str(e).lower():
                     self.stdout.write(self.style.ERROR(f"Timeout fetching {date}"))
                 else:
                     self.stdout.write(self.style.ERROR(f"Network error for {date}: {e}"))
             return None
 
         try:
-            # Use exact same approach as Extract.ipynb
-            soup = BeautifulSoup(response.text, 'lxml')
-
-            # Debug: Check what we found
-            all_tables = soup.find_all('table', class_='power')
-            if hasattr(self, '_verbose') and self._verbose:
-                self.stdout.write(f"Found {len(all_tables)} table(s) on {date}")
-
-            # Try to find 6-column tables first (preferred format)
-            all_rows = []
-            six_col_tables = 0
-            for i, table in enumerate(all_tables):
-                rows = table.find_all('tr')[1:]  # Skip header
-                six_col_rows = []
-                for row in rows:
-                    cells = [td.get_text(strip=True) for td in row.find_all('td')]
-                    if len(cells) == 6:
-                        all_rows.append(cells)
-                        six_col_rows.append(cells)
-                
-                if six_col_rows:
-                    six_col_tables += 1
-                    if hasattr(self, '_verbose') and self._verbose:
-                        self.stdout.write(f"  Table {i+1}: {len(six_col_rows)} rows with 6 columns")
-
-            # If no 6-column tables found, try 2-column tables (simplified format)
-            if not all_rows:
-                if hasattr(self, '_verbose') and self._verbose:
-                    self.stdout.write(f"No 6-column tables found, trying 2-column format...")
-                
-                two_col_tables = 0
-                for i, table in enumerate(all_tables):
-                    rows = table.find_all('tr')[1:]  # Skip header
-                    two_col_rows = []
-                    for row in rows:
-                        cells = [td.get_text(strip=True) for td in row.find_all('td')]
-                        if len(cells) == 2:
-                            # Convert 2-column to 6-column format with defaults
-                            unit, power = cells
-                            expanded_row = [unit, power, '', '', '', '']  # Add empty fields for Down, Reason, Change, Scrams
-                            all_rows.append(expanded_row)
-                            two_col_rows.append(expanded_row)
-                    
-                    if two_col_rows:
-                        two_col_tables += 1
-                        if hasattr(self, '_verbose') and self._verbose:
-                            self.stdout.write(f"  Table {i+1}: {len(two_col_rows)} rows with 2 columns (converted to 6)")
-
-            if not all_rows:
-                if hasattr(self, '_verbose') and self._verbose:
-                    self.stdout.write(self.style.WARNING(f"No reactor tables found for {date} (found {len(all_tables)} tables total)"))
-                return None
-
-            df = pd.DataFrame(all_rows, columns=['Unit', 'Power', 'Down', 'Reason', 'Change', 'Scrams'])
-            df.replace('', pd.NA, inplace=True)
-            
-            if hasattr(self, '_verbose') and self._verbose:
-                format_type = "6-column" if six_col_tables > 0 else "2-column"
-                self.stdout.write(f"Successfully parsed {len(df)} reactor rows for {date} using {format_type} format")
-            
-            return df
-            
+            df = parse_report_html(html, log=self.stdout.write if verbose else None)
         except Exception as e:
-            if hasattr(self, '_verbose') and self._verbose:
+            if verbose:
                 self.stdout.write(self.style.ERROR(f"Parsing error for {date}: {e}"))
             return None
 
+        if df is None and verbose:
+            self.stdout.write(self.style.WARNING(f"No reactor tables found for {date}"))
+        return df
+
     def normalize_unit_name(self, unit_name: str) -> str:
         """
         Normalize reactor unit names to a consistent format within 30-character limit.
@@ -395,26 +399,11 @@ class Command(BaseCommand):
     def save_dataframe_to_db(self, df: pd.DataFrame, date_str: str) -> int:
         """Convert DataFrame to Django models and save."""
         saved_count = 0
+        saved_reactor_ids = []
+        reason_ids = {}  # Interned reason text -> OutageReason id, for this report
         report_date = datetime.strptime(date_str, '%Y%m%d').date()
+        ensure_partition(report_date.year)
         
-        # Determine region based on table order (Region 1, 2, 3, 4)
-        region_mapping = {
-            'Beaver Valley': 'I', 'Calvert Cliffs': 'I', 'FitzPatrick': 'I', 'Ginna': 'I',
-            'Hope Creek': 'I', 'Limerick': 'I', 'Millstone': 'I', 'Nine Mile Point': 'I',
-            'Peach Bottom': 'I', 'Salem': 'I', 'Seabrook': 'I', 'Susquehanna': 'I',
-            'Browns Ferry': 'II', 'Brunswick': 'II', 'Catawba': 'II', 'Farley': 'II',
-            'Harris': 'II', 'Hatch': 'II', 'McGuire': 'II', 'North Anna': 'II',
-            'Oconee': 'II', 'Robinson': 'II', 'Saint Lucie': 'II', 'Sequoyah': 'II',
-            'Summer': 'II', 'Surry': 'II', 'Turkey Point': 'II', 'Vogtle': 'II',
-            'Watts Bar': 'II', 'Braidwood': 'III', 'Byron': 'III', 'Clinton': 'III',
-            'D.C. Cook': 'III', 'Davis-Besse': 'III', 'Dresden': 'III', 'Fermi': 'III',
-            'LaSalle': 'III', 'Monticello': 'III', 'Perry': 'III', 'Point Beach': 'III',
-            'Prairie Island': 'III', 'Quad Cities': 'III', 'Arkansas Nuclear': 'IV',
-            'Callaway': 'IV', 'Columbia Generating Station': 'IV', 'Comanche Peak': 'IV',
-            'Cooper': 'IV', 'Diablo Canyon': 'IV', 'Grand Gulf': 'IV', 'Palo Verde': 'IV',
-            'River Bend Station': 'IV', 'South Texas': 'IV', 'Waterford': 'IV', 'Wolf Creek': 'IV'
-        }
-
         with transaction.atomic():
             for _, row in df.iterrows():
                 try:
@@ -431,11 +420,7 @@ class Command(BaseCommand):
                         continue  # Skip this record
                     
                     # Determine region using normalized name
-                    region = 'I'  # default
-                    for plant_name, plant_region in region_mapping.items():
-                        if plant_name.lower() in normalized_unit.lower():
-                            region = plant_region
-                            break
+                    region = region_for_unit(normalized_unit)
                     
                     # Parse data
                     power = int(row['Power']) if pd.notna(row['Power']) else 0
@@ -450,27 +435,33 @@ class Command(BaseCommand):
                     
                     # Parse other fields
                     reason = row['Reason'] if pd.notna(row['Reason']) else None
+                    if reason and reason not in reason_ids:
+                        reason_ids[reason] = OutageReason.objects.get_or_create(text=reason)[0].id
                     changed = bool(pd.notna(row['Change']) and '*' in str(row['Change']))
                     scrams = int(row['Scrams']) if pd.notna(row['Scrams']) and str(row['Scrams']).isdigit() else None
 
                     # Get or create reactor
-                    reactor, created = Reactor.objects.get_or_create(name=normalized_unit)
+                    reactor, created = Reactor.objects.get_or_create(name=normalized_unit, defaults={'region': region})
+                    if not reactor.region:
+                        # Reactors created before regions were recorded
+                        reactor.region = region
+                        reactor.save(update_fields=['region'])
                     
                     reactor_status, created = ReactorStatus.objects.get_or_create(
                         report_date=report_date,
-                        unit=normalized_unit,  # Use normalized unit name
+                        reactor=reactor,  # Reactor.name is the normalized unit name
                         defaults={
                             'power': power,
                             'down_date': down_date,
-                            'reason': reason,
+                            'reason_id': reason_ids.get(reason),
                             'changed': changed,
                             'scrams': scrams,
-                            'reactor_id': reactor.id,
                         }
                     )
                     
                     if created:
                         saved_count += 1
+                        saved_reactor_ids.append(reactor.id)
                         
                 except Exception as e:
                     # More detailed error logging
@@ -478,7 +469,16 @@ class Command(BaseCommand):
                     if 'normalized_unit' in locals():
                         unit_info += f" (normalized: '{normalized_unit}', {len(normalized_unit)} chars)"
                     self.stdout.write(self.style.ERROR(f"Error saving {unit_info}: {e}"))
-        
+
+        # Cached API responses, the daily aggregates and possibly the
+        # latest-status rows of these reactors are now stale, and the replica
+        # may not have the new rows yet
+        if saved_count > 0:
+            pin_primary(ingest_scopes(report_date, saved_reactor_ids))
+            refresh_daily_summary(report_date)
+            refresh_latest_status(saved_reactor_ids)
+            invalidate_date(report_date)
+
         return saved_count
 
     def show_database_stats(self):
@@ -494,10 +494,10 @@ class Command(BaseCommand):
             max_date=models.Max('report_date')
         )
         
-        unique_units = ReactorStatus.objects.values('unit').distinct().count()
+        unique_units = ReactorStatus.objects.values('reactor').distinct().count()
         
         # Recent data sample
-        recent_data = ReactorStatus.objects.filter(
+        recent_data = ReactorStatus.objects.select_related('reactor', 'reason').filter(
             report_date=ReactorStatus.objects.aggregate(
                 max_date=models.Max('report_date')
             )['max_date']
@@ -511,6 +511,6 @@ class Command(BaseCommand):
         if recent_data:
             self.stdout.write(f"\nSample recent data:")
             for reactor in recent_data:
-                reason_str = f" ({reactor.reason})" if reactor.reason else ""
-                self.stdout.write(f"  {reactor.unit}: {reactor.power}%{reason_str}")
+                reason_str = f" ({reactor.reason.text})" if reactor.reason else ""
+                self.stdout.write(f"  {reactor.reactor.name}: {reactor.power}%{reason_str}")
     
\ No newline at end of file
@@ -0,0 +1,111 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+import json
+
+
+# The relation itself plus its partitions, if it's a partitioned table or index
+RELATIONS_SQL = "SELECT relid FROM pg_partition_tree(%s::regclass) UNION SELECT %s::regclass"
+
+
+def relation_size(cursor, relation, size_function):
+    # Partitioned tables and indexes have no storage of their own; sum their partitions
+    cursor.execute(f"SELECT COALESCE(SUM({size_function}(relid)), 0) FROM ({RELATIONS_SQL}) t", [relation, relation])
+    return int(cursor.fetchone()[0])
+
+
+def collect_sizes():
+    """Row estimate, heap size and per-index sizes in bytes of each nrc_data table."""
+    sizes = {}
+    with connection.cursor() as cursor:
+        for model in apps.get_app_config('nrc_data').get_models():
+            table = model._meta.db_table
+            cursor.execute(
+                f"SELECT COALESCE(SUM(c.reltuples), 0) FROM ({RELATIONS_SQL}) t "
+                "JOIN pg_class c ON c.oid = t.relid WHERE c.relkind = 'r' AND c.reltuples > 0",
+                [table, table],
+            )
+            rows = int(cursor.fetchone()[0])
+            cursor.execute(
+                "SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = %s::regclass ORDER BY 1",
+                [table],
+            )
+            indexes = {name: relation_size(cursor, name, 'pg_relation_size') for name, in cursor.fetchall()}
+            sizes[table] = {
+                'rows': rows,
+                'table': relation_size(cursor, table, 'pg_table_size'),
+                'indexes': indexes,
+            }
+    return sizes
+
+
+def megabytes(size):
+    return f"{size / 1024 / 1024:8.2f} MB"
+
+
+class Command(BaseCommand):
+    help = "Reports table and index sizes of the nrc_data tables, optionally against a saved report"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--save',
+            type=str,
+            help='Write the report to this JSON file (e.g. before a migration)',
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            help='Compare against a report saved earlier with --save',
+        )
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help='VACUUM ANALYZE the tables first so sizes and row counts are current',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Table sizes are only reported for PostgreSQL")
+
+        if options['vacuum']:
+            with connection.cursor() as cursor:
+                for model in apps.get_app_config('nrc_data').get_models():
+                    cursor.execute(f"VACUUM ANALYZE {model._meta.db_table}")
+
+        sizes = collect_sizes()
+        before = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                before = json.load(f)
+
+        self.stdout.write(self.style.SUCCESS("📦 nrc_data table sizes:"))
+        for table, size in sizes.items():
+            total = size['table'] + sum(size['indexes'].values())
+            line = f"{table:40s} {size['rows']:>10,} rows  table {megabytes(size['table'])}  total {megabytes(total)}"
+            if before and table in before:
+                old = before[table]
+                old_total = old['table'] + sum(old['indexes'].values())
+                line += f"  (was {megabytes(old_total).strip()}{self.change(old_total, total)})"
+            self.stdout.write(line)
+            for index, index_size in size['indexes'].items():
+                line = f"    {index:56s} {megabytes(index_size)}"
+                if before and index in before.get(table, {}).get('indexes', {}):
+                    line += self.change(before[table]['indexes'][index], index_size)
+                self.stdout.write(line)
+
+        if before:
+            old_total = sum(t['table'] + sum(t['indexes'].values()) for t in before.values())
+            new_total = sum(t['table'] + sum(t['indexes'].values()) for t in sizes.values())
+            self.stdout.write(self.style.SUCCESS(
+                f"\nAll tables: {megabytes(old_total).strip()} -> {megabytes(new_total).strip()}{self.change(old_total, new_total)}"
+            ))
+
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump(sizes, f, indent=2)
+            self.stdout.write(f"Saved report to {options['save']}")
+
+    def change(self, old, new):
+        if not old:
+            return ""
+        return f", {(new - old) / old * 100:+.1f}%"
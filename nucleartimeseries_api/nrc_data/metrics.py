@@ -0,0 +1,196 @@
+import hmac
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics for the ingestion pipeline, forecasting and the API.
+#
+# The API serves them at /metrics, to the scraper only (see metrics_view);
+# Celery workers start their own exporter on NRC_WORKER_METRICS_PORT (see
+# nucleartimeseries_api/celery.py). With several processes per host
+# (gunicorn/uvicorn workers, prefork Celery) set PROMETHEUS_MULTIPROC_DIR so
+# every process writes to it and the exporter aggregates them.
+
+STAGE_SECONDS = Histogram(
+    'nrc_stage_duration_seconds', 'Run time of an ingestion or forecasting stage', ['stage'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+STAGE_QUERIES = Histogram(
+    'nrc_stage_db_queries', 'Database queries run by a stage', ['stage'],
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+)
+STAGE_FAILURES = Counter('nrc_stage_failures_total', 'Stages that raised', ['stage'])
+
+ROWS_SAVED = Counter('nrc_rows_saved_total', 'ReactorStatus rows written by ingestion')
+SAVE_ROWS_PER_SECOND = Gauge('nrc_save_rows_per_second', 'Throughput of the last save stage', multiprocess_mode='mostrecent')
+
+FORECAST_SECONDS = Histogram(
+    'nrc_forecast_step_seconds', 'Prophet fit/predict time per reactor', ['step'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 60, 120),
+)
+# Per-unit values as gauges, so slow reactors stand out without a histogram per unit
+FORECAST_LAST_SECONDS = Gauge(
+    'nrc_forecast_last_step_seconds', 'Last Prophet fit/predict time', ['unit', 'step'], multiprocess_mode='mostrecent',
+)
+
+ARTIFACT_BYTES = Histogram(
+    'nrc_artifact_bytes', 'Size of fetched reports and rendered plots', ['kind'],
+    buckets=(1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7),
+)
+
+TASK_SECONDS = Histogram(
+    'nrc_task_duration_seconds', 'Celery task run time', ['task'],
+    buckets=(0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+TASKS = Counter('nrc_tasks_total', 'Celery task outcomes', ['task', 'state'])
+
+REQUEST_SECONDS = Histogram(
+    'nrc_api_request_duration_seconds', 'API response time', ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    'nrc_api_request_db_queries', 'Database queries per API request (sync views)', ['route'],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts the queries run through it."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries():
+    """Count queries on every database alias (primary and replica) in this thread."""
+    queries = QueryCounter()
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(queries))
+        yield queries
+
+
+@contextmanager
+def track_stage(stage):
+    started = time.perf_counter()
+    try:
+        with count_queries() as queries:
+            yield
+    except Exception:
+        STAGE_FAILURES.labels(stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+        STAGE_QUERIES.labels(stage).observe(queries.count)
+
+
+@contextmanager
+def track_forecast_step(unit, step):
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    FORECAST_SECONDS.labels(step).observe(elapsed)
+    FORECAST_LAST_SECONDS.labels(unit, step).set(elapsed)
+
+
+def record_rows_saved(rows, seconds):
+    ROWS_SAVED.inc(rows)
+    if seconds > 0:
+        SAVE_ROWS_PER_SECOND.set(rows / seconds)
+
+
+def registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        collected = CollectorRegistry()
+        multiprocess.MultiProcessCollector(collected)
+        return collected
+    return REGISTRY
+
+
+def scraper_allowed(request):
+    token = settings.NRC_METRICS_TOKEN
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return True
+    return request.META.get('REMOTE_ADDR') in settings.NRC_METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    # Only for the Prometheus scraper: a bearer token or an allowed address
+    # (NRC_METRICS_TOKEN / NRC_METRICS_ALLOWED_IPS), with neither set it's off
+    if not scraper_allowed(request):
+        raise Http404()
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def start_worker_metrics_server():
+    port = settings.NRC_WORKER_METRICS_PORT
+    if not port:
+        return
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        # worker_init runs in the prefork parent, the tasks record in the pool children
+        logger.warning(
+            "NRC_WORKER_METRICS_PORT is set without PROMETHEUS_MULTIPROC_DIR: under the prefork pool "
+            "the exporter only sees the parent process, not the task metrics of its children"
+        )
+    start_http_server(port, registry=registry())
+
+
+# Celery signal handlers, connected in nucleartimeseries_api/celery.py
+
+_task_started = {}
+
+
+def task_started(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_SECONDS.labels(task.name).observe(time.perf_counter() - started)
+    TASKS.labels(task.name, state or 'UNKNOWN').inc()
+
+
+def _route(request):
+    # The URL pattern, not the path, so IDs and dates don't explode the label set
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match else 'unmatched'
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = time.perf_counter()
+            response = await get_response(request)
+            REQUEST_SECONDS.labels(request.method, _route(request), response.status_code).observe(
+                time.perf_counter() - started
+            )
+            return response
+    else:
+        def middleware(request):
+            started = time.perf_counter()
+            with count_queries() as queries:
+                response = get_response(request)
+            route = _route(request)
+            REQUEST_SECONDS.labels(request.method, route, response.status_code).observe(time.perf_counter() - started)
+            REQUEST_QUERIES.labels(route).observe(queries.count)
+            return response
+    return middleware
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0011_alter_reactorstatus_reactor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FleetDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_date', models.DateField()),
+                ('region', models.CharField(choices=[('I', 'Region I'), ('II', 'Region II'), ('III', 'Region III'), ('IV', 'Region IV')], max_length=3)),
+                ('unit_count', models.IntegerField()),
+                ('power_total', models.IntegerField()),
+                ('avg_power', models.FloatField()),
+                ('units_at_zero', models.IntegerField()),
+                ('units_changed', models.IntegerField()),
+                ('scram_total', models.IntegerField()),
+            ],
+            options={
+                'unique_together': {('report_date', 'region')},
+            },
+        ),
+    ]
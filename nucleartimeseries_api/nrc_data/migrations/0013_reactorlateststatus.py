@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0012_fleetdailysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReactorLatestStatus',
+            fields=[
+                ('reactor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='latest_status', serialize=False, to='nrc_data.reactor')),
+                ('report_date', models.DateField()),
+                ('power', models.IntegerField()),
+                ('down_date', models.DateField(blank=True, null=True)),
+                ('reason', models.CharField(blank=True, max_length=255, null=True)),
+                ('forecast_date', models.DateField(blank=True, null=True)),
+                ('yhat', models.FloatField(blank=True, null=True)),
+                ('yhat_lower', models.FloatField(blank=True, null=True)),
+                ('yhat_upper', models.FloatField(blank=True, null=True)),
+                ('stuboutage', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
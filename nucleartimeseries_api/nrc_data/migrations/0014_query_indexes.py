@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0013_reactorlateststatus'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reactorforecast',
+            index=models.Index(fields=['reactor', 'df'], include=('yhat', 'yhat_lower', 'yhat_upper'), name='forecast_reactor_df_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reactorstatus',
+            index=models.Index(fields=['unit', 'report_date'], include=('power',), name='status_unit_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reactorstatus',
+            index=models.Index(fields=['reactor', 'report_date'], include=('power',), name='status_reactor_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stuboutage',
+            index=models.Index(fields=['reactor', 'date_detected'], name='stuboutage_reactor_date_idx'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:08
+
+import django.db.models.deletion
+from datetime import date
+from django.db import migrations, models
+
+TABLE = 'nrc_data_reactorstatus'
+
+# Data goes back to 1999; partitions up to next year are created up front
+FIRST_YEAR = 1999
+
+
+def table_ddl(cursor):
+    """Constraints and indexes of the status table other than its primary key."""
+    cursor.execute("""
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('u', 'f', 'c')
+    """, [TABLE])
+    constraints = cursor.fetchall()
+    cursor.execute("""
+        SELECT indexdef FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = %s
+          AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)
+    """, [TABLE, TABLE])
+    indexes = [indexdef for indexdef, in cursor.fetchall()]
+    return constraints, indexes
+
+
+def rebuild(cursor, partition_by, primary_key, create_children):
+    """Copy the status table into a new one, recreating its constraints and indexes afterwards."""
+    constraints, indexes = table_ddl(cursor)
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old")
+    cursor.execute(f"CREATE TABLE {TABLE} (LIKE {TABLE}_old) {partition_by}")
+    create_children(cursor)
+    cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_old")
+    cursor.execute(f"DROP TABLE {TABLE}_old")
+
+    # Identity columns aren't allowed on partitioned tables before PG 17, so
+    # ids come from a plain sequence in both directions
+    cursor.execute(f"CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+    cursor.execute(f"SELECT setval('{TABLE}_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}")
+    cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')")
+    cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({primary_key})")
+    for name, definition in constraints:
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def partition_reactorstatus(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    def create_partitions(cursor):
+        cursor.execute(f"SELECT EXTRACT(YEAR FROM MIN(report_date))::int, EXTRACT(YEAR FROM MAX(report_date))::int FROM {TABLE}_old")
+        first, last = cursor.fetchone()
+        first = min(first or FIRST_YEAR, FIRST_YEAR)
+        last = max(last or date.today().year, date.today().year) + 1
+        for year in range(first, last + 1):
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_y{year} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+
+    with schema_editor.connection.cursor() as cursor:
+        # Unique constraints on a partitioned table must include the partition key
+        rebuild(cursor, 'PARTITION BY RANGE (report_date)', 'id, report_date', create_partitions)
+
+
+def unpartition_reactorstatus(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        rebuild(cursor, '', 'id', lambda cursor: None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0014_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reactorforecast',
+            name='reactorstatus',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='nrc_data.reactorstatus'),
+        ),
+        migrations.AlterField(
+            model_name='stuboutage',
+            name='reactorstatus',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='nrc_data.reactorstatus'),
+        ),
+        migrations.RunPython(partition_reactorstatus, unpartition_reactorstatus),
+    ]
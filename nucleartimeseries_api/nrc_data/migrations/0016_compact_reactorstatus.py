@@ -0,0 +1,118 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def flush_deferred_checks(schema_editor):
+    # Pending deferred FK checks would block the ALTER TABLEs that follow in
+    # this transaction on PostgreSQL
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+def intern_reasons(apps, schema_editor):
+    ReactorStatus = apps.get_model('nrc_data', 'ReactorStatus')
+    OutageReason = apps.get_model('nrc_data', 'OutageReason')
+
+    texts = ReactorStatus.objects.exclude(reason__isnull=True).exclude(reason='').values_list('reason', flat=True).distinct()
+    OutageReason.objects.bulk_create([OutageReason(text=text) for text in texts], batch_size=1000)
+    # One UPDATE with a lookup on the unique text index, not one per reason
+    ReactorStatus.objects.exclude(reason__isnull=True).exclude(reason='').update(
+        reason_code=Subquery(OutageReason.objects.filter(text=OuterRef('reason')).values('id')[:1])
+    )
+    flush_deferred_checks(schema_editor)
+
+
+def restore_reasons(apps, schema_editor):
+    ReactorStatus = apps.get_model('nrc_data', 'ReactorStatus')
+    OutageReason = apps.get_model('nrc_data', 'OutageReason')
+    ReactorStatus.objects.exclude(reason_code__isnull=True).update(
+        reason=Subquery(OutageReason.objects.filter(id=OuterRef('reason_code')).values('text')[:1])
+    )
+    flush_deferred_checks(schema_editor)
+
+
+def link_units(apps, schema_editor):
+    ReactorStatus = apps.get_model('nrc_data', 'ReactorStatus')
+    Reactor = apps.get_model('nrc_data', 'Reactor')
+
+    # Rows saved before the reactor FK existed; the unit name is the reactor name
+    orphaned = ReactorStatus.objects.filter(reactor__isnull=True)
+    for unit in orphaned.values_list('unit', flat=True).distinct():
+        Reactor.objects.get_or_create(name=unit, defaults={'region': ''})
+    orphaned.update(reactor=Subquery(Reactor.objects.filter(name=OuterRef('unit')).values('id')[:1]))
+    flush_deferred_checks(schema_editor)
+
+
+def restore_units(apps, schema_editor):
+    ReactorStatus = apps.get_model('nrc_data', 'ReactorStatus')
+    Reactor = apps.get_model('nrc_data', 'Reactor')
+    ReactorStatus.objects.update(unit=Subquery(Reactor.objects.filter(id=OuterRef('reactor')).values('name')[:1]))
+    flush_deferred_checks(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0015_partition_reactorstatus'),
+    ]
+
+    operations = [
+        # Reason text -> interned OutageReason rows
+        migrations.CreateModel(
+            name='OutageReason',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='reactorstatus',
+            name='reason_code',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='nrc_data.outagereason'),
+        ),
+        migrations.RunPython(intern_reasons, restore_reasons),
+        migrations.RemoveField(
+            model_name='reactorstatus',
+            name='reason',
+        ),
+        migrations.RenameField(
+            model_name='reactorstatus',
+            old_name='reason_code',
+            new_name='reason',
+        ),
+
+        # Unit name -> reactor FK only
+        migrations.RunPython(link_units, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='reactorstatus',
+            unique_together={('report_date', 'reactor')},
+        ),
+        # Nullable first, so reversing can re-add the column and fill it in
+        # before it goes back to NOT NULL
+        migrations.AlterField(
+            model_name='reactorstatus',
+            name='unit',
+            field=models.CharField(max_length=30, null=True),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, restore_units),
+        migrations.RemoveIndex(
+            model_name='reactorstatus',
+            name='status_unit_date_idx',
+        ),
+        migrations.RemoveField(
+            model_name='reactorstatus',
+            name='unit',
+        ),
+        migrations.AlterField(
+            model_name='reactorstatus',
+            name='reactor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reactorstatus', to='nrc_data.reactor'),
+        ),
+
+        migrations.AlterField(
+            model_name='reactorstatus',
+            name='power',
+            field=models.SmallIntegerField(),
+        ),
+    ]
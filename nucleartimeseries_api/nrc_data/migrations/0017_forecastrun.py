@@ -0,0 +1,134 @@
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def flush_deferred_checks(schema_editor):
+    # Pending deferred FK checks would block the ALTER TABLEs that follow in
+    # this transaction on PostgreSQL
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+def group_legacy_forecasts(apps, schema_editor):
+    """
+    Attach the existing forecasts to runs, one per reactor and training cutoff.
+
+    The cutoff is the report date of the status the forecast hangs off (the
+    last day of training data), or the day before the forecast date if it has
+    none. Where repeated nightly runs left several rows for the same horizon,
+    the newest one is kept.
+    """
+    ForecastRun = apps.get_model('nrc_data', 'ForecastRun')
+    ReactorForecast = apps.get_model('nrc_data', 'ReactorForecast')
+
+    # Forecasts without a reactor can't be attributed to a run
+    ReactorForecast.objects.filter(reactor__isnull=True).delete()
+
+    forecasts = ReactorForecast.objects.order_by('created_at', 'id').values_list(
+        'id', 'reactor_id', 'reactorstatus__report_date', 'df', 'image_url'
+    )
+    runs = {}       # (reactor_id, trained_through) -> image_url
+    horizons = {}   # (reactor_id, trained_through, horizon) -> newest forecast id
+    forecast_ids = []
+    for forecast_id, reactor_id, status_date, df, image_url in forecasts.iterator(chunk_size=5000):
+        forecast_ids.append(forecast_id)
+        trained_through = status_date or df - timedelta(days=1)
+        key = (reactor_id, trained_through)
+        runs[key] = image_url or runs.get(key)
+        horizons[key + ((df - trained_through).days,)] = forecast_id
+
+    ForecastRun.objects.bulk_create([
+        ForecastRun(reactor_id=reactor_id, trained_through=trained_through, engine='prophet', config_hash='legacy', image_url=image_url)
+        for (reactor_id, trained_through), image_url in runs.items()
+    ], batch_size=1000)
+    run_ids = {
+        (reactor_id, trained_through): run_id
+        for run_id, reactor_id, trained_through in ForecastRun.objects.values_list('id', 'reactor_id', 'trained_through')
+    }
+
+    keep = {}
+    for (reactor_id, trained_through, horizon), forecast_id in horizons.items():
+        keep[forecast_id] = (run_ids[(reactor_id, trained_through)], horizon)
+    superseded = [forecast_id for forecast_id in forecast_ids if forecast_id not in keep]
+    for i in range(0, len(superseded), 1000):
+        ReactorForecast.objects.filter(id__in=superseded[i:i + 1000]).delete()
+
+    batch = []
+    for forecast_id, (run_id, horizon) in keep.items():
+        batch.append(ReactorForecast(id=forecast_id, run_id=run_id, horizon=horizon))
+        if len(batch) == 1000:
+            ReactorForecast.objects.bulk_update(batch, ['run', 'horizon'])
+            batch = []
+    ReactorForecast.objects.bulk_update(batch, ['run', 'horizon'])
+    flush_deferred_checks(schema_editor)
+
+
+def restore_image_urls(apps, schema_editor):
+    ForecastRun = apps.get_model('nrc_data', 'ForecastRun')
+    ReactorForecast = apps.get_model('nrc_data', 'ReactorForecast')
+    ReactorForecast.objects.update(
+        image_url=Subquery(ForecastRun.objects.filter(id=OuterRef('run')).values('image_url')[:1])
+    )
+    flush_deferred_checks(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0016_compact_reactorstatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trained_through', models.DateField()),
+                ('engine', models.CharField(max_length=30)),
+                ('config_hash', models.CharField(max_length=64)),
+                ('image_url', models.URLField(blank=True, null=True)),
+                ('compacted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reactor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecast_runs', to='nrc_data.reactor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reactor', 'trained_through', 'created_at'], name='forecastrun_latest_idx')],
+                'unique_together': {('reactor', 'trained_through', 'engine', 'config_hash')},
+            },
+        ),
+        migrations.AddField(
+            model_name='reactorforecast',
+            name='run',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='nrc_data.forecastrun'),
+        ),
+        migrations.AddField(
+            model_name='reactorforecast',
+            name='horizon',
+            field=models.SmallIntegerField(null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reactorforecast',
+            unique_together=set(),
+        ),
+        migrations.RunPython(group_legacy_forecasts, restore_image_urls),
+        migrations.RemoveField(
+            model_name='reactorforecast',
+            name='image_url',
+        ),
+        migrations.AlterField(
+            model_name='reactorforecast',
+            name='run',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='nrc_data.forecastrun'),
+        ),
+        migrations.AlterField(
+            model_name='reactorforecast',
+            name='horizon',
+            field=models.SmallIntegerField(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reactorforecast',
+            unique_together={('run', 'horizon')},
+        ),
+    ]
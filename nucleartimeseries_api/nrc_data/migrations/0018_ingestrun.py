@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0017_forecastrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_date', models.DateField(unique=True)),
+                ('stage', models.CharField(choices=[('pending', 'pending'), ('fetched', 'fetched'), ('parsed', 'parsed'), ('saved', 'saved'), ('done', 'done')], default='pending', max_length=10)),
+                ('report_html', models.TextField(blank=True)),
+                ('rows', models.JSONField(blank=True, null=True)),
+                ('reactors', models.JSONField(blank=True, default=list)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0018_ingestrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BacktestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('engine', models.CharField(max_length=30)),
+                ('config', models.JSONField()),
+                ('config_hash', models.CharField(max_length=64)),
+                ('origins', models.IntegerField()),
+                ('step_days', models.IntegerField()),
+                ('window_days', models.IntegerField(blank=True, null=True)),
+                ('last_origin', models.DateField()),
+                ('warm_start', models.BooleanField(default=True)),
+                ('units', models.IntegerField(default=0)),
+                ('fits', models.IntegerField(default=0)),
+                ('failed_fits', models.IntegerField(default=0)),
+                ('seconds', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['config_hash', 'created_at'], name='backtestrun_config_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BacktestMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon', models.SmallIntegerField()),
+                ('count', models.IntegerField()),
+                ('mae', models.FloatField()),
+                ('rmse', models.FloatField()),
+                ('bias', models.FloatField()),
+                ('coverage', models.FloatField()),
+                ('reactor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='nrc_data.reactor')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metrics', to='nrc_data.backtestrun')),
+            ],
+            options={
+                'unique_together': {('run', 'reactor', 'horizon')},
+            },
+        ),
+    ]
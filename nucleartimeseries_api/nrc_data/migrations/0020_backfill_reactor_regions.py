@@ -0,0 +1,23 @@
+from django.db import migrations
+from nrc_data.regions import region_for_unit
+
+
+def backfill_regions(apps, schema_editor):
+    # Reactors created before regions were recorded have region=''; the fleet
+    # aggregates only count reactors with a region
+    Reactor = apps.get_model('nrc_data', 'Reactor')
+    reactors = list(Reactor.objects.filter(region=''))
+    for reactor in reactors:
+        reactor.region = region_for_unit(reactor.name)
+    Reactor.objects.bulk_update(reactors, ['region'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0019_backtest'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_regions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nrc_data', '0020_backfill_reactor_regions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reactorlateststatus',
+            name='power',
+            field=models.SmallIntegerField(),
+        ),
+    ]
@@ -21,22 +21,41 @@ class Reactor(models.Model):
     def __str__(self):
         return f"{self.name}"
 
-# unit (foreign key to React Name)
+# Distinct outage reasons; the daily reports repeat a few hundred strings, so
+# status rows store a small FK instead of the text
+class OutageReason(models.Model):
+    text = models.CharField(max_length=255, unique=True)
+
+    def __str__(self):
+        return self.text
+
+
+# Daily status of a reactor, identified by the reactor FK (the report's unit
+# name is Reactor.name).
+# On PostgreSQL the table is range-partitioned by report_date year, with a
+# (id, report_date) primary key in the database (see nrc_data/partitions.py)
 class ReactorStatus(models.Model):
-    reactor = models.ForeignKey('Reactor', related_name='reactorstatus', on_delete=models.CASCADE, null=True, blank=True)
+    # Indexed by status_reactor_date_idx below, no separate FK index
+    reactor = models.ForeignKey('Reactor', related_name='reactorstatus', on_delete=models.CASCADE, db_index=False)
     report_date = models.DateField()
-    unit = models.CharField(max_length=30)
-    power = models.IntegerField()
+    power = models.SmallIntegerField() # 0-100 %
     down_date = models.DateField(null=True, blank=True)
-    reason = models.CharField(max_length=255, null=True, blank=True)
+    # Mostly NULL and never filtered on, so not indexed
+    reason = models.ForeignKey('OutageReason', on_delete=models.PROTECT, null=True, blank=True, db_index=False)
     changed = models.BooleanField(default=False)
     scrams = models.IntegerField(null=True, blank=True)
     
     class Meta:
-        unique_together = ('report_date', 'unit')
+        unique_together = ('report_date', 'reactor')
+        indexes = [
+            # Per-reactor history (forecast training, outage detection, series,
+            # detail and batch views); power is included so history reads can
+            # be index-only
+            models.Index(fields=['reactor', 'report_date'], include=['power'], name='status_reactor_date_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.unit} - {self.report_date}"
+        return f"{self.reactor} - {self.report_date}"
     
 
 # Class for StubOutage
@@ -46,19 +65,156 @@ class StubOutage(models.Model):
     description = models.TextField(blank=True)
     auto_detected = models.BooleanField(default=False)
     confirmed = models.BooleanField(default=False)
-    reactorstatus = models.ForeignKey('ReactorStatus', on_delete=models.CASCADE, null=True, blank=True)
+    # No database FK: a partitioned ReactorStatus has no unique constraint on id alone
+    reactorstatus = models.ForeignKey('ReactorStatus', on_delete=models.CASCADE, null=True, blank=True, db_constraint=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reactor', 'date_detected'], name='stuboutage_reactor_date_idx'),
+        ]
+
+
+# One training run of a forecasting engine for a reactor. A re-run with the
+# same cutoff, engine and config replaces the run's horizons instead of
+# adding rows (see nrc_data/forecast_runs.py).
+class ForecastRun(models.Model):
+    reactor = models.ForeignKey('Reactor', related_name='forecast_runs', on_delete=models.CASCADE)
+    trained_through = models.DateField() # Last report_date in the training data
+    engine = models.CharField(max_length=30)
+    config_hash = models.CharField(max_length=64) # Hash of the engine settings
+    image_url = models.URLField(blank=True, null=True)
+    compacted = models.BooleanField(default=False) # Horizons trimmed by the retention policy
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        unique_together = ('reactor', 'trained_through', 'engine', 'config_hash')
+        indexes = [
+            # Latest run of a reactor
+            models.Index(fields=['reactor', 'trained_through', 'created_at'], name='forecastrun_latest_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.reactor} - {self.engine} through {self.trained_through}"
+
 
+# Forecast for one day (horizon days after the run's training cutoff)
 class ReactorForecast(models.Model):
+    run = models.ForeignKey('ForecastRun', related_name='forecasts', on_delete=models.CASCADE)
+    horizon = models.SmallIntegerField()
     reactor = models.ForeignKey('Reactor', on_delete=models.CASCADE, null=True, blank=True)
     df = models.DateField() # Forecast date
     yhat = models.FloatField() # Predicted power
     yhat_lower = models.FloatField()
     yhat_upper = models.FloatField()
-    image_url = models.URLField(blank=True, null=True)
-    reactorstatus = models.ForeignKey('ReactorStatus', on_delete=models.CASCADE, null=True, blank=True)
+    # No database FK: a partitioned ReactorStatus has no unique constraint on id alone
+    reactorstatus = models.ForeignKey('ReactorStatus', on_delete=models.CASCADE, null=True, blank=True, db_constraint=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('reactor', 'created_at')
+        unique_together = ('run', 'horizon')
+        indexes = [
+            # Forecast lookup by reactor and target date (outage detection, latest status)
+            models.Index(fields=['reactor', 'df'], include=['yhat', 'yhat_lower', 'yhat_upper'], name='forecast_reactor_df_idx'),
+        ]
+
+
+# Daily fleet aggregates per NRC region, kept up to date by ingestion
+# (see nrc_data/aggregates.py) so dashboards don't scan raw status rows
+class FleetDailySummary(models.Model):
+    report_date = models.DateField()
+    region = models.CharField(max_length=3, choices=Reactor.REGION_CHOICES)
+    unit_count = models.IntegerField()
+    power_total = models.IntegerField() # Sum of power, for weighted fleet averages
+    avg_power = models.FloatField()
+    units_at_zero = models.IntegerField()
+    units_changed = models.IntegerField()
+    scram_total = models.IntegerField()
+
+    class Meta:
+        unique_together = ('report_date', 'region')
+
+    def __str__(self):
+        return f"Region {self.region} - {self.report_date}"
+
+
+# Denormalized current state of each reactor: latest status, next-day forecast
+# and outage flag. Upserted by ingestion and forecasting (see nrc_data/latest.py)
+# so "current state of every reactor" is a single scan of this table.
+class ReactorLatestStatus(models.Model):
+    reactor = models.OneToOneField('Reactor', primary_key=True, related_name='latest_status', on_delete=models.CASCADE)
+    report_date = models.DateField()
+    power = models.SmallIntegerField() # Same as ReactorStatus.power
+    down_date = models.DateField(null=True, blank=True)
+    reason = models.CharField(max_length=255, null=True, blank=True)
+    forecast_date = models.DateField(null=True, blank=True) # Next-day forecast
+    yhat = models.FloatField(null=True, blank=True)
+    yhat_lower = models.FloatField(null=True, blank=True)
+    yhat_upper = models.FloatField(null=True, blank=True)
+    stuboutage = models.BooleanField(default=False) # Stub outage detected on report_date
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.reactor_id} - {self.report_date}"
+
+
+# Progress of the nightly ingestion pipeline for one report date (see
+# nrc_data/ingest.py). Each stage task checks `stage` first, so re-running the
+# pipeline picks up after the last completed stage.
+class IngestRun(models.Model):
+    STAGES = ['pending', 'fetched', 'parsed', 'saved', 'done']
+    STAGE_CHOICES = [(stage, stage) for stage in STAGES]
+
+    report_date = models.DateField(unique=True)
+    stage = models.CharField(max_length=10, choices=STAGE_CHOICES, default='pending') # Last completed stage
+    report_html = models.TextField(blank=True) # Raw report, kept until it's saved
+    rows = models.JSONField(null=True, blank=True) # Parsed report rows
+    reactors = models.JSONField(default=list, blank=True) # Reactors saved for this date
+    error = models.TextField(blank=True) # Last stage failure
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.report_date} - {self.stage}"
+
+
+# One rolling-origin backtest of a forecasting config over a set of reactors
+# (see nrc_data/backtest.py). Runs with the same config_hash are comparable.
+class BacktestRun(models.Model):
+    engine = models.CharField(max_length=30)
+    config = models.JSONField() # Engine settings that were evaluated
+    config_hash = models.CharField(max_length=64)
+    origins = models.IntegerField() # Training cutoffs per reactor
+    step_days = models.IntegerField() # Days between cutoffs
+    window_days = models.IntegerField(null=True, blank=True) # Training window, null = all history
+    last_origin = models.DateField()
+    warm_start = models.BooleanField(default=True)
+    units = models.IntegerField(default=0)
+    fits = models.IntegerField(default=0)
+    failed_fits = models.IntegerField(default=0)
+    seconds = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['config_hash', 'created_at'], name='backtestrun_config_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.engine} {self.config_hash[:8]} - {self.created_at:%Y-%m-%d %H:%M}"
+
+
+# Errors of a backtest for one reactor and horizon (days after the cutoff),
+# over all of its origins
+class BacktestMetric(models.Model):
+    run = models.ForeignKey('BacktestRun', related_name='metrics', on_delete=models.CASCADE)
+    reactor = models.ForeignKey('Reactor', on_delete=models.CASCADE)
+    horizon = models.SmallIntegerField()
+    count = models.IntegerField() # Forecasts scored
+    mae = models.FloatField()
+    rmse = models.FloatField()
+    bias = models.FloatField() # Mean of yhat - actual
+    coverage = models.FloatField() # Share of actuals inside [yhat_lower, yhat_upper]
+
+    class Meta:
+        unique_together = ('run', 'reactor', 'horizon')
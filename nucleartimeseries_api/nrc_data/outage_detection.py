@@ -1,26 +1,32 @@
+import logging
 from datetime import timedelta
 from nrc_data.models import ReactorStatus, ReactorForecast, StubOutage, Reactor
+from nrc_data.cache import invalidate_reactor
+from nrc_data.latest import refresh_latest_status
+from nrc_data.routers import pin_primary, reactor_scopes
+
+logger = logging.getLogger(__name__)
 
 
 def detect_stub_outages_for_reactor(reactor_name, threshold_drops=5):
-    print(f"Detecting stub outages for {reactor_name}")
+    logger.info("Detecting stub outages for %s", reactor_name)
     try:
         reactor = Reactor.objects.get(name=reactor_name)
     except Reactor.DoesNotExist:
         return
 
-    latest_actual = ReactorStatus.objects.filter(unit=reactor_name).order_by('-report_date').first()
+    latest_actual = ReactorStatus.objects.filter(reactor=reactor).order_by('-report_date').first()
     if not latest_actual:
-        print(f"⚠️ No actual data found for {reactor_name}")
+        logger.warning("No actual data found for %s", reactor_name)
         return
-    print(f"Latest actual: {latest_actual.report_date}")
+    logger.debug("Latest actual of %s: %s", reactor_name, latest_actual.report_date)
     forecast = ReactorForecast.objects.filter(
         reactor=reactor,
         df=latest_actual.report_date + timedelta(days=1)
-    ).first()
+    ).order_by('-run__trained_through', '-run__created_at').first()  # newest run wins
 
     if not forecast:
-        print(f"⚠️ No forecast found for {reactor_name} on {latest_actual.report_date}")
+        logger.warning("No forecast found for %s on %s", reactor_name, latest_actual.report_date)
         return
 
     actual = latest_actual.power
@@ -29,9 +35,9 @@ def detect_stub_outages_for_reactor(reactor_name, threshold_drops=5):
     drop = predicted - actual
 
     # We want to save stub outage even when the drop is less than the threshold
-    print(f"📊 {reactor_name}: Predicted = {predicted}, Actual = {actual}, Drop = {drop}")
+    logger.info("%s: predicted = %s, actual = %s, drop = %s", reactor_name, predicted, actual, drop)
     if drop >= threshold_drops:
-        StubOutage.objects.get_or_create(
+        outage, created = StubOutage.objects.get_or_create(
             reactor=reactor, 
             date_detected=latest_actual.report_date,
             defaults={
@@ -40,4 +46,8 @@ def detect_stub_outages_for_reactor(reactor_name, threshold_drops=5):
                 'confirmed': False,
             },
             reactorstatus=latest_actual
-        )
\ No newline at end of file
+        )
+        if created:
+            pin_primary(reactor_scopes(latest_actual.report_date, reactor.id))
+            invalidate_reactor(latest_actual.report_date, reactor.id)
+            refresh_latest_status([reactor.id])
\ No newline at end of file
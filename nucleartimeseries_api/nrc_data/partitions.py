@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from django.db import connection, transaction
+from nrc_data.models import ReactorStatus
+
+# On PostgreSQL, ReactorStatus is range-partitioned by report_date year
+# (migration 0015): one nrc_data_reactorstatus_y<year> table per year, so
+# recent-date queries prune to a single partition and a year can be
+# truncated and re-ingested on its own.
+
+TABLE = ReactorStatus._meta.db_table
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def partition_name(year):
+    return f"{TABLE}_y{int(year)}"
+
+
+def ensure_partition(year):
+    """Create the partition for `year` if it's missing. Returns True if one was created."""
+    if not is_partitioned():
+        return False
+    year = int(year)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [partition_name(year)])
+        if cursor.fetchone()[0]:
+            return False
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(year)} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+    return True
+
+
+@contextmanager
+def reload_partition(year):
+    """
+    Truncate `year`'s partition and let the caller re-ingest it, in one transaction.
+
+    Forecasts and stub outages pointing at the truncated rows are re-pointed
+    at the reloaded row for the same reactor and date afterwards (or set to NULL
+    if that row didn't come back). TRUNCATE locks the partition until commit,
+    so fetch the data before entering the block.
+    """
+    if not is_partitioned():
+        raise RuntimeError("Reloading a year needs the partitioned PostgreSQL ReactorStatus table")
+
+    partition = partition_name(year)
+    with transaction.atomic():
+        ensure_partition(year)
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE TEMP TABLE reactorstatus_reload AS SELECT id, reactor_id, report_date FROM {partition}")
+            # TRUNCATE refuses to run with deferred FK checks pending on the table
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(f"TRUNCATE {partition}")
+            cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+        yield
+
+        with connection.cursor() as cursor:
+            for dependent in ('nrc_data_reactorforecast', 'nrc_data_stuboutage'):
+                cursor.execute(f"""
+                    UPDATE {dependent} d SET reactorstatus_id = (
+                        SELECT s.id FROM reactorstatus_reload k
+                        JOIN {partition} s ON s.report_date = k.report_date AND s.reactor_id = k.reactor_id
+                        WHERE k.id = d.reactorstatus_id
+                    )
+                    WHERE d.reactorstatus_id IN (SELECT id FROM reactorstatus_reload)
+                """)
+            cursor.execute("DROP TABLE reactorstatus_reload")
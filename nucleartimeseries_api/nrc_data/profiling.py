@@ -0,0 +1,51 @@
+import cProfile
+import io
+import pstats
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+
+# Opt-in cProfile capture for slow runs: `seed --profile`,
+# generate_and_upload_forecast(..., profile=True) and the `profile` kwarg of
+# the pipeline tasks. Each profiled run writes <name>-<timestamp>.prof
+# (open with snakeviz or `python -m pstats`) and a .txt summary of the
+# hottest functions to NRC_PROFILE_DIR, and logs that summary.
+
+TOP_FUNCTIONS = 25
+
+
+def summarize(profiler, top=TOP_FUNCTIONS):
+    """Top functions by cumulative and by own time, as text."""
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out).strip_dirs()
+    for sort in ('cumulative', 'tottime'):
+        out.write(f"--- top {top} by {sort} ---\n")
+        stats.sort_stats(sort).print_stats(top)
+    return out.getvalue()
+
+
+@contextmanager
+def profiled(name, enabled=True, directory=None, log=print, top=TOP_FUNCTIONS):
+    """Profile the block if `enabled`, saving the stats under `directory` (NRC_PROFILE_DIR)."""
+    if not enabled:
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        directory = Path(directory or settings.NRC_PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+        path = directory / f"{slug}-{time.strftime('%Y%m%d-%H%M%S')}.prof"
+        profiler.dump_stats(path)
+        summary = summarize(profiler, top)
+        path.with_suffix('.txt').write_text(summary)
+        log(f"⏱️ Profiled {name} ({elapsed:.1f}s), stats in {path}\n{summary}")
@@ -0,0 +1,29 @@
+# NRC region of each plant, in the order of the report's region tables
+# (Region 1, 2, 3, 4). Matched as a case-insensitive substring of the
+# normalized unit name (see seed.normalize_unit_name).
+# No model imports: the 0020 data migration uses this too.
+PLANT_REGIONS = {
+    'Beaver Valley': 'I', 'Calvert Cliffs': 'I', 'FitzPatrick': 'I', 'Ginna': 'I',
+    'Hope Creek': 'I', 'Limerick': 'I', 'Millstone': 'I', 'Nine Mile Point': 'I',
+    'Peach Bottom': 'I', 'Salem': 'I', 'Seabrook': 'I', 'Susquehanna': 'I',
+    'Browns Ferry': 'II', 'Brunswick': 'II', 'Catawba': 'II', 'Farley': 'II',
+    'Harris': 'II', 'Hatch': 'II', 'McGuire': 'II', 'North Anna': 'II',
+    'Oconee': 'II', 'Robinson': 'II', 'Saint Lucie': 'II', 'Sequoyah': 'II',
+    'Summer': 'II', 'Surry': 'II', 'Turkey Point': 'II', 'Vogtle': 'II',
+    'Watts Bar': 'II', 'Braidwood': 'III', 'Byron': 'III', 'Clinton': 'III',
+    'D.C. Cook': 'III', 'Davis-Besse': 'III', 'Dresden': 'III', 'Fermi': 'III',
+    'LaSalle': 'III', 'Monticello': 'III', 'Perry': 'III', 'Point Beach': 'III',
+    'Prairie Island': 'III', 'Quad Cities': 'III', 'Arkansas Nuclear': 'IV',
+    'Callaway': 'IV', 'Columbia Generating Station': 'IV', 'Comanche Peak': 'IV',
+    'Cooper': 'IV', 'Diablo Canyon': 'IV', 'Grand Gulf': 'IV', 'Palo Verde': 'IV',
+    'River Bend Station': 'IV', 'South Texas': 'IV', 'Waterford': 'IV', 'Wolf Creek': 'IV'
+}
+
+DEFAULT_REGION = 'I'
+
+
+def region_for_unit(name):
+    for plant_name, plant_region in PLANT_REGIONS.items():
+        if plant_name.lower() in name.lower():
+            return plant_region
+    return DEFAULT_REGION
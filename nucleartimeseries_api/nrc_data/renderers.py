@@ -0,0 +1,20 @@
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+_fallback_encoder = DjangoJSONEncoder()
+
+
+class ORJSONRenderer(BaseRenderer):
+    """JSON renderer backed by orjson, several times faster than the stdlib encoder."""
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # orjson handles dates, UUIDs and dict/list subclasses natively;
+        # anything else (e.g. Decimal) goes through Django's encoder
+        return orjson.dumps(data, default=_fallback_encoder.default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,198 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import Resolver404, resolve
+from django.utils.dateparse import parse_date
+from django.utils.decorators import sync_and_async_middleware
+from asgiref.sync import iscoroutinefunction
+
+logger = logging.getLogger(__name__)
+
+# Read/write split for the API.
+#
+# nrc_data reads made while serving a GET/HEAD /api/ request go to
+# settings.NRC_READ_DATABASE (the `replica` alias when one is configured);
+# all writes, and all reads from ingestion, forecasting and management
+# commands, stay on `default`. After ingestion or forecasting writes,
+# pin_primary() sends the API reads that depend on what was written back to
+# `default` for NRC_REPLICA_PIN_SECONDS, so a lagging replica can't serve (and
+# re-cache) rows from before the write. Pins are scoped like the response
+# cache invalidation (a report date, one reactor's detail, ...) so reads of
+# other dates stay on the replica during the nightly run. They live in the
+# shared cache, so they reach every API process, not just the writer.
+
+PIN_KEY = "nrc:pin-primary"
+
+# Scopes a write can pin and the API reads that check them:
+#   date:<D>         statuses of D            snapshot, batch and details of D
+#   batch:<D>        forecasts/outages on D   batch of D
+#   detail:<D>:<R>   forecasts/outages of R   detail of R on D
+#   reactor:<R>      statuses of R            series of R
+#   latest           ReactorLatestStatus      latest
+#   fleet            daily aggregates         fleet summary, export
+LATEST_SCOPE = "latest"
+FLEET_SCOPE = "fleet"
+
+_read_alias = ContextVar("nrc_read_alias", default=None)
+
+
+def replica_alias():
+    """The replica alias, or None if reads aren't split off."""
+    alias = settings.NRC_READ_DATABASE
+    return None if alias == DEFAULT_DB_ALIAS else alias
+
+
+@contextmanager
+def reading_from(alias):
+    """Route nrc_data reads in this block to `alias` (None for the default routing)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'nrc_data':
+            return _read_alias.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data either side, so objects read from the replica can be
+        # related to ones on the primary
+        dbs = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        if db == replica_alias():
+            return False
+        return None
+
+
+def ingest_scopes(report_date, reactor_ids):
+    """What ingesting `report_date` for `reactor_ids` changes (see invalidate_date)."""
+    return [f"date:{report_date}", LATEST_SCOPE, FLEET_SCOPE] + [f"reactor:{reactor_id}" for reactor_id in reactor_ids]
+
+
+def reactor_scopes(report_date, reactor_id):
+    """What a forecast, plot or outage of one reactor on `report_date` changes (see invalidate_reactor)."""
+    return [f"detail:{report_date}:{reactor_id}", f"batch:{report_date}", LATEST_SCOPE]
+
+
+def request_scopes(request):
+    """The pin scopes an API read depends on."""
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return []
+    report_date = match.kwargs.get('report_date')
+    reactor_id = match.kwargs.get('reactor_id')
+    if report_date is not None:
+        try:
+            report_date = parse_date(report_date)
+        except ValueError:
+            report_date = None
+        if report_date is None:  # Answered with a 400
+            return []
+        if reactor_id is not None:
+            return [f"date:{report_date}", f"detail:{report_date}:{reactor_id}"]
+        if match.route.endswith('/batch/'):
+            return [f"date:{report_date}", f"batch:{report_date}"]
+        return [f"date:{report_date}"]
+    if reactor_id is not None:
+        return [f"reactor:{reactor_id}"]
+    if match.route.endswith('reactor/latest/'):
+        return [LATEST_SCOPE]
+    return [FLEET_SCOPE]
+
+
+def pin_keys(scopes):
+    return [f"{PIN_KEY}:{scope}" for scope in scopes]
+
+
+def pin_primary(scopes, seconds=None):
+    """Serve API reads depending on `scopes` from the primary for `seconds` (NRC_REPLICA_PIN_SECONDS) after a write."""
+    if replica_alias() is None or not scopes:
+        return
+    seconds = settings.NRC_REPLICA_PIN_SECONDS if seconds is None else seconds
+    try:
+        cache.set_many(dict.fromkeys(pin_keys(scopes), True), seconds)
+    except Exception as e:
+        logger.warning(f"Could not pin API reads to the primary: {e}")
+
+
+# If the cache is down we can't tell whether a pin is active, so reads stay
+# on the primary rather than risk stale rows.
+
+def is_pinned(request):
+    scopes = request_scopes(request)
+    if not scopes:
+        return False
+    try:
+        return bool(cache.get_many(pin_keys(scopes)))
+    except Exception as e:
+        logger.warning(f"Pin check failed, reading from the primary: {e}")
+        return True
+
+
+async def ais_pinned(request):
+    scopes = request_scopes(request)
+    if not scopes:
+        return False
+    try:
+        return bool(await cache.aget_many(pin_keys(scopes)))
+    except Exception as e:
+        logger.warning(f"Pin check failed, reading from the primary: {e}")
+        return True
+
+
+def is_api_read(request):
+    return request.method in ('GET', 'HEAD') and request.path.startswith('/api/')
+
+
+def _stream(content, alias):
+    # Streamed responses (the CSV/Parquet export) run their queries after the
+    # view returns, so each chunk is produced inside the routing context
+    iterator = iter(content)
+    while True:
+        with reading_from(alias):
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+@sync_and_async_middleware
+def replica_read_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            alias = replica_alias()
+            if alias is None or not is_api_read(request) or await ais_pinned(request):
+                return await get_response(request)
+            with reading_from(alias):
+                response = await get_response(request)
+            if response.streaming and not response.is_async:
+                response.streaming_content = _stream(response.streaming_content, alias)
+            return response
+    else:
+        def middleware(request):
+            alias = replica_alias()
+            if alias is None or not is_api_read(request) or is_pinned(request):
+                return get_response(request)
+            with reading_from(alias):
+                response = get_response(request)
+            if response.streaming and not response.is_async:
+                response.streaming_content = _stream(response.streaming_content, alias)
+            return response
+    return middleware
@@ -1,10 +1,14 @@
-from nrc_data.models import ReactorStatus, ReactorForecast, StubOutage, Reactor
+from nrc_data.models import ReactorStatus, ReactorForecast, StubOutage, Reactor, ReactorLatestStatus
 from rest_framework import serializers
 
 class ReactorStatusSerializer(serializers.ModelSerializer):
+    # Unit name and reason text live in the Reactor and OutageReason tables
+    unit = serializers.CharField(source='reactor.name', read_only=True)
+    reason = serializers.CharField(source='reason.text', read_only=True, allow_null=True)
+
     class Meta:
         model = ReactorStatus
-        fields = '__all__'
+        fields = ['id', 'report_date', 'unit', 'power', 'down_date', 'reason', 'changed', 'scrams', 'reactor']
 
 class ReactorSerializer(serializers.ModelSerializer):
     reactorstatus = serializers.SerializerMethodField()
@@ -14,11 +18,95 @@ class ReactorSerializer(serializers.ModelSerializer):
         fields = ['name', 'region', 'latitude', 'longitude', 'reactorstatus']
 
     def get_reactorstatus(self, obj):
+        # ReactorView prefetches the statuses for the requested date
+        if hasattr(obj, 'statuses_for_date'):
+            return ReactorStatusSerializer(obj.statuses_for_date, many=True).data
         date = self.context.get('report_date')
-        reactors = obj.reactorstatus.filter(report_date=date)
+        reactors = obj.reactorstatus.filter(report_date=date).select_related('reason')
         return ReactorStatusSerializer(reactors, many=True).data
 
 
+class SnapshotSerializer:
+    """
+    Lightweight equivalent of ReactorSerializer(many=True) for a date snapshot.
+
+    Builds the same response shape from flat `.values_list()` tuples (see
+    `rows()`) instead of instantiating nested ModelSerializers per reactor.
+    """
+
+    reactor_fields = ['name', 'region', 'latitude', 'longitude']
+    status_fields = ['id', 'report_date', 'unit', 'power', 'down_date', 'reason', 'changed', 'scrams', 'reactor']
+    # Response fields stored in other tables
+    status_columns = {'unit': 'reactor__name', 'reason': 'reason__text'}
+
+    @classmethod
+    def rows(cls, report_date):
+        """Statuses for `report_date` joined with their reactor, in one query."""
+        return (
+            ReactorStatus.objects.filter(report_date=report_date)
+            .order_by('reactor_id', 'id')
+            .values_list(
+                *[f'reactor__{field}' for field in cls.reactor_fields],
+                *[cls.status_columns.get(field, field) for field in cls.status_fields],
+            )
+        )
+
+    @classmethod
+    def serialize(cls, rows):
+        reactors = {}
+        n_reactor = len(cls.reactor_fields)
+        for row in rows:
+            status = dict(zip(cls.status_fields, row[n_reactor:]))
+            status['report_date'] = status['report_date'].isoformat()
+            if status['down_date'] is not None:
+                status['down_date'] = status['down_date'].isoformat()
+
+            reactor = reactors.get(status['reactor'])
+            if reactor is None:
+                reactor = dict(zip(cls.reactor_fields, row[:n_reactor]))
+                reactor['reactorstatus'] = []
+                reactors[status['reactor']] = reactor
+            reactor['reactorstatus'].append(status)
+        return list(reactors.values())
+
+
+class LatestStatusSerializer:
+    """Current state of every reactor from the ReactorLatestStatus table, one query."""
+
+    fields = ['reactor_id', 'reactor__name', 'reactor__region', 'reactor__latitude', 'reactor__longitude',
+              'report_date', 'power', 'down_date', 'reason',
+              'forecast_date', 'yhat', 'yhat_lower', 'yhat_upper', 'stuboutage']
+
+    @classmethod
+    def rows(cls):
+        return ReactorLatestStatus.objects.order_by('reactor_id').values_list(*cls.fields)
+
+    @classmethod
+    def serialize(cls, rows):
+        data = []
+        for (reactor_id, name, region, latitude, longitude, report_date, power, down_date, reason,
+             forecast_date, yhat, yhat_lower, yhat_upper, stuboutage) in rows:
+            data.append({
+                'id': reactor_id,
+                'name': name,
+                'region': region,
+                'latitude': latitude,
+                'longitude': longitude,
+                'report_date': report_date.isoformat(),
+                'power': power,
+                'down_date': down_date.isoformat() if down_date else None,
+                'reason': reason,
+                'forecast': {
+                    'df': forecast_date.isoformat(),
+                    'yhat': yhat,
+                    'yhat_lower': yhat_lower,
+                    'yhat_upper': yhat_upper,
+                } if forecast_date else None,
+                'stuboutage': stuboutage,
+            })
+        return data
+
+
 # Power (ReactorStatus)
 # Status (StubOutage)
 # Forecast (ReactorForecast)
@@ -29,11 +117,14 @@ class StubOutageSerializer(serializers.ModelSerializer):
         fields = ['date_detected', 'description', 'auto_detected', 'confirmed']
 
 class ReactorForecastSerializer(serializers.ModelSerializer):
+    image_url = serializers.URLField(source='run.image_url', read_only=True, allow_null=True)
+
     class Meta:
         model = ReactorForecast
         fields = ['df', 'yhat', 'yhat_lower', 'yhat_upper', 'image_url']
 
 class ReactorDetailSerializer(serializers.ModelSerializer):
+    unit = serializers.CharField(source='reactor.name', read_only=True)
     reactorforecast_set = ReactorForecastSerializer(many=True)
     stuboutage_set = StubOutageSerializer(many=True)
     stuboutage = serializers.SerializerMethodField()
@@ -42,9 +133,29 @@ class ReactorDetailSerializer(serializers.ModelSerializer):
         model = ReactorStatus
         fields = ['report_date', 'unit', 'power', 'reactorforecast_set', 'stuboutage_set', 'stuboutage']
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldsets: drop everything not asked for
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def get_stuboutage(self, obj):
         # return True if any stuboutage is confirmed 
         # if there is data in stuboutage_set else stuboutage is False
+        if hasattr(obj, 'has_stuboutage'):
+            return obj.has_stuboutage
         if obj.stuboutage_set.exists():
             return True
-        return False
\ No newline at end of file
+        return False
+
+
+class ReactorBatchSerializer(ReactorDetailSerializer):
+    # Same as the detail response, plus the reactor id to tell the entries apart
+    class Meta(ReactorDetailSerializer.Meta):
+        fields = ['reactor'] + ReactorDetailSerializer.Meta.fields
+
+    def __init__(self, *args, fields=None, **kwargs):
+        if fields is not None:
+            fields = ['reactor', *fields]
+        super().__init__(*args, fields=fields, **kwargs)
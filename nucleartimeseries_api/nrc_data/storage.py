@@ -0,0 +1,41 @@
+from pathlib import Path
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Where the rendered forecast plots are published. settings.NRC_FORECAST_STORAGE
+# names the backend class; each has save(name, content, content_type) returning
+# the public URL. Uploads raise on failure so the Celery task can retry them.
+
+
+class S3ForecastStorage:
+    def __init__(self):
+        import boto3  # only needed when publishing to S3
+
+        self.client = boto3.client(
+            's3',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        )
+        self.bucket = settings.AWS_STORAGE_BUCKET_NAME
+
+    def save(self, name, content, content_type):
+        key = f"{settings.S3_FORECAST_FOLDER}{name}"
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=content, ContentType=content_type)
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+
+class LocalForecastStorage:
+    """Writes plots to NRC_FORECAST_LOCAL_DIR, for development without AWS credentials."""
+
+    def __init__(self):
+        self.root = Path(settings.NRC_FORECAST_LOCAL_DIR)
+
+    def save(self, name, content, content_type):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / name
+        path.write_bytes(content)
+        return path.resolve().as_uri()
+
+
+def forecast_storage():
+    return import_string(settings.NRC_FORECAST_STORAGE)()
@@ -0,0 +1,370 @@
+import random
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from nrc_data.aggregates import rebuild_summaries
+from nrc_data.forecast_runs import config_hash
+from nrc_data.latest import refresh_latest_status
+from nrc_data.models import (
+    ForecastRun, OutageReason, Reactor, ReactorForecast, ReactorLatestStatus, ReactorStatus, StubOutage,
+)
+from nrc_data.partitions import ensure_partition
+
+# Synthetic fleet data for benchmarks and scale tests: plausible daily status
+# rows per reactor (full power with refueling outages every 18 or 24 months,
+# end-of-cycle coastdown, power ascension, scrams and maintenance outages with
+# their down_date and reason, summer derates for some units), naive forecast
+# runs and stub outages, so forecast cost and API behaviour can be measured at
+# any fleet size and history length without the real data.
+#
+# Every unit gets its own RNG seeded from (seed, unit index) and a fixed block
+# of ReactorStatus ids, so units can be generated in any order or in parallel
+# processes and the same seed always produces the same fleet.
+
+SYNTHETIC_PREFIX = 'SYN-'
+# Units bench_forecast builds (and rolls back), kept apart from a generated fleet
+BENCH_PREFIX = 'BENCH-'
+REGIONS = [code for code, _ in Reactor.REGION_CHOICES]
+
+# Roughly the area each NRC region covers, for plausible map positions
+REGION_BOUNDS = {
+    'I': ((38.0, 45.0), (-80.0, -70.0)),
+    'II': ((25.0, 38.0), (-90.0, -76.0)),
+    'III': ((37.0, 47.0), (-97.0, -82.0)),
+    'IV': ((28.0, 47.0), (-123.0, -90.0)),
+}
+
+REFUELING = 'Refueling Outage'
+ASCENSION = 'Power Ascension Following Refueling'
+COASTDOWN = 'Coastdown To Refueling Outage'
+SCRAM = 'Reactor Trip'
+MAINTENANCE = 'Maintenance Outage'
+DERATE = 'Reduced Power For Condenser Cooling'
+TESTING = 'Reduced Power For Turbine Valve Testing'
+REASONS = [REFUELING, ASCENSION, COASTDOWN, SCRAM, MAINTENANCE, DERATE, TESTING]
+# Outages a detector would flag (refueling is planned)
+UNPLANNED = {SCRAM, MAINTENANCE}
+
+NAIVE_ENGINE = 'naive'
+FORECAST_HORIZON = 30
+
+
+def unit_rng(seed, index):
+    return random.Random(f"{seed}:{index}")
+
+
+def unit_rows(first_date, days, rng):
+    """
+    Daily (report_date, power, down_date, reason, changed, scrams) for one
+    unit over `days` days from `first_date`, like the parsed report rows.
+    """
+    cycle = rng.choice([540, 730])
+    outage = rng.randint(20, 45)
+    coastdown = rng.randint(0, 60)
+    summer_derate = rng.randint(2, 6) if rng.random() < 0.2 else 0
+    day_in_cycle = rng.randrange(cycle)
+
+    rows = []
+    forced = 0  # days left in an unplanned outage
+    forced_reason = None
+    down_date = None
+    previous = None
+    for i in range(days):
+        day = first_date + timedelta(days=i)
+        day_in_cycle = (day_in_cycle + 1) % cycle
+        scrams = None
+        if day_in_cycle < outage:
+            power, reason = 0, REFUELING
+        elif day_in_cycle < outage + 7:
+            power, reason = int(100 * (day_in_cycle - outage + 1) / 8), ASCENSION
+        elif day_in_cycle > cycle - coastdown:
+            power, reason = 100 - int(15 * (day_in_cycle - (cycle - coastdown)) / coastdown), COASTDOWN
+        elif summer_derate and day.month in (7, 8):
+            power, reason = 100 - summer_derate, DERATE
+        elif rng.random() < 0.05:
+            power, reason = rng.randint(90, 99), TESTING
+        else:
+            power, reason = 100, None
+
+        if forced:
+            forced -= 1
+            power, reason = 0, forced_reason
+        elif power:
+            roll = rng.random()
+            if roll < 1 / 500:
+                forced, forced_reason, scrams = rng.randint(2, 10), SCRAM, 1
+                power, reason = 0, SCRAM
+            elif roll < 1 / 500 + 1 / 1500:
+                forced, forced_reason = rng.randint(5, 20), MAINTENANCE
+                power, reason = 0, MAINTENANCE
+
+        if power == 0:
+            down_date = down_date or day
+        else:
+            down_date = None
+        rows.append((day, power, down_date, reason, previous is not None and power != previous, scrams))
+        previous = power
+    return rows
+
+
+def unit_history(first_date, days, rng):
+    """Daily power (0-100) for one unit over `days` days from `first_date`."""
+    return [row[1] for row in unit_rows(first_date, days, rng)]
+
+
+def history_days(years):
+    return int(years * 365.25)
+
+
+def synthetic_units(units, years, end_date, seed=0, prefix=SYNTHETIC_PREFIX):
+    """Yields (name, region, first_date, powers) for `units` units with `years` of history through `end_date`."""
+    days = history_days(years)
+    first_date = end_date - timedelta(days=days - 1)
+    for i in range(units):
+        yield (
+            unit_name(i, prefix), REGIONS[i % len(REGIONS)], first_date, unit_history(first_date, days, unit_rng(seed, i))
+        )
+
+
+def unit_name(index, prefix=SYNTHETIC_PREFIX):
+    return f"{prefix}{index:04d}"
+
+
+def ensure_partitions(first_date, last_date):
+    # Synthetic histories can reach back before the partitions the migrations create
+    for year in range(first_date.year, last_date.year + 1):
+        ensure_partition(year)
+
+
+def save_history(name, region, first_date, powers, batch_size=5000):
+    """Create the reactor and its status rows (ORM bulk insert). Returns the Reactor."""
+    with transaction.atomic():
+        reactor = Reactor.objects.create(name=name, region=region)
+        ReactorStatus.objects.bulk_create(
+            (
+                ReactorStatus(reactor=reactor, report_date=first_date + timedelta(days=i), power=power)
+                for i, power in enumerate(powers)
+            ),
+            batch_size=batch_size,
+        )
+    return reactor
+
+
+# Bulk writes: COPY on PostgreSQL, bulk_create elsewhere
+
+class _LineReader:
+    """File-like object over an iterator of COPY text lines, for cursor.copy_expert()."""
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.rest = ''
+
+    def read(self, size=-1):
+        chunks, total = [self.rest], len(self.rest)
+        for line in self.lines:
+            chunks.append(line)
+            total += len(line)
+            if 0 < size <= total:
+                break
+        data = ''.join(chunks)
+        if size > 0:
+            data, self.rest = data[:size], data[size:]
+        else:
+            self.rest = ''
+        return data
+
+
+def _copy_value(value):
+    # COPY text format; True/False print as PostgreSQL accepts them
+    return r'\N' if value is None else str(value)
+
+
+def write_rows(model, columns, rows, batch_size=5000):
+    """Insert tuples of `columns` (attnames) into `model`'s table. Returns the number of rows."""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    if connection.vendor == 'postgresql':
+        lines = ('\t'.join(map(_copy_value, row)) + '\n' for row in counted())
+        with connection.cursor() as cursor:
+            # Synthetic data can be regenerated; don't wait for the WAL flush on every commit
+            cursor.execute("SET LOCAL synchronous_commit TO off")
+            cursor.copy_expert(
+                f"COPY {model._meta.db_table} ({', '.join(columns)}) FROM STDIN", _LineReader(lines), 1 << 20,
+            )
+    else:
+        model.objects.bulk_create((model(**dict(zip(columns, row))) for row in counted()), batch_size=batch_size)
+    return count
+
+
+def reserve_ids(model, count):
+    """
+    First of `count` consecutive ids for rows written with explicit ids. On
+    PostgreSQL the id sequence is moved past them up front, so inserts from the
+    API or Celery while the fleet is written can't be handed one of them.
+    """
+    base = (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+    if connection.vendor != 'postgresql' or not count:
+        return base
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(seq, GREATEST(nextval(seq), %s) + %s - 1) - %s + 1 "
+            "FROM (SELECT pg_get_serial_sequence(%s, 'id')::regclass AS seq) AS s",
+            [base, count, count, model._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+class FleetPlan:
+    """Everything the per-unit writers need, shared with worker processes."""
+
+    def __init__(self, units, years, end_date, forecast_days, seed):
+        self.units = units
+        self.days = history_days(years)
+        self.end_date = end_date
+        self.first_date = end_date - timedelta(days=self.days - 1)
+        self.forecast_days = min(forecast_days, self.days)
+        self.seed = seed
+        self.created_at = timezone.now().isoformat()
+        self.reactor_ids = {}
+        self.reason_ids = {}
+        self.status_base = 0
+        self.run_base = 0
+
+    def prepare(self):
+        """Create the reactors, reasons and partitions and reserve the id blocks."""
+        ensure_partitions(self.first_date, self.end_date)
+        for text in REASONS:
+            self.reason_ids[text] = OutageReason.objects.get_or_create(text=text)[0].id
+        reactors = []
+        for i in range(self.units):
+            rng = unit_rng(self.seed, f"site:{i}")
+            region = REGIONS[i % len(REGIONS)]
+            (lat_min, lat_max), (lon_min, lon_max) = REGION_BOUNDS[region]
+            reactors.append(Reactor(
+                name=unit_name(i), region=region,
+                latitude=round(rng.uniform(lat_min, lat_max), 4), longitude=round(rng.uniform(lon_min, lon_max), 4),
+            ))
+        Reactor.objects.bulk_create(reactors, batch_size=1000)
+        self.reactor_ids = dict(
+            Reactor.objects.filter(name__startswith=SYNTHETIC_PREFIX).values_list('name', 'id')
+        )
+        # Unit i's status rows get ids status_base + i * days + day, its runs run_base + i * forecast_days + k
+        self.status_base = reserve_ids(ReactorStatus, self.units * self.days)
+        self.run_base = reserve_ids(ForecastRun, self.units * self.forecast_days)
+
+    def write_units(self, indexes):
+        """Status rows, forecast runs, forecasts and stub outages of the given units. Returns row counts."""
+        counts = dict.fromkeys(('statuses', 'runs', 'forecasts', 'outages'), 0)
+        for i in indexes:
+            with transaction.atomic():
+                for key, value in self.write_unit(i).items():
+                    counts[key] += value
+        return counts
+
+    def write_unit(self, i):
+        reactor_id = self.reactor_ids[unit_name(i)]
+        rows = unit_rows(self.first_date, self.days, unit_rng(self.seed, i))
+        naive_hash = config_hash({})
+        status_id = self.status_base + i * self.days
+        reason_ids = self.reason_ids
+
+        statuses = write_rows(
+            ReactorStatus,
+            ['id', 'reactor_id', 'report_date', 'power', 'down_date', 'reason_id', 'changed', 'scrams'],
+            (
+                (status_id + d, reactor_id, day, power, down_date, reason_ids.get(reason), changed, scrams)
+                for d, (day, power, down_date, reason, changed, scrams) in enumerate(rows)
+            ),
+        )
+
+        # A naive run trained through each of the last forecast_days days
+        rng = unit_rng(self.seed, f"forecast:{i}")
+        run_id = self.run_base + i * self.forecast_days
+        first_run_day = self.days - self.forecast_days
+        runs = write_rows(
+            ForecastRun,
+            ['id', 'reactor_id', 'trained_through', 'engine', 'config_hash', 'compacted', 'created_at'],
+            (
+                (run_id + k, reactor_id, rows[d][0], NAIVE_ENGINE, naive_hash, False, self.created_at)
+                for k, d in enumerate(range(first_run_day, self.days))
+            ),
+        )
+
+        def forecasts():
+            for k, d in enumerate(range(first_run_day, self.days)):
+                recent = [row[1] for row in rows[max(0, d - 29):d + 1]]
+                level = sum(recent) / len(recent)
+                for horizon in range(1, FORECAST_HORIZON + 1):
+                    yhat = min(100.0, max(0.0, level + rng.gauss(0, 2)))
+                    yield (
+                        run_id + k, horizon, reactor_id, rows[d][0] + timedelta(days=horizon),
+                        round(yhat, 2), round(max(yhat - 10, 0.0), 2), round(min(yhat + 5, 100.0), 2),
+                        status_id + d, self.created_at,
+                    )
+
+        forecast_count = write_rows(
+            ReactorForecast,
+            ['run_id', 'horizon', 'reactor_id', 'df', 'yhat', 'yhat_lower', 'yhat_upper', 'reactorstatus_id', 'created_at'],
+            forecasts(),
+        )
+
+        # Start of every unplanned outage, as the detector would have flagged it
+        outages = write_rows(
+            StubOutage,
+            ['reactor_id', 'date_detected', 'description', 'auto_detected', 'confirmed', 'reactorstatus_id', 'created_at'],
+            (
+                (reactor_id, day, f"{reason}: power dropped to 0", True, rng.random() < 0.7, status_id + d, self.created_at)
+                for d, (day, power, down_date, reason, changed, scrams) in enumerate(rows)
+                if reason in UNPLANNED and down_date == day
+            ),
+        )
+        return {'statuses': statuses, 'runs': runs, 'forecasts': forecast_count, 'outages': outages}
+
+    def finish(self):
+        refresh_latest_status(list(self.reactor_ids.values()))
+        rebuild_summaries(start=self.first_date, end=self.end_date)
+
+
+def seed_fleet(units, years, end_date, seed=0, forecast_days=1):
+    """
+    Replace the synthetic fleet with `units` units of `years` history through
+    `end_date`, with forecasts, stub outages and the latest-status and
+    fleet-summary tables, so every API endpoint has realistic data to serve.
+    Returns the reactor ids.
+    """
+    drop_fleet()
+    plan = FleetPlan(units, years, end_date, forecast_days, seed)
+    plan.prepare()
+    plan.write_units(range(units))
+    plan.finish()
+    return list(plan.reactor_ids.values())
+
+
+def drop_fleet():
+    """Delete the synthetic reactors and everything hanging off them. Returns the number of reactors."""
+    reactors = Reactor.objects.filter(name__startswith=SYNTHETIC_PREFIX)
+    dates = ReactorStatus.objects.filter(reactor__in=reactors).aggregate(start=Min('report_date'), end=Max('report_date'))
+    with transaction.atomic():
+        # Dependents first, each in one DELETE; cascading from Reactor would
+        # load every status row into memory
+        StubOutage.objects.filter(reactor__in=reactors).delete()
+        ReactorForecast.objects.filter(reactor__in=reactors).delete()
+        ForecastRun.objects.filter(reactor__in=reactors).delete()
+        ReactorLatestStatus.objects.filter(reactor__in=reactors).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {ReactorStatus._meta.db_table} WHERE reactor_id IN "
+                f"(SELECT id FROM {Reactor._meta.db_table} WHERE name LIKE %s)",
+                [SYNTHETIC_PREFIX + '%'],
+            )
+        deleted = reactors.delete()[1].get(Reactor._meta.label, 0)
+    if dates['start']:
+        rebuild_summaries(start=dates['start'], end=dates['end'])
+    return deleted
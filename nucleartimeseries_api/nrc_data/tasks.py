@@ -1,64 +1,221 @@
-from celery import shared_task
+import requests
+from celery import Task, chain, chord, shared_task
+from celery.exceptions import Ignore
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.db import OperationalError
+from django.utils.dateparse import parse_date
 from django.utils.timezone import now
-from datetime import timedelta
-from django.db.models import Max
-from nrc_data.models import ReactorStatus
-from django.core.management import call_command
-from nrc_data.forecast import generate_and_upload_forecast
+from nrc_data import ingest
+from nrc_data.forecast import fit_forecast, render_forecast_html, upload_forecast_html
+from nrc_data.fit_sandbox import FitLimitExceeded
+from nrc_data.outage_detection import detect_stub_outages_for_reactor
+from nrc_data.locks import LockNotAcquired, claim, is_done, mark_done, task_lock
+from nrc_data.metrics import track_stage
+from nrc_data.profiling import profiled
+from nrc_data.partitions import ensure_partition
+from nrc_data.forecast_runs import compact_forecast_runs
+from nrc_data.models import ForecastRun
 import logging
-import django
-import os
 
 logger = logging.getLogger(__name__)
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nucleartimeseries_api.settings")
-django.setup()
+# Nightly ingestion, one chain per report date:
+#
+#   fetch_report -> parse_report -> save_report -> forecast_reactors
+#                                                    chord(fit_reactor_forecast -> detect_reactor_outages,
+#                                                          ... per reactor) -> finish_ingest
+#
+# fit_reactor_forecast also queues upload_forecast_plot, so a slow S3 upload
+# never holds up the rest of the night. Every stage is idempotent (see
+# nrc_data/ingest.py): it's acked late, retried with exponential backoff on
+# transient errors, and a re-run pipeline skips stages that already completed.
+# CELERY_TASK_ROUTES in settings sends network-bound tasks to the `io` queue
+# and model fits to `cpu`.
+#
+# Concurrency (nrc_data/locks.py): a stage runs under a per-(date, stage)
+# lock and leaves an idempotency key when it finishes. A duplicate submission
+# (two beat triggers, a manual run next to the beat) stops its chain quietly,
+# either because the stage is already done or because another worker is
+# running it and will carry the pipeline on. Per-reactor tasks wait for each
+# other's locks instead, since the forecast chord needs every one of them.
+#
+# Profiling: pass profile=True to fetch_latest_nrc_data (or any of the tasks)
+# and every stage it runs writes a cProfile to NRC_PROFILE_DIR and logs its
+# hottest functions, e.g.
+#   celery -A nucleartimeseries_api call nrc_data.tasks.fetch_latest_nrc_data --kwargs '{"profile": true}'
 
-from nrc_data.models import ReactorStatus
+STAGE_RETRIES = dict(acks_late=True, retry_backoff=True, retry_backoff_max=600, retry_jitter=True, max_retries=5)
+# How long a reactor task waits for another worker on the same reactor before retrying
+REACTOR_LOCK_WAIT = 60
+# Backstop past the fit's own NRC_FIT_TIME_LIMIT alarm: Celery kills the pool child
+FIT_HARD_TIME_LIMIT = settings.NRC_FIT_TIME_LIMIT + 60 if settings.NRC_FIT_TIME_LIMIT else None
 
-# from forecast import generate_and_upload_forecast
-@shared_task
-def fetch_latest_nrc_data():
-    latest = ReactorStatus.objects.aggregate(Max('report_date'))['report_date__max']
-    logger.info(f"Latest date: {latest}")
-    if not latest:
-        print("No data found.")
+
+class StageTask(Task):
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        # Record why the pipeline stopped; the next run resumes from here
+        ingest.record_failure(parse_date(args[0]), exc)
+
+
+def run_stage(stage, report_date, func, profile=False):
+    key = f"{report_date}:{stage}"
+    if is_done(key):
+        logger.info(f"{stage} already done for {report_date}")
         return
-    
-    next_date = latest + timedelta(days=1)
-    today = now().date()
+    try:
+        with task_lock(f"stage:{key}"), profiled(f"{stage}-{report_date}", enabled=profile, log=logger.info):
+            func(parse_date(report_date))
+    except LockNotAcquired:
+        logger.info(f"{stage} for {report_date} is running elsewhere, dropping this chain")
+        raise Ignore()
+    mark_done(key)
+
+
+@shared_task(base=StageTask, autoretry_for=(requests.RequestException,), **STAGE_RETRIES)
+def fetch_report(report_date, profile=False):
+    run_stage('fetch', report_date, ingest.fetch_stage, profile)
+
 
-    if next_date > today:
-        print("No new date to fetch yet")
+@shared_task(base=StageTask, acks_late=True)
+def parse_report(report_date, profile=False):
+    run_stage('parse', report_date, ingest.parse_stage, profile)
+
+
+@shared_task(base=StageTask, autoretry_for=(OperationalError,), **STAGE_RETRIES)
+def save_report(report_date, profile=False):
+    run_stage('save', report_date, ingest.save_stage, profile)
+
+
+@shared_task(bind=True, base=StageTask, acks_late=True)
+def forecast_reactors(self, report_date, profile=False):
+    run = ingest.get_run(parse_date(report_date))
+    if is_done(f"{report_date}:finish") or ingest.completed(run, 'done'):
         return
-    
-    date_str = next_date.strftime("%Y%m%d")
+    # The chord outlives this task, so fan out once per lock period rather than under a lock
+    if not claim(f"{report_date}:forecast", settings.NRC_TASK_LOCK_TIMEOUT):
+        raise Ignore()
+    reactors = run.reactors
+    if not reactors:
+        ingest.finish(parse_date(report_date))
+        return
+    header = [
+        chain(fit_reactor_forecast.si(name, profile=profile), detect_reactor_outages.si(name, profile=profile))
+        for name in reactors
+    ]
+    # A header task can still fail outright (FIT_HARD_TIME_LIMIT killing a stuck
+    # fit); the chord then calls the body's errback instead, which finishes too
+    body = finish_ingest.si(report_date)
+    body.link_error(finish_ingest.si(report_date))
+    return self.replace(chord(header, body))
 
-    print(f"Fetching data for {date_str}")
 
+def run_reactor_step(task, step, reactor_name, func):
+    """
+    Run one reactor's step of the forecast chord. Database and lock errors are
+    retried with backoff; any other failure, or running out of retries, is
+    logged and the reactor skipped (returns None), since a failed header task
+    would keep the chord from ever running finish_ingest.
+    """
     try:
-        call_command('seed',
-        '--start-year', str(next_date.year),
-        '--end-year', str(next_date.year),
-        '--max-dates', str(1),
-        '--resume-from', str(date_str),
-        '--delay', str(0.5),
-        '--verbose'
-        )   
-    except Exception as e:
-        print(f"Error fetching data: {e}")
+        return func()
+    except (OperationalError, LockNotAcquired) as e:
+        if task.request.retries < task.max_retries:
+            countdown = get_exponential_backoff_interval(
+                factor=1, retries=task.request.retries, maximum=STAGE_RETRIES['retry_backoff_max'], full_jitter=True,
+            )
+            raise task.retry(exc=e, countdown=countdown)
+        logger.exception(f"{step} for {reactor_name} still failing after {task.max_retries} retries, skipping it")
+    except FitLimitExceeded as e:
+        # Not worth retrying; outage detection goes on with the reactor's previous forecast
+        logger.warning(f"Skipping {step} for {reactor_name}: {e}")
+    except Exception:
+        logger.exception(f"{step} failed for {reactor_name}, skipping it")
+    return None
+
+
+@shared_task(bind=True, time_limit=FIT_HARD_TIME_LIMIT, **STAGE_RETRIES)
+def fit_reactor_forecast(self, reactor_name, profile=False):
+    def fit():
+        with task_lock(f"fit:{reactor_name}", wait=REACTOR_LOCK_WAIT), track_stage('forecast'), \
+                profiled(f"fit-{reactor_name}", enabled=profile, log=logger.info):
+            run = fit_forecast(reactor_name)
+        if not run.image_url:
+            upload_forecast_plot.delay(run.id, profile=profile)
+        return run.id
+
+    return run_reactor_step(self, 'forecast', reactor_name, fit)
+
+
+@shared_task(autoretry_for=(Exception,), **STAGE_RETRIES)
+def upload_forecast_plot(run_id, profile=False):
+    key = f"upload:{run_id}"
+    if is_done(key):
         return
-    
-    updated_reactors = ReactorStatus.objects.filter(report_date=next_date).values_list('unit', flat=True).distinct()
+    try:
+        with task_lock(key), profiled(f"upload-{run_id}", enabled=profile, log=logger.info):
+            run = ForecastRun.objects.select_related('reactor').get(id=run_id)
+            with track_stage('render'):
+                html = render_forecast_html(run)
+            url = upload_forecast_html(run, html)
+    except LockNotAcquired:
+        raise Ignore()
+    mark_done(key)
+    return url
+
 
-    for reactor_name in updated_reactors:
-        try:
-            url = generate_and_upload_forecast(reactor_name)
-            print(f"✅ Forecast uploaded for {reactor_name}: {url}")
-        except Exception as e:
-            print(f"❌ Forecast failed for {reactor_name}: {e}")
+@shared_task(bind=True, **STAGE_RETRIES)
+def detect_reactor_outages(self, reactor_name, profile=False):
+    def detect():
+        with task_lock(f"detect:{reactor_name}", wait=REACTOR_LOCK_WAIT), track_stage('detect'), \
+                profiled(f"detect-{reactor_name}", enabled=profile, log=logger.info):
+            detect_stub_outages_for_reactor(reactor_name)
 
-    print(f"Data fetched and saved for {date_str}")
+    run_reactor_step(self, 'outage detection', reactor_name, detect)
 
 
+@shared_task(base=StageTask, acks_late=True)
+def finish_ingest(report_date):
+    ingest.finish(parse_date(report_date))
+    mark_done(f"{report_date}:finish")
+    logger.info(f"Ingestion finished for {report_date}")
 
+
+def ingest_pipeline(report_date, profile=False):
+    report_date = report_date.isoformat()
+    return chain(
+        fetch_report.si(report_date, profile=profile),
+        parse_report.si(report_date, profile=profile),
+        save_report.si(report_date, profile=profile),
+        forecast_reactors.si(report_date, profile=profile),
+    )
+
+
+@shared_task
+def fetch_latest_nrc_data(profile=False):
+    # Resume recent runs that stopped part-way, then start the next report
+    dates = ingest.dates_to_ingest()
+    if not dates:
+        logger.info("No new date to fetch yet")
+        return
+    for report_date in dates:
+        # One pipeline per date per lock period, however many times this fires
+        if not claim(f"{report_date}:pipeline", settings.NRC_TASK_LOCK_TIMEOUT):
+            logger.info(f"Pipeline for {report_date} already submitted")
+            continue
+        logger.info(f"Starting ingestion pipeline for {report_date}")
+        ingest_pipeline(report_date, profile).delay()
+
+
+@shared_task
+def ensure_next_status_partition():
+    # Next year's ReactorStatus partition must exist before its first report arrives
+    year = now().year + 1
+    if ensure_partition(year):
+        logger.info(f"Created ReactorStatus partition for {year}")
+
+
+@shared_task
+def compact_old_forecasts():
+    runs, deleted = compact_forecast_runs()
+    logger.info(f"Compacted {runs} forecast runs, deleted {deleted} horizon rows")
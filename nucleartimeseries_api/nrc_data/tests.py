@@ -1,3 +1,1403 @@
-from django.test import TestCase
+import json
+import re
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+from asgiref.sync import async_to_sync, sync_to_async
+from celery.backends.cache import CacheBackend
+from celery.exceptions import Ignore
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db.models import Max, Prefetch
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+import importlib.util
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import Mock, patch
+
+from nrc_data.aggregates import SUMMARY_FIELDS, rebuild_summaries
+from nrc_data.backtest import backtest_unit, horizon_summary, rolling_origins
+from nrc_data.cache import detail_key
+from nrc_data import ingest, locks, tasks
+from nrc_data.export import export_rows
+from nrc_data.forecast import generate_and_upload_forecast
+from nrc_data.forecast_runs import compact_forecast_runs, latest_run, save_forecast_run
+from nrc_data.management.commands.seed import Command as SeedCommand
+from nrc_data.management.commands.loadtest import summarize
+from nrc_data.latest import refresh_latest_status
+from nrc_data.models import (
+    Reactor, ReactorStatus, OutageReason, ForecastRun, ReactorForecast, StubOutage, FleetDailySummary, ReactorLatestStatus,
+    IngestRun, BacktestRun, BacktestMetric,
+)
+from nrc_data.outage_detection import detect_stub_outages_for_reactor
+from nrc_data.profiling import profiled
+from nrc_data.fit_sandbox import FitLimitExceeded, fit_sandbox
+from nrc_data.synthetic import FleetPlan, ensure_partitions, save_history, synthetic_units
+from nrc_data.partitions import ensure_partition, partition_name, reload_partition
+from nrc_data.routers import (
+    ingest_scopes, pin_keys, pin_primary, reactor_scopes, reading_from, replica_read_middleware,
+)
+from nrc_data.serializers import ReactorSerializer, SnapshotSerializer
+from nrc_data.views import detail_queryset, series_queryset
+from prometheus_client import REGISTRY
+from rest_framework.renderers import JSONRenderer
 
 # Create your tests here.
+
+REPORT_DATE = date(2025, 7, 1)
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Reads stay on the primary even when a replica alias is configured, since the
+# mirror connection can't see rows written inside a TestCase transaction. The
+# replica tests below switch it back on.
+primary_reads = override_settings(NRC_READ_DATABASE='default')
+
+
+def setUpModule():
+    primary_reads.enable()
+
+
+def tearDownModule():
+    primary_reads.disable()
+
+
+def make_fleet(size, start=0, report_date=REPORT_DATE):
+    """Create `size` reactors with one status row each for `report_date`."""
+    reactors = []
+    for i in range(start, start + size):
+        reactor = Reactor.objects.create(name=f"Test Unit {i}", region='I')
+        ReactorStatus.objects.create(
+            reactor=reactor,
+            report_date=report_date,
+            power=100,
+        )
+        reactors.append(reactor)
+    return reactors
+
+
+def forecast_rows(trained_through, days, yhat=99.0):
+    """(df, yhat, yhat_lower, yhat_upper) rows for horizons 1..`days`."""
+    return [(trained_through + timedelta(days=h), yhat, yhat - 5, 100.0) for h in range(1, days + 1)]
+
+
+@override_settings(CACHES=NO_CACHE)
+class ReactorViewTests(TestCase):
+    url = '/api/reactor/2025-07-01/'
+
+    def test_snapshot_returns_only_requested_date(self):
+        reactors = make_fleet(2)
+        ReactorStatus.objects.create(
+            reactor=reactors[0],
+            report_date=date(2025, 6, 30),
+            power=50,
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+        for reactor in response.json():
+            self.assertEqual(len(reactor['reactorstatus']), 1)
+            self.assertEqual(reactor['reactorstatus'][0]['report_date'], '2025-07-01')
+
+    def test_query_count_is_constant_in_fleet_size(self):
+        # A single joined query for the statuses and their reactors
+        make_fleet(3)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+        make_fleet(60, start=3)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 63)
+
+    def test_ingestion_interns_reasons(self):
+        df = pd.DataFrame(
+            [
+                ['Salem 1', '0', '06/01/2025', 'Refueling Outage', pd.NA, pd.NA],
+                ['Salem 2', '0', '06/15/2025', 'Refueling Outage', pd.NA, pd.NA],
+                ['Hope Creek 1', '100', pd.NA, pd.NA, pd.NA, pd.NA],
+            ],
+            columns=['Unit', 'Power', 'Down', 'Reason', 'Change', 'Scrams'],
+        )
+        SeedCommand().save_dataframe_to_db(df, '20250701')
+        self.assertEqual(OutageReason.objects.count(), 1)
+
+        statuses = {status['unit']: status for reactor in self.client.get(self.url).json() for status in reactor['reactorstatus']}
+        self.assertEqual(statuses['Salem 2']['reason'], 'Refueling Outage')
+        self.assertIsNone(statuses['Hope Creek 1']['reason'])
+
+    def test_fast_path_matches_model_serializers(self):
+        reactors = make_fleet(3)
+        ReactorStatus.objects.filter(reactor=reactors[1]).update(
+            power=0, down_date=date(2025, 6, 1), reason=OutageReason.objects.create(text='Refueling Outage'), changed=True, scrams=1
+        )
+        prefetched = Reactor.objects.filter(reactorstatus__report_date=REPORT_DATE).distinct().order_by('id').prefetch_related(
+            Prefetch(
+                'reactorstatus',
+                queryset=ReactorStatus.objects.filter(report_date=REPORT_DATE).select_related('reason'),
+                to_attr='statuses_for_date',
+            )
+        )
+        expected = JSONRenderer().render(ReactorSerializer(prefetched, many=True).data)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content), json.loads(expected))
+
+
+@override_settings(CACHES=NO_CACHE)
+class ReactorDetailViewTests(TestCase):
+    def setUp(self):
+        self.reactor = make_fleet(1)[0]
+        self.status = self.reactor.reactorstatus.get()
+        self.url = f'/api/reactor/2025-07-01/{self.reactor.id}/'
+
+    def test_missing_reactor_or_date_returns_404(self):
+        self.assertEqual(self.client.get('/api/reactor/2025-07-01/999999/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/reactor/2025-06-01/{self.reactor.id}/').status_code, 404)
+
+    def test_outage_flag(self):
+        self.assertFalse(self.client.get(self.url).json()['stuboutage'])
+
+        StubOutage.objects.create(reactor=self.reactor, reactorstatus=self.status, date_detected=REPORT_DATE)
+        data = self.client.get(self.url).json()
+        self.assertTrue(data['stuboutage'])
+        self.assertEqual(len(data['stuboutage_set']), 1)
+
+    def test_query_count_is_constant(self):
+        # Status (with reactor and outage flag), forecasts, outages
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        save_forecast_run(self.reactor, self.status, 'prophet', {}, forecast_rows(REPORT_DATE, 30))
+        for _ in range(10):
+            StubOutage.objects.create(reactor=self.reactor, reactorstatus=self.status, date_detected=REPORT_DATE)
+        with self.assertNumQueries(3):
+            data = self.client.get(self.url).json()
+        # Only the next-day and 30-day horizons are shown
+        self.assertEqual([row['df'] for row in data['reactorforecast_set']], ['2025-07-02', '2025-07-31'])
+        self.assertEqual(len(data['stuboutage_set']), 10)
+
+
+@override_settings(CACHES=NO_CACHE)
+class ReactorBatchViewTests(TestCase):
+    def setUp(self):
+        self.reactors = make_fleet(5)
+        self.ids = ','.join(str(reactor.id) for reactor in self.reactors[:3])
+        self.url = '/api/reactor/2025-07-01/batch/'
+
+    def test_matches_detail_responses(self):
+        data = self.client.get(self.url, {'ids': self.ids}).json()
+        self.assertEqual([row['reactor'] for row in data], [reactor.id for reactor in self.reactors[:3]])
+        for row in data:
+            detail = self.client.get(f"/api/reactor/2025-07-01/{row.pop('reactor')}/").json()
+            self.assertEqual(row, detail)
+
+    def test_query_count_is_constant(self):
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'region': 'I'})
+        for reactor in make_fleet(20, start=5):
+            status = reactor.reactorstatus.get()
+            StubOutage.objects.create(reactor=reactor, reactorstatus=status, date_detected=REPORT_DATE)
+        with self.assertNumQueries(3):
+            data = self.client.get(self.url, {'region': 'I'}).json()
+        self.assertEqual(len(data), 25)
+        self.assertEqual(sum(row['stuboutage'] for row in data), 20)
+
+    def test_sparse_fieldset(self):
+        # Relations that aren't requested aren't fetched
+        with self.assertNumQueries(1):
+            data = self.client.get(self.url, {'ids': self.ids, 'fields': 'power,stuboutage'}).json()
+        self.assertEqual(data[0], {'reactor': self.reactors[0].id, 'power': 100, 'stuboutage': False})
+
+    def test_invalid_params(self):
+        for params in ({}, {'ids': self.ids, 'region': 'I'}, {'ids': '1,x'}, {'region': 'V'},
+                       {'ids': self.ids, 'fields': 'power,secret'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reactor = make_fleet(1)[0]
+        self.snapshot_url = '/api/reactor/2025-07-01/'
+        self.detail_url = f'/api/reactor/2025-07-01/{self.reactor.id}/'
+
+    def test_repeat_requests_are_served_from_cache(self):
+        first = self.client.get(self.snapshot_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.snapshot_url)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_conditional_requests_return_304(self):
+        response = self.client.get(self.detail_url)
+
+        not_modified = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        not_modified = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_invalid_date_returns_400(self):
+        self.assertEqual(self.client.get('/api/reactor/not-a-date/').status_code, 400)
+        self.assertEqual(self.client.get('/api/reactor/2025-02-30/').status_code, 400)
+
+    def test_seed_invalidates_the_date(self):
+        self.client.get(self.snapshot_url)
+        self.client.get(self.detail_url)
+
+        df = pd.DataFrame(
+            [['New Unit 1', '100', pd.NA, pd.NA, pd.NA, pd.NA]],
+            columns=['Unit', 'Power', 'Down', 'Reason', 'Change', 'Scrams'],
+        )
+        SeedCommand().save_dataframe_to_db(df, '20250701')
+
+        self.assertIsNone(cache.get(detail_key(REPORT_DATE, self.reactor.id)))
+        self.assertEqual(len(self.client.get(self.snapshot_url).json()), 2)
+
+    def test_detected_outage_invalidates_the_reactor(self):
+        self.assertFalse(self.client.get(self.detail_url).json()['stuboutage'])
+
+        ReactorStatus.objects.filter(reactor=self.reactor).update(power=50)
+        status = self.reactor.reactorstatus.get(report_date=REPORT_DATE)
+        save_forecast_run(self.reactor, status, 'prophet', {}, forecast_rows(REPORT_DATE, 1, yhat=100.0))
+        with self.assertLogs('nrc_data.outage_detection', 'INFO') as logs:
+            detect_stub_outages_for_reactor(self.reactor.name)
+        self.assertIn('drop = 50.0', logs.output[-1])
+
+        self.assertTrue(self.client.get(self.detail_url).json()['stuboutage'])
+
+    def test_failed_plot_upload_is_raised(self):
+        with patch('nrc_data.forecast.fit_forecast'), patch('nrc_data.forecast.render_forecast_html'), \
+                patch('nrc_data.forecast.upload_forecast_html', side_effect=OSError('bucket gone')), \
+                self.assertLogs('nrc_data.forecast', 'ERROR'), self.assertRaises(OSError):
+            generate_and_upload_forecast(self.reactor.name)
+
+
+class ReactorSeriesViewTests(TestCase):
+    def setUp(self):
+        self.reactor = Reactor.objects.create(name="Series Unit 1", region='III')
+        # Jan 2025 at 100%, Feb 2025 at 50%
+        for day in range(1, 32):
+            ReactorStatus.objects.create(reactor=self.reactor, report_date=date(2025, 1, day), power=100)
+        for day in range(1, 29):
+            ReactorStatus.objects.create(reactor=self.reactor, report_date=date(2025, 2, day), power=50)
+        self.url = f'/api/reactor/{self.reactor.id}/series/'
+
+    def test_daily_series_is_columnar(self):
+        data = self.client.get(self.url, {'start': '2025-01-30', 'end': '2025-02-02'}).json()
+        self.assertEqual(data['resolution'], 'daily')
+        self.assertEqual(data['dates'], ['2025-01-30', '2025-01-31', '2025-02-01', '2025-02-02'])
+        self.assertEqual(data['power'], [100, 100, 50, 50])
+
+    def test_monthly_series_is_aggregated(self):
+        with self.assertNumQueries(2):
+            data = self.client.get(self.url, {'resolution': 'monthly'}).json()
+        self.assertEqual(data['dates'], ['2025-01-01', '2025-02-01'])
+        self.assertEqual(data['power'], [100.0, 50.0])
+
+    def test_weekly_series_starts_on_mondays(self):
+        data = self.client.get(self.url, {'resolution': 'weekly', 'end': '2025-01-12'}).json()
+        # 2025-01-01 is a Wednesday
+        self.assertEqual(data['dates'], ['2024-12-30', '2025-01-06'])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'resolution': 'hourly'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'start': '01/01/2025'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/reactor/999999/series/').status_code, 404)
+
+
+class ReactorExportTests(TestCase):
+    def setUp(self):
+        make_fleet(3)
+        make_fleet(2, start=3, report_date=date(2025, 7, 2))
+        Reactor.objects.filter(name="Test Unit 4").update(region='IV')
+
+    def read_stream(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_csv_export_streams_all_rows(self):
+        response = self.client.get('/api/export/csv/', HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = self.read_stream(response).decode().splitlines()
+        self.assertEqual(lines[0], 'report_date,unit,region,power,down_date,reason,changed,scrams')
+        self.assertEqual(len(lines), 6)
+
+    def test_csv_export_filters(self):
+        response = self.client.get('/api/export/csv/', {'region': 'IV', 'start': '2025-07-02'})
+        lines = self.read_stream(response).decode().splitlines()
+        self.assertEqual(lines[1:], ['2025-07-02,Test Unit 4,IV,100,,,False,'])
+
+    def test_parquet_export_round_trips(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+        from io import BytesIO
+        from nrc_data.export import export_rows, iter_parquet
+
+        # A small chunk size forces several row groups
+        content = b''.join(iter_parquet(export_rows(), chunk_size=2))
+        parquet = pq.ParquetFile(BytesIO(content))
+        self.assertEqual(parquet.metadata.num_rows, 5)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        self.assertEqual(parquet.read().column('unit').to_pylist()[0], 'Test Unit 0')
+
+    def test_export_command_writes_to_command_stdout(self):
+        out = StringIO()
+        call_command('export_history', '--region', 'IV', stdout=out)
+        self.assertEqual(out.getvalue().splitlines(), [
+            'report_date,unit,region,power,down_date,reason,changed,scrams',
+            '2025-07-02,Test Unit 4,IV,100,,,False,',
+        ])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/export/xlsx/').status_code, 400)
+        self.assertEqual(self.client.get('/api/export/csv/', {'region': 'V'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/export/csv/', {'end': 'yesterday'}).status_code, 400)
+
+
+@override_settings(CACHES=NO_CACHE)
+class FleetSummaryTests(TestCase):
+    def save_report(self, date_str, rows):
+        df = pd.DataFrame(rows, columns=['Unit', 'Power', 'Down', 'Reason', 'Change', 'Scrams'])
+        SeedCommand().save_dataframe_to_db(df, date_str)
+
+    def test_ingestion_maintains_regional_aggregates(self):
+        self.save_report('20250701', [
+            ['Beaver Valley 1', '100', pd.NA, pd.NA, pd.NA, pd.NA],
+            ['Salem 1', '0', '06/01/2025', 'Refueling Outage', '*', '1'],
+            ['Vogtle 3', '90', pd.NA, pd.NA, pd.NA, pd.NA],
+        ])
+
+        summary = FleetDailySummary.objects.get(report_date=date(2025, 7, 1), region='I')
+        self.assertEqual(summary.unit_count, 2)
+        self.assertEqual(summary.avg_power, 50.0)
+        self.assertEqual(summary.units_at_zero, 1)
+        self.assertEqual(summary.units_changed, 1)
+        self.assertEqual(summary.scram_total, 1)
+        self.assertEqual(FleetDailySummary.objects.get(region='II').unit_count, 1)
+
+        # A later report for the same date only adds the new unit
+        self.save_report('20250701', [['Palo Verde 1', '100', pd.NA, pd.NA, pd.NA, pd.NA]])
+        self.assertEqual(FleetDailySummary.objects.filter(report_date=date(2025, 7, 1)).count(), 3)
+
+    def test_summary_endpoint(self):
+        self.save_report('20250701', [
+            ['Beaver Valley 1', '100', pd.NA, pd.NA, pd.NA, pd.NA],
+            ['Salem 1', '40', pd.NA, pd.NA, pd.NA, pd.NA],
+            ['Vogtle 3', '100', pd.NA, pd.NA, pd.NA, pd.NA],
+        ])
+        self.save_report('20250702', [['Beaver Valley 1', '90', pd.NA, pd.NA, pd.NA, pd.NA]])
+
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/fleet/summary/', {'start': '2025-07-01'}).json()
+        self.assertEqual(data['fleet']['dates'], ['2025-07-01', '2025-07-02'])
+        self.assertEqual(data['fleet']['avg_power'], [80.0, 90.0])
+        self.assertEqual(data['regions']['I']['avg_power'], [70.0, 90.0])
+        self.assertEqual(data['regions']['II']['unit_count'], [1])
+
+        data = self.client.get('/api/fleet/summary/', {'region': 'II'}).json()
+        self.assertEqual(list(data['regions']), ['II'])
+        self.assertEqual(self.client.get('/api/fleet/summary/', {'region': 'V'}).status_code, 400)
+
+    def test_rebuild_matches_incremental(self):
+        self.save_report('20250701', [
+            ['Beaver Valley 1', '100', pd.NA, pd.NA, pd.NA, pd.NA],
+            ['Vogtle 3', '0', pd.NA, pd.NA, pd.NA, pd.NA],
+        ])
+        incremental = list(FleetDailySummary.objects.order_by('region').values(*SUMMARY_FIELDS))
+        self.assertEqual(rebuild_summaries(), 2)
+        self.assertEqual(list(FleetDailySummary.objects.order_by('region').values(*SUMMARY_FIELDS)), incremental)
+
+    def test_rebuild_fills_in_blank_regions(self):
+        # Reactors from before regions were recorded
+        for name, power in [('Vogtle 3', 0), ('Byron 1', 100), ('Unlisted 1', 50)]:
+            reactor = Reactor.objects.create(name=name, region='')
+            ReactorStatus.objects.create(reactor=reactor, report_date=date(2025, 7, 1), power=power)
+
+        self.assertEqual(rebuild_summaries(), 3)
+        self.assertEqual(
+            dict(Reactor.objects.values_list('name', 'region')),
+            {'Vogtle 3': 'II', 'Byron 1': 'III', 'Unlisted 1': 'I'},
+        )
+        self.assertEqual(
+            dict(FleetDailySummary.objects.values_list('region', 'power_total')),
+            {'I': 50, 'II': 0, 'III': 100},
+        )
+
+
+@override_settings(CACHES=NO_CACHE)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.reactors = make_fleet(3)
+        ReactorStatus.objects.create(reactor=self.reactors[0], report_date=date(2025, 7, 2), power=80)
+        status = self.reactors[0].reactorstatus.get(report_date=REPORT_DATE)
+        StubOutage.objects.create(reactor=self.reactors[0], reactorstatus=status, date_detected=REPORT_DATE)
+
+    async def assert_same_as_sync(self, path, params=None):
+        sync_response = await sync_to_async(self.client.get)(f'/api/{path}', params)
+        async_response = await self.async_client.get(f'/api/async/{path}', params)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.json(), sync_response.json())
+
+    async def test_read_endpoints_match_sync_views(self):
+        reactor_id = self.reactors[0].id
+        await self.assert_same_as_sync('reactor/2025-07-01/')
+        await self.assert_same_as_sync('reactor/latest/')
+        await self.assert_same_as_sync(f'reactor/2025-07-01/{reactor_id}/')
+        await self.assert_same_as_sync('reactor/2025-07-01/batch/', {'region': 'I'})
+        await self.assert_same_as_sync('reactor/2025-07-01/batch/', {'ids': reactor_id, 'fields': 'stuboutage'})
+        await self.assert_same_as_sync(f'reactor/{reactor_id}/series/', {'resolution': 'monthly'})
+        await self.assert_same_as_sync('fleet/summary/', {'start': '2025-07-01'})
+        await self.assert_same_as_sync('reactor/2025-07-01/999999/')
+        await self.assert_same_as_sync('reactor/999999/series/')
+        await self.assert_same_as_sync('reactor/2025-07-01/', {'x': 1})
+        await self.assert_same_as_sync('fleet/summary/', {'region': 'V'})
+        await self.assert_same_as_sync('reactor/2025-07-01/batch/', {'ids': 'x'})
+
+    async def test_detail_outage_flag(self):
+        response = await self.async_client.get(f'/api/async/reactor/2025-07-01/{self.reactors[0].id}/')
+        self.assertTrue(response.json()['stuboutage'])
+        self.assertIn('ETag', response)
+
+
+REPORT_HTML = """
+<table class="power">
+  <tr><th>Unit</th><th>Power</th><th>Down</th><th>Reason</th><th>Change</th><th>Scrams</th></tr>
+  <tr><td>Salem 1</td><td>100</td><td></td><td></td><td></td><td></td></tr>
+  <tr><td>Salem 2</td><td>0</td><td>06/15/2025</td><td>Refueling Outage</td><td></td><td></td></tr>
+</table>
+"""
+
+
+@override_settings(CACHES=NO_CACHE)
+class IngestPipelineTests(TestCase):
+    def respond(self, status_code=200, text=REPORT_HTML):
+        return patch('nrc_data.ingest.requests.get', return_value=Mock(status_code=status_code, text=text, raise_for_status=Mock()))
+
+    def test_stages_resume_after_last_completed(self):
+        with self.respond() as get:
+            ingest.fetch_stage(REPORT_DATE)
+            ingest.parse_stage(REPORT_DATE)
+            self.assertEqual(ingest.save_stage(REPORT_DATE), ['Salem 1', 'Salem 2'])
+
+            # Re-running the pipeline skips the completed stages
+            ingest.fetch_stage(REPORT_DATE)
+            ingest.parse_stage(REPORT_DATE)
+            self.assertEqual(ingest.save_stage(REPORT_DATE), ['Salem 1', 'Salem 2'])
+        self.assertEqual(get.call_count, 1)
+
+        run = IngestRun.objects.get(report_date=REPORT_DATE)
+        self.assertEqual(run.stage, 'saved')
+        self.assertEqual(run.report_html, '')
+        status = ReactorStatus.objects.get(reactor__name='Salem 2', report_date=REPORT_DATE)
+        self.assertEqual((status.power, status.reason.text), (0, 'Refueling Outage'))
+
+        ingest.finish(REPORT_DATE)
+        self.assertEqual(IngestRun.objects.get(report_date=REPORT_DATE).stage, 'done')
+
+    def test_unpublished_report(self):
+        with self.respond(status_code=404):
+            with self.assertRaises(ingest.ReportNotPublished):
+                ingest.fetch_stage(REPORT_DATE)
+        self.assertEqual(IngestRun.objects.get(report_date=REPORT_DATE).stage, 'pending')
+
+    def test_report_without_tables_fails_parse(self):
+        with self.respond(text='<html></html>'):
+            ingest.fetch_stage(REPORT_DATE)
+        with self.assertRaises(ValueError):
+            ingest.parse_stage(REPORT_DATE)
+        self.assertEqual(IngestRun.objects.get(report_date=REPORT_DATE).stage, 'fetched')
+
+    def test_dates_to_ingest(self):
+        make_fleet(1)
+        today = timezone.now().date()
+        IngestRun.objects.create(report_date=today - timedelta(days=1), stage='parsed')
+        IngestRun.objects.create(report_date=today - timedelta(days=2), stage='done')
+        IngestRun.objects.create(report_date=today - timedelta(days=30), stage='fetched')
+        self.assertEqual(ingest.dates_to_ingest(), [today - timedelta(days=1), REPORT_DATE + timedelta(days=1)])
+
+
+@override_settings(CACHES=NO_CACHE)
+class MetricsTests(TestCase):
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_api_latency_and_queries_by_route(self):
+        make_fleet(2)
+        labels = {'method': 'GET', 'route': 'api/reactor/<str:report_date>/', 'status': '200'}
+        before = self.sample('nrc_api_request_duration_seconds_count', **labels)
+        queries_before = self.sample('nrc_api_request_db_queries_sum', route=labels['route'])
+
+        self.client.get('/api/reactor/2025-07-01/')
+        self.client.get('/api/reactor/2025-06-30/')
+
+        self.assertEqual(self.sample('nrc_api_request_duration_seconds_count', **labels), before + 2)
+        self.assertGreater(self.sample('nrc_api_request_db_queries_sum', route=labels['route']), queries_before)
+
+        with override_settings(NRC_METRICS_TOKEN='scrape-me'):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-me')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            b'nrc_api_request_duration_seconds_count{method="GET",route="api/reactor/<str:report_date>/",status="200"}',
+            response.content,
+        )
+
+    def test_metrics_need_a_token_or_allowed_address(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with override_settings(NRC_METRICS_ALLOWED_IPS=['10.0.0.5']):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.6').status_code, 404)
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.5').status_code, 200)
+
+    @override_settings(NRC_WORKER_METRICS_PORT=9808)
+    def test_worker_exporter_warns_without_multiproc_dir(self):
+        from nrc_data import metrics
+
+        with patch('nrc_data.metrics.start_http_server') as start, patch.dict(os.environ), \
+                self.assertLogs('nrc_data.metrics', 'WARNING'):
+            os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+            metrics.start_worker_metrics_server()
+        start.assert_called_once()
+
+    def test_pipeline_stages_are_timed(self):
+        fetched = self.sample('nrc_stage_duration_seconds_count', stage='fetch')
+        saved_rows = self.sample('nrc_rows_saved_total')
+        with patch('nrc_data.ingest.requests.get', return_value=Mock(status_code=200, text=REPORT_HTML, raise_for_status=Mock())):
+            ingest.fetch_stage(REPORT_DATE)
+        ingest.parse_stage(REPORT_DATE)
+        ingest.save_stage(REPORT_DATE)
+
+        self.assertEqual(self.sample('nrc_stage_duration_seconds_count', stage='fetch'), fetched + 1)
+        self.assertEqual(self.sample('nrc_rows_saved_total'), saved_rows + 2)
+        self.assertGreater(self.sample('nrc_stage_db_queries_sum', stage='save'), 0)
+        self.assertGreater(self.sample('nrc_artifact_bytes_sum', kind='report_html'), 0)
+
+
+@override_settings(CACHES=NO_CACHE)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_seed_profile(self):
+        out = StringIO()
+        with patch('nrc_data.ingest.requests.get', return_value=Mock(status_code=200, text=REPORT_HTML, raise_for_status=Mock())):
+            call_command(
+                'seed', '--start-year', '2025', '--end-year', '2025', '--resume-from', '20250701', '--max-dates', '1',
+                '--delay', '0', '--profile', '--profile-dir', self.tmp.name, stdout=out,
+            )
+        self.assertTrue(ReactorStatus.objects.filter(report_date=REPORT_DATE).exists())
+        profile = next(Path(self.tmp.name).glob('seed-*.prof'))
+        self.assertTrue(profile.with_suffix('.txt').exists())
+        self.assertIn('top 25 by cumulative', out.getvalue())
+        self.assertIn('save_dataframe_to_db', out.getvalue())
+
+    def test_disabled_profile_writes_nothing(self):
+        with profiled('noop', enabled=False, directory=self.tmp.name) as profiler:
+            pass
+        self.assertIsNone(profiler)
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
+
+    def test_profile_dir_setting(self):
+        logged = []
+        with override_settings(NRC_PROFILE_DIR=self.tmp.name):
+            with profiled('forecast-Salem 1', log=logged.append):
+                sum(range(1000))
+        self.assertEqual([p.name[:16] for p in Path(self.tmp.name).glob('*.prof')], ['forecast-Salem_1'])
+        self.assertIn('top 25 by tottime', logged[0])
+
+
+class FitSandboxTests(TestCase):
+    @override_settings(NRC_FIT_MEMORY_MB=1024, NRC_FIT_TIME_LIMIT=0)
+    def test_memory_limit(self):
+        with self.assertRaises(FitLimitExceeded):
+            with fit_sandbox('Salem 1'):
+                bytearray(2 * 1024 ** 3)
+        # The limit is lifted again afterwards
+        bytearray(64 * 1024 ** 2)
+
+    @override_settings(NRC_FIT_MEMORY_MB=1024, NRC_FIT_TIME_LIMIT=1)
+    def test_no_limits_off_the_main_thread(self):
+        # E.g. a threads pool: the cap would apply to every task in the process
+        before = resource.getrlimit(resource.RLIMIT_DATA)
+        seen = []
+
+        def fit():
+            with fit_sandbox('Salem 1'):
+                seen.append(resource.getrlimit(resource.RLIMIT_DATA))
+
+        thread = threading.Thread(target=fit)
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, [before])
+
+    @override_settings(NRC_FIT_MEMORY_MB=0, NRC_FIT_TIME_LIMIT=1)
+    def test_time_limit(self):
+        started = time.perf_counter()
+        with self.assertRaises(FitLimitExceeded):
+            with fit_sandbox('Salem 1'):
+                time.sleep(10)
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def stan_like_fit(self, code):
+        # Runs a "binary" the way cmdstanpy does: a failure comes back as a
+        # RuntimeError carrying the process output
+        proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        if proc.returncode:
+            raise RuntimeError(f"Error during optimization! Command failed, console log output:\n{proc.stderr}")
+
+    @override_settings(NRC_FIT_MEMORY_MB=1024, NRC_FIT_TIME_LIMIT=0)
+    def test_stan_process_out_of_memory(self):
+        # The child inherits the limit and dies on the allocation
+        with self.assertRaises(FitLimitExceeded):
+            with fit_sandbox('Salem 1'):
+                self.stan_like_fit('bytearray(2 * 1024 ** 3)')
+
+        # Other failures of the binary are not limits
+        with self.assertRaisesMessage(RuntimeError, 'ValueError: bad init'):
+            with fit_sandbox('Salem 1'):
+                self.stan_like_fit('raise ValueError("bad init")')
+
+    @override_settings(NRC_FIT_MEMORY_MB=0, NRC_FIT_TIME_LIMIT=1)
+    def test_time_limit_kills_the_stan_process(self):
+        with self.assertRaises(FitLimitExceeded):
+            with fit_sandbox('Salem 1'):
+                proc = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+                proc.wait()
+        with self.assertRaises(ProcessLookupError):
+            os.kill(proc.pid, 0)
+
+    @override_settings(NRC_FIT_MEMORY_MB=0, NRC_FIT_TIME_LIMIT=0)
+    def test_temp_files_are_removed(self):
+        with tempfile.TemporaryDirectory() as stan_dir:
+            open(os.path.join(stan_dir, 'earlier.csv'), 'w').close()
+            with patch('nrc_data.fit_sandbox.stan_tmpdir', return_value=stan_dir):
+                with fit_sandbox('Salem 1'):
+                    open(os.path.join(stan_dir, 'prophet_model-1.csv'), 'w').close()
+                    os.mkdir(os.path.join(stan_dir, 'tmpdata'))
+                    fd, scratch = tempfile.mkstemp()
+                    os.close(fd)
+            self.assertEqual(os.listdir(stan_dir), ['earlier.csv'])
+        self.assertFalse(os.path.exists(scratch))
+
+    def test_task_skips_a_fit_over_its_limits(self):
+        from nrc_data import tasks
+
+        with patch('nrc_data.tasks.task_lock', return_value=nullcontext()), \
+                patch('nrc_data.tasks.fit_forecast', side_effect=FitLimitExceeded('too big')), \
+                self.assertLogs('nrc_data.tasks', 'WARNING'):
+            self.assertIsNone(tasks.fit_reactor_forecast.run('Salem 1'))
+
+
+@override_settings(CACHES=NO_CACHE)
+class SyntheticFleetTests(TestCase):
+    def test_histories_are_repeatable_and_plausible(self):
+        fleet = list(synthetic_units(4, 3, REPORT_DATE, seed=7))
+        self.assertEqual(fleet, list(synthetic_units(4, 3, REPORT_DATE, seed=7)))
+        self.assertEqual([name for name, *_ in fleet], ['SYN-0000', 'SYN-0001', 'SYN-0002', 'SYN-0003'])
+        for name, region, first_date, powers in fleet:
+            self.assertEqual(first_date + timedelta(days=len(powers) - 1), REPORT_DATE)
+            self.assertTrue(all(0 <= power <= 100 for power in powers))
+            # Three years always include a refueling outage and mostly full power
+            self.assertIn(0, powers)
+            self.assertGreater(powers.count(100), len(powers) / 2)
+
+    def test_benchmark_units_have_their_own_prefix(self):
+        names = [name for name, *_ in synthetic_units(2, 1, REPORT_DATE, prefix='BENCH-')]
+        self.assertEqual(names, ['BENCH-0000', 'BENCH-0001'])
+
+    def test_bench_forecast_needs_a_holdout_inside_the_history(self):
+        for holdout in ('0', '-5', '365'):
+            with self.assertRaisesMessage(CommandError, '--holdout'):
+                call_command('bench_forecast', '--units', '1', '--years', '1', '--holdout', holdout, stdout=StringIO())
+
+    def test_save_history(self):
+        name, region, first_date, powers = next(synthetic_units(1, 1, REPORT_DATE))
+        reactor = save_history(name, region, first_date, powers)
+        self.assertEqual(
+            list(ReactorStatus.objects.filter(reactor=reactor).order_by('report_date').values_list('power', flat=True)),
+            powers,
+        )
+
+    def test_generate_fleet(self):
+        call_command(
+            'generate_fleet', '--units', '4', '--years', '2', '--forecast-days', '3', '--end-date', '20250701',
+            stdout=StringIO(),
+        )
+        reactors = Reactor.objects.filter(name__startswith='SYN-')
+        self.assertEqual(sorted(reactors.values_list('region', flat=True)), ['I', 'II', 'III', 'IV'])
+        statuses = ReactorStatus.objects.filter(reactor__in=reactors)
+        self.assertEqual(statuses.count(), 4 * 730)
+        self.assertEqual(statuses.aggregate(Max('report_date'))['report_date__max'], REPORT_DATE)
+
+        # Outages carry their start date and reason, refueling included
+        down = statuses.filter(power=0)
+        self.assertTrue(down.exists())
+        self.assertFalse(down.filter(down_date__isnull=True).exists())
+        self.assertFalse(down.filter(reason__isnull=True).exists())
+        self.assertTrue(down.filter(reason__text='Refueling Outage').exists())
+        self.assertFalse(statuses.filter(power__gt=0, down_date__isnull=False).exists())
+
+        self.assertEqual(ForecastRun.objects.filter(reactor__in=reactors).count(), 12)
+        self.assertEqual(ReactorForecast.objects.filter(reactor__in=reactors).count(), 12 * 30)
+        for outage in StubOutage.objects.filter(reactor__in=reactors):
+            self.assertEqual((outage.reactorstatus.report_date, outage.reactorstatus.power), (outage.date_detected, 0))
+        self.assertEqual(ReactorLatestStatus.objects.filter(reactor__in=reactors).count(), 4)
+        self.assertEqual(FleetDailySummary.objects.get(report_date=REPORT_DATE, region='I').unit_count, 1)
+
+        # New rows after the generated ids don't collide with them
+        ReactorStatus.objects.create(reactor=reactors[0], report_date=REPORT_DATE + timedelta(days=1), power=100)
+
+        detail = self.client.get(f'/api/reactor/2025-07-01/{reactors.get(name="SYN-0000").id}/').json()
+        self.assertEqual(len(detail['reactorforecast_set']), 2)
+
+    @skipUnless(connection.vendor == 'postgresql', "ids are reserved in PostgreSQL's sequences")
+    def test_rows_inserted_while_a_fleet_is_written(self):
+        plan = FleetPlan(2, 1, REPORT_DATE, 1, seed=0)
+        plan.prepare()
+        # E.g. an ingest landing between prepare() and the workers
+        other = Reactor.objects.create(name='OTHER')
+        ReactorStatus.objects.create(reactor=other, report_date=REPORT_DATE, power=100)
+        ForecastRun.objects.create(reactor=other, trained_through=REPORT_DATE, engine='naive', config_hash='x')
+        plan.write_units(range(2))
+        self.assertEqual(ReactorStatus.objects.filter(reactor__name__startswith='SYN-').count(), 2 * plan.days)
+
+    def test_generate_fleet_replace_is_repeatable(self):
+        args = ['generate_fleet', '--units', '2', '--years', '1', '--forecast-days', '1', '--end-date', '20250701']
+        call_command(*args, stdout=StringIO())
+        powers = list(ReactorStatus.objects.filter(reactor__name='SYN-0001').order_by('report_date').values_list('power', flat=True))
+        with self.assertRaises(CommandError):
+            call_command(*args, stdout=StringIO())
+        call_command(*args, '--replace', stdout=StringIO())
+        self.assertEqual(
+            list(ReactorStatus.objects.filter(reactor__name='SYN-0001').order_by('report_date').values_list('power', flat=True)),
+            powers,
+        )
+
+    @skipUnless(
+        importlib.util.find_spec('prophet') and importlib.util.find_spec('plotly'),
+        "benchmark fits real forecasts",
+    )
+    def test_bench_forecast_rolls_back(self):
+        # Next to a generated fleet, whose names it must not reuse
+        call_command('generate_fleet', '--units', '2', '--years', '1', '--forecast-days', '1', stdout=StringIO())
+        out = StringIO()
+        call_command('bench_forecast', '--units', '2', '--years', '2', stdout=out)
+        self.assertIn('MAE', out.getvalue())
+        self.assertFalse(Reactor.objects.filter(name__startswith='BENCH-').exists())
+        self.assertEqual(Reactor.objects.filter(name__startswith='SYN-').count(), 2)
+
+
+# loadtest's client sends Host: localhost
+@override_settings(CACHES=NO_CACHE, ALLOWED_HOSTS=['localhost'])
+class LoadTestCommandTests(TransactionTestCase):
+    def test_synthetic_fleet_load_test(self):
+        results = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False)
+        self.addCleanup(os.remove, results.name)
+        args = ['loadtest', '--endpoint', 'all', '--requests', '24', '--concurrency', '2', '--results', results.name]
+
+        call_command(*args, '--synthetic', '4', '--years', '0.5', stdout=StringIO())
+        self.assertEqual(Reactor.objects.filter(name__startswith='SYN-').count(), 4)
+        self.assertTrue(ReactorLatestStatus.objects.exists())
+        out = StringIO()
+        call_command(*args, '--drop-synthetic', stdout=out)
+        self.assertIn('Compared with', out.getvalue())
+        self.assertFalse(Reactor.objects.filter(name__startswith='SYN-').exists())
+
+        with open(results.name) as f:
+            runs = [json.loads(line) for line in f]
+        self.assertEqual(len(runs), 2)
+        for endpoint, stats in runs[1]['endpoints'].items():
+            self.assertEqual((stats['requests'], stats['errors']), (4, 0), endpoint)
+            self.assertGreaterEqual(stats['queries_per_request'], 1)
+
+    def test_fewer_requests_than_endpoints(self):
+        call_command('loadtest', '--synthetic', '2', '--years', '0.5', '--endpoint', 'all', '--requests', '2', '--no-save', stdout=StringIO())
+        self.assertEqual(summarize([], 1.0)['mean_ms'], 0.0)
+
+    def test_bad_date_fails_before_seeding(self):
+        with self.assertRaisesMessage(CommandError, '--date'):
+            call_command('loadtest', '--synthetic', '2', '--date', '2024-13-01', '--no-save', stdout=StringIO())
+        self.assertFalse(Reactor.objects.exists())
+
+
+def naive_forecast(history, config, init=None, cutoff=None):
+    # Stand-in for Prophet: the last reported power, +/- 5 points. Counts its warm starts in the inits.
+    start = (cutoff if cutoff is not None else history['ds'].iloc[-1]) + pd.Timedelta(days=1)
+    forecast = pd.DataFrame({'ds': pd.date_range(start, periods=config['horizon_days'])})
+    forecast['yhat'] = float(history['y'].iloc[-1])
+    forecast['yhat_lower'] = forecast['yhat'] - 5
+    forecast['yhat_upper'] = forecast['yhat'] + 5
+    return forecast, {'fits': (init or {}).get('fits', 0) + 1}
+
+
+class BacktestTests(TestCase):
+    def setUp(self):
+        name, region, first_date, self.powers = next(synthetic_units(1, 2, REPORT_DATE, seed=3))
+        ensure_partitions(first_date, REPORT_DATE)
+        self.reactor = save_history(name, region, first_date, self.powers)
+
+    def test_rolling_origins(self):
+        self.assertEqual(
+            rolling_origins(REPORT_DATE, 30, 3, 10),
+            [date(2025, 5, 12), date(2025, 5, 22), date(2025, 6, 1)],
+        )
+
+    def test_backtest_unit_scores_every_horizon(self):
+        config = {'horizon_days': 30}
+        origins = rolling_origins(REPORT_DATE, 30, 3, 10)
+        seen = []
+
+        def forecaster(history, config, init=None, cutoff=None):
+            seen.append((history['ds'].iloc[-1].date(), len(history), init))
+            return naive_forecast(history, config, init, cutoff)
+
+        reactor_id, stats, fits, failed = backtest_unit(self.reactor.id, origins, config, forecaster=forecaster)
+        self.assertEqual((reactor_id, fits, failed), (self.reactor.id, 3, 0))
+        # Each cutoff trains on the history up to it, warm-started from the previous fit
+        self.assertEqual([day for day, _, _ in seen], origins)
+        self.assertEqual([init for _, _, init in seen], [None, {'fits': 1}, {'fits': 2}])
+        self.assertEqual(seen[0][1], len(self.powers) - 30 - 20)
+
+        self.assertEqual(sorted(stats), list(range(1, 31)))
+        count, abs_total, squared, signed, covered = stats[1]
+        self.assertEqual(count, 3)
+        first_date = REPORT_DATE - timedelta(days=len(self.powers) - 1)
+        power = {first_date + timedelta(days=i): p for i, p in enumerate(self.powers)}
+        errors = [power[origin] - power[origin + timedelta(days=1)] for origin in origins]
+        self.assertAlmostEqual(abs_total, sum(abs(e) for e in errors))
+        self.assertAlmostEqual(signed, sum(errors))
+        self.assertEqual(covered, sum(abs(e) <= 5 for e in errors))
+
+        # A training window keeps only the recent history, and no warm starts without them
+        seen.clear()
+        backtest_unit(self.reactor.id, origins, config, window_days=365, warm_start=False, forecaster=forecaster)
+        self.assertEqual([n for _, n, _ in seen], [365, 365, 365])
+        self.assertEqual([init for _, _, init in seen], [None, None, None])
+
+    def test_backtest_unit_counts_fits_over_the_limits(self):
+        def forecaster(history, config, init=None, cutoff=None):
+            raise FitLimitExceeded("too slow")
+
+        _, stats, fits, failed = backtest_unit(
+            self.reactor.id, rolling_origins(REPORT_DATE, 30, 2, 10), {'horizon_days': 30}, forecaster=forecaster,
+        )
+        self.assertEqual((stats, fits, failed), ({}, 0, 2))
+
+    def test_missing_reports_before_a_cutoff(self):
+        origin = rolling_origins(REPORT_DATE, 30, 1, 10)[0]
+        ReactorStatus.objects.filter(
+            reactor=self.reactor, report_date__gt=origin - timedelta(days=5), report_date__lte=origin,
+        ).delete()
+        _, stats, fits, _ = backtest_unit(self.reactor.id, [origin], {'horizon_days': 30}, forecaster=naive_forecast)
+        # Still scored on the 30 days after the cutoff, none of them in the training data
+        self.assertEqual(fits, 1)
+        self.assertEqual(sorted(stats), list(range(1, 31)))
+
+    @patch('nrc_data.backtest.prophet_forecast', naive_forecast)
+    def test_backtest_command_stores_and_compares_runs(self):
+        args = ['backtest', '--units', self.reactor.name, '--origins', '4', '--step', '15', '--workers', '1']
+        call_command(*args, stdout=StringIO())
+        run = BacktestRun.objects.get()
+        self.assertEqual((run.units, run.fits, run.origins, run.last_origin), (1, 4, 4, date(2025, 6, 1)))
+        self.assertEqual(BacktestMetric.objects.filter(run=run, reactor=self.reactor).count(), 30)
+        self.assertEqual(horizon_summary(run)[1]['count'], 4)
+
+        out = StringIO()
+        call_command(*args, '--set', 'changepoint_prior_scale=0.05', '--compare', str(run.pk), stdout=out)
+        other = BacktestRun.objects.latest('created_at')
+        self.assertNotEqual(other.config_hash, run.config_hash)
+        self.assertEqual(other.config['changepoint_prior_scale'], 0.05)
+        self.assertIn(f'Compared with run {run.pk} (changepoint_prior_scale=0.05)', out.getvalue())
+        self.assertIn('h=30', out.getvalue())
+
+        out = StringIO()
+        call_command('backtest', '--list', stdout=out)
+        self.assertIn('current config', out.getvalue())
+        self.assertIn('changepoint_prior_scale=0.05', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('backtest', '--units', 'NOPE', stdout=StringIO())
+
+
+class StartupTests(TestCase):
+    def test_no_heavy_imports_at_startup(self):
+        # Fresh interpreters for a web worker, manage.py check and the Celery tasks
+        out = StringIO()
+        call_command('bench_startup', '--repeat', '1', stdout=out)
+        self.assertIn('No heavy imports at startup', out.getvalue())
+
+
+class FakeLocks:
+    """In-process stand-in for the Redis locks and idempotency keys in nrc_data/locks.py."""
+
+    def __init__(self, test):
+        self.done, self.claimed, self.held = set(), set(), set()
+        for name in ('is_done', 'mark_done', 'claim', 'task_lock'):
+            patcher = patch(f'nrc_data.tasks.{name}', getattr(self, name))
+            patcher.start()
+            test.addCleanup(patcher.stop)
+
+    def is_done(self, key):
+        return key in self.done
+
+    def mark_done(self, key, ttl=None):
+        self.done.add(key)
+
+    def claim(self, key, ttl):
+        if key in self.claimed:
+            return False
+        self.claimed.add(key)
+        return True
+
+    @contextmanager
+    def task_lock(self, name, timeout=None, wait=0):
+        if name in self.held:
+            raise locks.LockNotAcquired(f"{name} is already being processed")
+        self.held.add(name)
+        try:
+            yield
+        finally:
+            self.held.discard(name)
+
+
+class TaskWiringTests(TestCase):
+    def setUp(self):
+        self.locks = FakeLocks(self)
+        self.stage = Mock()
+
+    def test_run_stage_runs_once(self):
+        tasks.run_stage('fetch', '2025-07-01', self.stage)
+        self.stage.assert_called_once_with(REPORT_DATE)
+        self.assertIn('2025-07-01:fetch', self.locks.done)
+
+        # Already done, e.g. a re-run pipeline
+        tasks.run_stage('fetch', '2025-07-01', self.stage)
+        self.assertEqual(self.stage.call_count, 1)
+
+    def test_run_stage_drops_the_chain_while_another_worker_runs_it(self):
+        with self.locks.task_lock('stage:2025-07-01:parse'):
+            with self.assertRaises(Ignore):
+                tasks.run_stage('parse', '2025-07-01', self.stage)
+        self.stage.assert_not_called()
+        self.assertNotIn('2025-07-01:parse', self.locks.done)
+
+    @patch('nrc_data.tasks.detect_stub_outages_for_reactor')
+    @patch('nrc_data.tasks.fit_forecast')
+    def test_failing_reactor_does_not_stop_the_chord(self, fit_forecast, detect):
+        run = Mock(id=1, image_url='https://example.com/plot.html')
+        failures = {'Unit B': ValueError("not enough history"), 'Unit C': OperationalError("connection lost")}
+
+        def fit(name):
+            if name in failures:
+                raise failures[name]
+            return run
+
+        fit_forecast.side_effect = fit
+        # The eager chord collects the header results through the result backend
+        app = tasks.forecast_reactors.app
+        patcher = patch.object(app, '_backend_cache', CacheBackend(app=app, url='memory://'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        IngestRun.objects.create(report_date=REPORT_DATE, stage='saved', reactors=['Unit A', 'Unit B', 'Unit C'])
+
+        with self.assertLogs('nrc_data.tasks', 'ERROR') as logs:
+            tasks.forecast_reactors.apply(args=('2025-07-01',))
+
+        # Unit C was retried until it ran out of retries
+        self.assertEqual(
+            [c.args[0] for c in fit_forecast.call_args_list].count('Unit C'), tasks.STAGE_RETRIES['max_retries'] + 1,
+        )
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(sorted(c.args[0] for c in detect.call_args_list), ['Unit A', 'Unit B', 'Unit C'])
+        self.assertEqual(IngestRun.objects.get(report_date=REPORT_DATE).stage, 'done')
+        self.assertIn('2025-07-01:finish', self.locks.done)
+
+    def test_chord_finishes_even_if_a_header_task_is_killed(self):
+        IngestRun.objects.create(report_date=REPORT_DATE, stage='saved', reactors=['Unit A'])
+        with patch.object(tasks.forecast_reactors, 'replace', side_effect=lambda sig: sig):
+            canvas = tasks.forecast_reactors.apply(args=('2025-07-01',)).get()
+        self.assertEqual(canvas.body.task, 'nrc_data.tasks.finish_ingest')
+        self.assertEqual(
+            [(errback['task'], errback['args']) for errback in canvas.body.options['link_error']],
+            [('nrc_data.tasks.finish_ingest', ('2025-07-01',))],
+        )
+
+    @patch('nrc_data.tasks.fit_forecast', side_effect=FitLimitExceeded("took too long"))
+    def test_fit_over_the_limits_is_skipped(self, fit_forecast):
+        with self.assertLogs('nrc_data.tasks', 'WARNING'):
+            result = tasks.fit_reactor_forecast.apply(args=('Unit A',))
+        self.assertIsNone(result.get())
+        self.assertEqual(fit_forecast.call_count, 1)
+
+
+@skipUnless(
+    importlib.util.find_spec('fakeredis') and importlib.util.find_spec('lupa'),
+    "lock tests run against fakeredis (with lupa for the lock scripts)",
+)
+class TaskLockTests(TestCase):
+    def setUp(self):
+        import fakeredis
+
+        patcher = patch('nrc_data.locks._client', fakeredis.FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lock_is_exclusive_until_released(self):
+        with locks.task_lock('stage:2025-07-01:fetch'):
+            with self.assertRaises(locks.LockNotAcquired):
+                with locks.task_lock('stage:2025-07-01:fetch'):
+                    pass
+            # Other dates and stages aren't blocked
+            with locks.task_lock('stage:2025-07-02:fetch'):
+                pass
+        with locks.task_lock('stage:2025-07-01:fetch'):
+            pass
+
+    def test_lock_released_on_error(self):
+        with self.assertRaises(ValueError):
+            with locks.task_lock('fit:Salem 1'):
+                raise ValueError
+        with locks.task_lock('fit:Salem 1'):
+            pass
+
+    def test_idempotency_keys(self):
+        self.assertTrue(locks.claim('2025-07-01:pipeline', 60))
+        self.assertFalse(locks.claim('2025-07-01:pipeline', 60))
+
+        self.assertFalse(locks.is_done('2025-07-01:fetch'))
+        locks.mark_done('2025-07-01:fetch')
+        self.assertTrue(locks.is_done('2025-07-01:fetch'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, NRC_READ_DATABASE='replica')
+class ReplicaRoutingTests(TestCase):
+    """Routing decisions only; no queries run against the replica alias here."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.routed = []
+
+    def view(self, request):
+        self.routed.append(ReactorStatus.objects.all().db)
+        return HttpResponse()
+
+    async def async_view(self, request):
+        return self.view(request)
+
+    def test_router(self):
+        self.assertEqual(ReactorStatus.objects.all().db, 'default')
+        with reading_from('replica'):
+            self.assertEqual(ReactorStatus.objects.all().db, 'replica')
+            self.assertEqual(Reactor.objects.all().db, 'replica')
+            # Other apps and all writes stay on the primary
+            self.assertEqual(User.objects.all().db, 'default')
+            self.assertEqual(ReactorStatus.objects.select_for_update().db, 'default')
+
+    def test_api_reads_use_the_replica(self):
+        middleware = replica_read_middleware(self.view)
+        middleware(self.factory.get('/api/reactor/2025-07-01/'))
+        middleware(self.factory.post('/api/reactor/2025-07-01/'))
+        middleware(self.factory.get('/admin/'))
+        self.assertEqual(self.routed, ['replica', 'default', 'default'])
+
+        async_to_sync(replica_read_middleware(self.async_view))(self.factory.get('/api/reactor/latest/'))
+        self.assertEqual(self.routed[-1], 'replica')
+
+    def test_ingestion_pins_reads_to_the_primary(self):
+        middleware = replica_read_middleware(self.view)
+        df = pd.DataFrame(
+            [['Pinned Unit 1', '100', pd.NA, pd.NA, pd.NA, pd.NA]],
+            columns=['Unit', 'Power', 'Down', 'Reason', 'Change', 'Scrams'],
+        )
+        SeedCommand().save_dataframe_to_db(df, '20250701')
+        reactor = Reactor.objects.get(name='Pinned Unit 1')
+        middleware(self.factory.get('/api/reactor/2025-07-01/'))
+        async_to_sync(replica_read_middleware(self.async_view))(self.factory.get('/api/reactor/2025-07-01/'))
+        self.assertEqual(self.routed, ['default', 'default'])
+        for path in ['/api/reactor/2025-07-01/batch/', f'/api/reactor/{reactor.id}/series/',
+                     '/api/reactor/latest/', '/api/fleet/summary/', '/api/export/csv/']:
+            middleware(self.factory.get(path))
+            self.assertEqual(self.routed[-1], 'default', path)
+
+        # Reads of other dates and reactors aren't affected by the write
+        for path in ['/api/reactor/2025-06-30/', f'/api/reactor/2025-06-30/{reactor.id}/',
+                     f'/api/reactor/{reactor.id + 1}/series/']:
+            middleware(self.factory.get(path))
+            self.assertEqual(self.routed[-1], 'replica', path)
+
+        cache.clear()
+        middleware(self.factory.get('/api/reactor/2025-07-01/'))
+        self.assertEqual(self.routed[-1], 'replica')
+
+    def test_forecast_writes_pin_only_that_reactor(self):
+        middleware = replica_read_middleware(self.view)
+        pin_primary(reactor_scopes(REPORT_DATE, 7))
+        for path, alias in [
+            ('/api/reactor/2025-07-01/7/', 'default'),
+            ('/api/async/reactor/2025-07-01/7/', 'default'),
+            ('/api/reactor/2025-07-01/batch/', 'default'),
+            ('/api/reactor/latest/', 'default'),
+            ('/api/reactor/2025-07-01/8/', 'replica'),
+            ('/api/reactor/2025-06-30/7/', 'replica'),
+            ('/api/reactor/2025-07-01/', 'replica'),  # The snapshot has no forecasts
+            ('/api/reactor/7/series/', 'replica'),
+            ('/api/fleet/summary/', 'replica'),
+        ]:
+            middleware(self.factory.get(path))
+            self.assertEqual(self.routed[-1], alias, path)
+
+    def test_streamed_export_stays_routed(self):
+        def view(request):
+            return StreamingHttpResponse(ReactorStatus.objects.all().db for _ in range(2))
+
+        response = replica_read_middleware(view)(self.factory.get('/api/reactor/export/'))
+        self.assertEqual(b''.join(response.streaming_content), b'replicareplica')
+
+    @override_settings(NRC_READ_DATABASE='default')
+    def test_no_replica_configured(self):
+        pin_primary(ingest_scopes(REPORT_DATE, [1]))
+        self.assertEqual(cache.get_many(pin_keys(ingest_scopes(REPORT_DATE, [1]))), {})
+        replica_read_middleware(self.view)(self.factory.get('/api/reactor/2025-07-01/'))
+        self.assertEqual(self.routed, ['default'])
+
+
+@skipUnless('replica' in connections, "set NRC_REPLICA_HOST to test against a replica alias")
+@override_settings(CACHES=NO_CACHE, NRC_READ_DATABASE='replica')
+class ReplicaAliasTests(TransactionTestCase):
+    # The replica alias mirrors the test database over its own connection, so
+    # it only sees committed rows
+    databases = '__all__'
+
+    def test_endpoints_read_from_the_replica(self):
+        make_fleet(2)
+        with self.assertNumQueries(0, using='default'), self.assertNumQueries(1, using='replica'):
+            data = self.client.get('/api/reactor/2025-07-01/').json()
+        self.assertEqual(len(data), 2)
+
+
+@override_settings(CACHES=NO_CACHE)
+class LatestStatusTests(TestCase):
+    def setUp(self):
+        self.reactors = make_fleet(2)
+        self.older = ReactorStatus.objects.create(
+            reactor=self.reactors[0], report_date=date(2025, 6, 30), power=10
+        )
+
+    def test_refresh_picks_latest_status_forecast_and_outage(self):
+        status = self.reactors[0].reactorstatus.get(report_date=REPORT_DATE)
+        save_forecast_run(self.reactors[0], status, 'prophet', {}, forecast_rows(REPORT_DATE, 1, yhat=98.0))
+        StubOutage.objects.create(reactor=self.reactors[0], reactorstatus=status, date_detected=REPORT_DATE)
+
+        with self.assertNumQueries(5):
+            self.assertEqual(refresh_latest_status(), 2)
+
+        latest = ReactorLatestStatus.objects.get(reactor=self.reactors[0])
+        self.assertEqual(latest.report_date, REPORT_DATE)
+        self.assertEqual(latest.power, 100)
+        self.assertEqual(latest.yhat, 98.0)
+        self.assertTrue(latest.stuboutage)
+        self.assertFalse(ReactorLatestStatus.objects.get(reactor=self.reactors[1]).stuboutage)
+
+    def test_ingestion_upserts_latest_status(self):
+        df = pd.DataFrame(
+            [['Test Unit 0', '55', pd.NA, 'Maintenance', pd.NA, pd.NA]],
+            columns=['Unit', 'Power', 'Down', 'Reason', 'Change', 'Scrams'],
+        )
+        SeedCommand().save_dataframe_to_db(df, '20250702')
+        latest = ReactorLatestStatus.objects.get(reactor=self.reactors[0])
+        self.assertEqual((latest.report_date, latest.power, latest.reason), (date(2025, 7, 2), 55, 'Maintenance'))
+
+        # Backfilling an older date doesn't move the snapshot back
+        SeedCommand().save_dataframe_to_db(df, '20250601')
+        self.assertEqual(ReactorLatestStatus.objects.get(reactor=self.reactors[0]).report_date, date(2025, 7, 2))
+
+    def test_latest_endpoint_is_one_query(self):
+        refresh_latest_status()
+        with self.assertNumQueries(1):
+            data = self.client.get('/api/reactor/latest/').json()
+        self.assertEqual([row['name'] for row in data], ['Test Unit 0', 'Test Unit 1'])
+        self.assertEqual(data[0]['report_date'], '2025-07-01')
+        self.assertIsNone(data[0]['forecast'])
+
+
+class ForecastRunTests(TestCase):
+    def setUp(self):
+        self.reactor = make_fleet(1)[0]
+        self.status = self.reactor.reactorstatus.get()
+
+    def add_run(self, trained_through, engine='prophet', config=None):
+        status = ReactorStatus.objects.get_or_create(reactor=self.reactor, report_date=trained_through, defaults={'power': 100})[0]
+        return save_forecast_run(self.reactor, status, engine, config or {}, forecast_rows(trained_through, 30))
+
+    def test_rerun_replaces_horizons(self):
+        run = self.add_run(REPORT_DATE)
+        self.assertEqual(list(run.forecasts.order_by('horizon').values_list('horizon', flat=True)), list(range(1, 31)))
+
+        again = self.add_run(REPORT_DATE)
+        self.assertEqual(again.id, run.id)
+        self.assertEqual(ReactorForecast.objects.count(), 30)
+
+        # A different engine config is a separate run
+        self.add_run(REPORT_DATE, config={'changepoint_prior_scale': 0.1})
+        self.assertEqual(ForecastRun.objects.count(), 2)
+
+    def test_latest_run(self):
+        self.add_run(date(2025, 6, 1))
+        newest = self.add_run(REPORT_DATE)
+        self.assertEqual(latest_run(self.reactor.id), newest)
+
+    def test_compaction_keeps_tracked_horizons(self):
+        old = self.add_run(date(2025, 5, 1))
+        recent = self.add_run(date(2025, 6, 25))
+        newest = self.add_run(REPORT_DATE)
+
+        with self.settings(NRC_FORECAST_FULL_DAYS=30):
+            with patch('nrc_data.forecast_runs.timezone.now', return_value=timezone.make_aware(datetime(2025, 7, 2))):
+                self.assertEqual(compact_forecast_runs(dry_run=True), (1, 27))
+                self.assertEqual(old.forecasts.count(), 30)
+                self.assertEqual(compact_forecast_runs(keep_horizons=[1, 7, 30]), (1, 27))
+                # Nothing left to do on a second pass
+                self.assertEqual(compact_forecast_runs(keep_horizons=[1, 7, 30]), (0, 0))
+
+        old.refresh_from_db()
+        self.assertTrue(old.compacted)
+        self.assertEqual(sorted(old.forecasts.values_list('horizon', flat=True)), [1, 7, 30])
+        self.assertEqual(recent.forecasts.count(), 30)
+        self.assertEqual(newest.forecasts.count(), 30)
+
+    def test_latest_run_is_never_compacted(self):
+        only = self.add_run(date(2024, 1, 1))
+        self.assertEqual(compact_forecast_runs(full_days=0), (0, 0))
+        self.assertEqual(only.forecasts.count(), 30)
+
+
+@skipUnless(connection.vendor == 'postgresql', "query plans are checked against PostgreSQL")
+class QueryPlanTests(TestCase):
+    """EXPLAIN the hot queries against a year of fleet data; none may fall back to a Seq Scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Reactor.objects.bulk_create([Reactor(name=f"Plan Unit {i}", region='I') for i in range(100)])
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO nrc_data_reactorstatus (reactor_id, report_date, power, changed)
+                SELECT r.id, DATE '2024-01-01' + d, (d * 7 + r.id) % 101, false
+                FROM nrc_data_reactor r CROSS JOIN generate_series(0, 364) d
+            """)
+            cursor.execute("""
+                INSERT INTO nrc_data_forecastrun (reactor_id, trained_through, engine, config_hash, compacted, created_at)
+                SELECT r.id, DATE '2024-01-01' + d, 'prophet', 'plan', false, now() + d * interval '1 second'
+                FROM nrc_data_reactor r CROSS JOIN generate_series(0, 364) d
+            """)
+            cursor.execute("""
+                INSERT INTO nrc_data_reactorforecast (run_id, horizon, reactor_id, df, yhat, yhat_lower, yhat_upper, created_at)
+                SELECT f.id, h, f.reactor_id, f.trained_through + h, 90, 80, 100, f.created_at
+                FROM nrc_data_forecastrun f CROSS JOIN (VALUES (1), (7), (30)) v(h)
+            """)
+            cursor.execute("""
+                INSERT INTO nrc_data_stuboutage (reactor_id, date_detected, description, auto_detected, confirmed, created_at)
+                SELECT r.id, DATE '2024-01-01' + d, '', true, false, now()
+                FROM nrc_data_reactor r CROSS JOIN generate_series(0, 364, 7) d
+            """)
+            cursor.execute(
+                "ANALYZE nrc_data_reactor, nrc_data_reactorstatus, nrc_data_forecastrun, "
+                "nrc_data_reactorforecast, nrc_data_stuboutage"
+            )
+            # Partitions holding the seeded rows; empty ones are fine to seq-scan
+            cursor.execute("SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples > 0")
+            cls.populated = {name for name, in cursor.fetchall()}
+        cls.reactor = Reactor.objects.get(name="Plan Unit 42")
+
+    def assert_no_seq_scan(self, queryset, table):
+        plan = queryset.explain()
+        scanned = set(re.findall(r"Seq Scan on (\w+)", plan)) & self.populated
+        self.assertFalse({name for name in scanned if name.startswith(table)}, f"\n{queryset.query}\n{plan}")
+
+    def test_status_history_by_reactor(self):
+        # forecast.py training read and outage_detection.py latest actual
+        qs = ReactorStatus.objects.filter(reactor__name=self.reactor.name)
+        self.assert_no_seq_scan(qs.order_by('report_date').values('report_date', 'power'), 'nrc_data_reactorstatus')
+        self.assert_no_seq_scan(qs.order_by('-report_date')[:1], 'nrc_data_reactorstatus')
+
+    def test_status_by_reactor(self):
+        dates = {'start': date(2024, 6, 1), 'end': None}
+        self.assert_no_seq_scan(series_queryset(self.reactor.id, 'daily', dates), 'nrc_data_reactorstatus')
+        self.assert_no_seq_scan(
+            detail_queryset().filter(reactor_id=self.reactor.id, report_date=date(2024, 6, 1)), 'nrc_data_reactorstatus'
+        )
+
+    def test_snapshot_by_date(self):
+        self.assert_no_seq_scan(SnapshotSerializer.rows(date(2024, 6, 1)), 'nrc_data_reactorstatus')
+
+    def test_export_streams_in_index_order(self):
+        # The (report_date, reactor) index yields the rows in order, no sort over the whole export.
+        # iterator()'s server-side cursor is planned for its first rows, like a LIMIT.
+        plan = export_rows()[:1000].explain()
+        self.assertNotIn('Sort Key', plan, plan)
+
+    def test_forecast_by_reactor_and_date(self):
+        qs = ReactorForecast.objects.filter(reactor=self.reactor, df=date(2024, 6, 2))[:1]
+        self.assert_no_seq_scan(qs, 'nrc_data_reactorforecast')
+
+    def test_latest_forecast_run(self):
+        qs = ForecastRun.objects.filter(reactor=self.reactor).order_by('-trained_through', '-created_at')[:1]
+        self.assert_no_seq_scan(qs, 'nrc_data_forecastrun')
+
+    def test_outage_by_reactor_and_date(self):
+        qs = StubOutage.objects.filter(reactor=self.reactor, date_detected=date(2024, 6, 3))
+        self.assert_no_seq_scan(qs, 'nrc_data_stuboutage')
+
+
+@skipUnless(connection.vendor == 'postgresql', "ReactorStatus is only partitioned on PostgreSQL")
+class PartitionTests(TestCase):
+    def setUp(self):
+        self.reactor = make_fleet(1)[0]
+        self.status = self.reactor.reactorstatus.get()
+        ReactorStatus.objects.create(reactor=self.reactor, report_date=date(2024, 7, 1), power=70)
+
+    def test_recent_date_prunes_to_one_partition(self):
+        plan = ReactorStatus.objects.filter(report_date=REPORT_DATE).explain()
+        self.assertEqual(set(re.findall(r" on (nrc_data_reactorstatus_y\d+)", plan)), {partition_name(2025)})
+
+    def test_ensure_partition(self):
+        self.assertFalse(ensure_partition(2025))
+        self.assertTrue(ensure_partition(2040))
+        self.assertFalse(ensure_partition(2040))
+        ReactorStatus.objects.create(reactor=self.reactor, report_date=date(2040, 1, 1), power=100)
+
+    def test_reload_partition_relinks_dependents(self):
+        outage = StubOutage.objects.create(reactor=self.reactor, reactorstatus=self.status, date_detected=REPORT_DATE)
+        with reload_partition(2025):
+            self.assertFalse(ReactorStatus.objects.filter(report_date__year=2025).exists())
+            reloaded = ReactorStatus.objects.create(reactor=self.reactor, report_date=REPORT_DATE, power=40)
+
+        outage.refresh_from_db()
+        self.assertEqual(outage.reactorstatus_id, reloaded.id)
+        # Other years are untouched
+        self.assertTrue(ReactorStatus.objects.filter(report_date=date(2024, 7, 1), power=70).exists())
@@ -1,8 +1,30 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path
-from nrc_data.views import ReactorView, ReactorDetailView
+from django.urls import path, include
+from nrc_data.views import ReactorView, ReactorDetailView, ReactorBatchView, LatestStatusView, ReactorSeriesView, ReactorExportView, FleetSummaryView
+from nrc_data.async_views import AsyncReactorView, AsyncReactorDetailView, AsyncReactorBatchView, AsyncLatestStatusView, AsyncReactorSeriesView, AsyncFleetSummaryView
+
+# Async variants of the read endpoints, for ASGI deployments
+async_urlpatterns = [
+    path('reactor/latest/', AsyncLatestStatusView.as_view()),
+    path('reactor/<int:reactor_id>/series/', AsyncReactorSeriesView.as_view()),
+    path('reactor/<str:report_date>/', AsyncReactorView.as_view()),
+    path('reactor/<str:report_date>/batch/', AsyncReactorBatchView.as_view()),
+    path('reactor/<str:report_date>/<int:reactor_id>/', AsyncReactorDetailView.as_view()),
+    path('fleet/summary/', AsyncFleetSummaryView.as_view()),
+]
 
 urlpatterns = [
+    path('reactor/latest/', LatestStatusView.as_view()),
+    path('reactor/<int:reactor_id>/series/', ReactorSeriesView.as_view()),
     path('reactor/<str:report_date>/', ReactorView.as_view()),
+    path('reactor/<str:report_date>/batch/', ReactorBatchView.as_view()),
     path('reactor/<str:report_date>/<int:reactor_id>/', ReactorDetailView.as_view()),
+    path('export/<str:file_format>/', ReactorExportView.as_view()),
+    path('fleet/summary/', FleetSummaryView.as_view()),
+    path('async/', include(async_urlpatterns)),
 ]
+
+# Under ASGI, serve the async variants at the regular paths as well
+if settings.NRC_ASYNC_API:
+    urlpatterns = async_urlpatterns + urlpatterns
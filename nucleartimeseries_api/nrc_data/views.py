@@ -1,28 +1,306 @@
-from django.shortcuts import render
-from .serializers import ReactorSerializer, ReactorDetailSerializer
-from .models import Reactor, ReactorStatus, ReactorForecast, StubOutage
+from django.shortcuts import render, get_object_or_404
+from django.db.models import Prefetch, Exists, OuterRef, Avg, Sum
+from django.db.models.functions import TruncWeek, TruncMonth
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from .serializers import (
+    ReactorDetailSerializer, ReactorBatchSerializer, SnapshotSerializer, LatestStatusSerializer,
+)
+from .models import Reactor, ReactorStatus, ReactorForecast, StubOutage, FleetDailySummary
+from .forecast_runs import DETAIL_HORIZONS
+from .cache import cached_response, snapshot_key, detail_key
+from .export import EXPORT_FORMATS, export_rows, iter_export, load_pyarrow
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
+
+def parse_report_date(value):
+    """Parse a YYYY-MM-DD path or query parameter, returning None if invalid."""
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def parse_date_range(params):
+    """
+    Read optional `start`/`end` query parameters.
+
+    Returns ({'start': date|None, 'end': date|None}, None), or (None, error
+    message) if either is not a valid date.
+    """
+    dates = {}
+    for param in ('start', 'end'):
+        value = params.get(param)
+        dates[param] = parse_report_date(value) if value else None
+        if value and not dates[param]:
+            return None, f"{param} must be a YYYY-MM-DD date"
+    return dates, None
+
+
+def validate_region(region):
+    if region and region not in dict(Reactor.REGION_CHOICES):
+        return "region must be one of I, II, III, IV"
+    return None
+
+
+# Query builders shared by the sync views below and the async variants in
+# async_views.py, which only differ in how they execute them.
+
+def detail_queryset(fields=None):
+    # One query for the status, two for the prefetched forecasts and outages;
+    # the outage flag comes from an Exists subquery instead of a per-row exists().
+    # With a sparse fieldset, relations that aren't serialized aren't fetched.
+    # Forecasts are limited to the detail horizons of each run.
+    wanted = lambda name: fields is None or name in fields
+    prefetches = {
+        'reactorforecast_set': Prefetch(
+            'reactorforecast_set',
+            queryset=ReactorForecast.objects.filter(horizon__in=DETAIL_HORIZONS).select_related('run'),
+        ),
+        'stuboutage_set': 'stuboutage_set',
+    }
+    qs = ReactorStatus.objects.select_related('reactor').prefetch_related(
+        *[prefetch for name, prefetch in prefetches.items() if wanted(name)]
+    )
+    if wanted('stuboutage'):
+        qs = qs.annotate(has_stuboutage=Exists(StubOutage.objects.filter(reactorstatus=OuterRef('pk'))))
+    return qs
+
+
+# Upper bound on reactors per batch request; a whole region is always allowed
+BATCH_MAX_IDS = 200
+
+
+def parse_batch_params(params):
+    """
+    Read the `ids`/`region` selection and optional `fields` of a batch request.
+
+    Returns (filters, fields, None), or (None, None, error message).
+    """
+    ids, region = params.get('ids'), params.get('region')
+    if bool(ids) == bool(region):
+        return None, None, "Pass either ids or region"
+
+    if ids:
+        try:
+            reactor_ids = sorted({int(value) for value in ids.split(',') if value.strip()})
+        except ValueError:
+            return None, None, "ids must be a comma-separated list of reactor ids"
+        if not reactor_ids or len(reactor_ids) > BATCH_MAX_IDS:
+            return None, None, f"ids must list between 1 and {BATCH_MAX_IDS} reactors"
+        filters = {'reactor_id__in': reactor_ids}
+    else:
+        error = validate_region(region)
+        if error:
+            return None, None, error
+        filters = {'reactor__region': region}
+
+    fields = params.get('fields')
+    if fields:
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = set(fields) - set(ReactorDetailSerializer.Meta.fields)
+        if unknown:
+            return None, None, f"Unknown fields: {', '.join(sorted(unknown))}"
+    else:
+        fields = None
+    return filters, fields, None
+
+
+def batch_queryset(report_date, filters, fields):
+    return detail_queryset(fields).filter(report_date=report_date, **filters).order_by('reactor_id', 'id')
+
+
+# Aggregation applied in the database for each resolution; daily rows are returned as-is
+SERIES_RESOLUTIONS = {
+    'daily': None,
+    'weekly': TruncWeek,
+    'monthly': TruncMonth,
+}
+
+
+def series_queryset(reactor_id, resolution, dates):
+    qs = ReactorStatus.objects.filter(reactor_id=reactor_id)
+    if dates['start']:
+        qs = qs.filter(report_date__gte=dates['start'])
+    if dates['end']:
+        qs = qs.filter(report_date__lte=dates['end'])
+
+    trunc = SERIES_RESOLUTIONS[resolution]
+    if trunc is None:
+        return qs.order_by('report_date').values_list('report_date', 'power')
+    return (
+        qs.annotate(period=trunc('report_date'))
+        .values('period')
+        .annotate(avg_power=Avg('power'))
+        .order_by('period')
+        .values_list('period', 'avg_power')
+    )
+
+
+def series_payload(reactor_name, resolution, rows):
+    # Columnar payload: parallel arrays keep a decade of days to a few KB
+    dates, power = [], []
+    for day, value in rows:
+        dates.append(day.isoformat())
+        power.append(round(value, 1))
+    return {
+        'reactor': reactor_name,
+        'resolution': resolution,
+        'dates': dates,
+        'power': power,
+    }
+
+
+SUMMARY_COLUMNS = ['unit_count', 'avg_power', 'units_at_zero', 'units_changed', 'scram_total']
+
+
+def summary_querysets(region, dates):
+    """Per-region rows and fleet-wide totals, both from the precomputed daily aggregates."""
+    qs = FleetDailySummary.objects.all()
+    if region:
+        qs = qs.filter(region=region)
+    if dates['start']:
+        qs = qs.filter(report_date__gte=dates['start'])
+    if dates['end']:
+        qs = qs.filter(report_date__lte=dates['end'])
+
+    region_rows = qs.order_by('region', 'report_date').values('region', 'report_date', *SUMMARY_COLUMNS)
+    total_rows = qs.values('report_date').annotate(
+        unit_count=Sum('unit_count'),
+        power_total=Sum('power_total'),
+        units_at_zero=Sum('units_at_zero'),
+        units_changed=Sum('units_changed'),
+        scram_total=Sum('scram_total'),
+    ).order_by('report_date')
+    return region_rows, total_rows
+
+
+def summary_payload(region_rows, total_rows):
+    regions = {}
+    for row in region_rows:
+        series = regions.setdefault(row['region'], {'dates': [], **{column: [] for column in SUMMARY_COLUMNS}})
+        series['dates'].append(row['report_date'].isoformat())
+        for column in SUMMARY_COLUMNS:
+            series[column].append(row[column])
+
+    # Fleet totals across the selected regions, weighting the average by unit count
+    fleet = {'dates': [], **{column: [] for column in SUMMARY_COLUMNS}}
+    for row in total_rows:
+        row['avg_power'] = row['power_total'] / row['unit_count'] if row['unit_count'] else 0
+        fleet['dates'].append(row['report_date'].isoformat())
+        for column in SUMMARY_COLUMNS:
+            fleet[column].append(row[column])
+
+    return {'fleet': fleet, 'regions': regions}
+
+
 # Create your views here.
 class ReactorView(APIView):
     def get(self, request, report_date):
+        report_date = parse_report_date(report_date)
         if not report_date:
             return Response({"error": "Date parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        reactors = Reactor.objects.filter(reactorstatus__report_date=report_date).distinct()
+        def build():
+            # Single joined .values_list() query, no per-object ModelSerializers
+            return SnapshotSerializer.serialize(SnapshotSerializer.rows(report_date))
 
-        serializer = ReactorSerializer(reactors, many=True, context={'report_date': report_date})
-        return Response(serializer.data)
+        return cached_response(request, snapshot_key(report_date), report_date, build)
 
 class ReactorDetailView(APIView):
     def get(self, request, report_date, reactor_id):
+        report_date = parse_report_date(report_date)
         if not report_date:
             return Response({"error": "Date parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
-        
-        reactor = Reactor.objects.get(id=reactor_id)
-        reactorstatus = ReactorStatus.objects.get(reactor=reactor, report_date=report_date)
-        serializer = ReactorDetailSerializer(reactorstatus)
-        return Response(serializer.data)
\ No newline at end of file
+
+        def build():
+            reactorstatus = get_object_or_404(detail_queryset(), reactor_id=reactor_id, report_date=report_date)
+            serializer = ReactorDetailSerializer(reactorstatus)
+            return serializer.data
+
+        return cached_response(request, detail_key(report_date, reactor_id), report_date, build)
+
+
+class ReactorBatchView(APIView):
+    def get(self, request, report_date):
+        report_date = parse_report_date(report_date)
+        if not report_date:
+            return Response({"error": "Date parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+        filters, fields, error = parse_batch_params(request.query_params)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Fixed number of queries however many reactors are selected
+        statuses = batch_queryset(report_date, filters, fields)
+        return Response(ReactorBatchSerializer(statuses, many=True, fields=fields).data)
+
+
+class LatestStatusView(APIView):
+    def get(self, request):
+        # One scan of the denormalized latest-status table (see nrc_data/latest.py)
+        return Response(LatestStatusSerializer.serialize(LatestStatusSerializer.rows()))
+
+
+class ReactorSeriesView(APIView):
+    def get(self, request, reactor_id):
+        resolution = request.query_params.get('resolution', 'daily')
+        if resolution not in SERIES_RESOLUTIONS:
+            return Response(
+                {"error": f"resolution must be one of {', '.join(SERIES_RESOLUTIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dates, error = parse_date_range(request.query_params)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        reactor = get_object_or_404(Reactor, id=reactor_id)
+        rows = series_queryset(reactor.id, resolution, dates)
+        return Response(series_payload(reactor.name, resolution, rows))
+
+
+class ReactorExportView(APIView):
+    def perform_content_negotiation(self, request, force=False):
+        # Clients asking for text/csv etc. get the stream, not a 406
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, file_format):
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if file_format == 'parquet':
+            try:
+                load_pyarrow()
+            except ImportError as e:
+                return Response({"error": str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        region = request.query_params.get('region')
+        dates, error = parse_date_range(request.query_params)
+        error = validate_region(region) or error
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        filters = {'unit': request.query_params.get('unit'), 'region': region, **dates}
+
+        response = StreamingHttpResponse(
+            iter_export(export_rows(**filters), file_format),
+            content_type=EXPORT_FORMATS[file_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="reactor_status.{file_format}"'
+        return response
+
+
+class FleetSummaryView(APIView):
+    def get(self, request):
+        region = request.query_params.get('region')
+        dates, error = parse_date_range(request.query_params)
+        error = validate_region(region) or error
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        region_rows, total_rows = summary_querysets(region, dates)
+        return Response(summary_payload(region_rows, total_rows))
@@ -1,6 +1,7 @@
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun, worker_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nucleartimeseries_api.settings')
 
@@ -8,9 +9,27 @@ app = Celery('nucleartimeseries_api')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
+
+@worker_init.connect
+def start_metrics(**kwargs):
+    from nrc_data import metrics
+
+    task_prerun.connect(metrics.task_started, weak=False)
+    task_postrun.connect(metrics.task_finished, weak=False)
+    metrics.start_worker_metrics_server()
+
+
 app.conf.beat_schedule = {
     'fetch-nrc-data': {
         'task': 'nrc_data.tasks.fetch_latest_nrc_data',
         'schedule': crontab(hour=0, minute=0)
+    },
+    'ensure-status-partition': {
+        'task': 'nrc_data.tasks.ensure_next_status_partition',
+        'schedule': crontab(day_of_month=1, hour=1, minute=0)
+    },
+    'compact-forecasts': {
+        'task': 'nrc_data.tasks.compact_old_forecasts',
+        'schedule': crontab(day_of_week='sunday', hour=2, minute=0)
     }
 }
\ No newline at end of file
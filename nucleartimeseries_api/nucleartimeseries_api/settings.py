@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "nrc_data.metrics.metrics_middleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -55,6 +56,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "nrc_data.routers.replica_read_middleware",
 ]
 
 ROOT_URLCONF = "nucleartimeseries_api.urls"
@@ -100,6 +102,25 @@ DATABASES = {
     }
 }
 
+# Optional read replica for the nrc_data read endpoints (nrc_data/routers.py).
+# Ingestion and forecasting keep writing to `default`. To try it locally, point
+# it at the same instance (or a second one):
+#   NRC_REPLICA_HOST=localhost NRC_REPLICA_PORT=5433 python manage.py runserver
+if os.getenv("NRC_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.getenv("NRC_REPLICA_HOST"),
+        "PORT": os.getenv("NRC_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "NAME": os.getenv("NRC_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["nrc_data.routers.ReplicaRouter"]
+NRC_READ_DATABASE = "replica" if "replica" in DATABASES else "default"
+# How long the API reads depending on a write stay on the primary; should
+# comfortably cover the replica's lag
+NRC_REPLICA_PIN_SECONDS = int(os.getenv("NRC_REPLICA_PIN_SECONDS", "60"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -148,11 +169,97 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 S3_FORECAST_FOLDER = os.getenv("S3_FORECAST_FOLDER")
 
+# Where forecast plots are published (nrc_data/storage.py). Use
+# nrc_data.storage.LocalForecastStorage to write them to NRC_FORECAST_LOCAL_DIR
+NRC_FORECAST_STORAGE = os.getenv("NRC_FORECAST_STORAGE", "nrc_data.storage.S3ForecastStorage")
+NRC_FORECAST_LOCAL_DIR = os.getenv("NRC_FORECAST_LOCAL_DIR", str(BASE_DIR / "forecast_plots"))
+
+# cProfile output from `seed --profile`, generate_and_upload_forecast(profile=True)
+# and pipeline tasks called with profile=True (see nrc_data/profiling.py)
+NRC_PROFILE_DIR = os.getenv("NRC_PROFILE_DIR", str(BASE_DIR / "profiles"))
+
+# Where `manage.py loadtest` appends its results, one JSON line per run
+NRC_LOADTEST_RESULTS = os.getenv("NRC_LOADTEST_RESULTS", str(BASE_DIR / "loadtest_results.jsonl"))
+
 
 CELERY_BROKER_URL = "redis://localhost:6379/0"
 CELERY_RESULT_BACKEND = "redis://localhost:6379/0"
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Ingestion pipeline queues (nrc_data/tasks.py): network-bound stages go to
+# `io`, Prophet fits to `cpu`, the rest to the default `celery` queue, e.g.
+#   celery -A nucleartimeseries_api worker -Q io,celery --concurrency 16
+#   celery -A nucleartimeseries_api worker -Q cpu --concurrency 4 --max-tasks-per-child 10 --max-memory-per-child 1500000
+CELERY_TASK_ROUTES = {
+    "nrc_data.tasks.fetch_report": {"queue": "io"},
+    "nrc_data.tasks.upload_forecast_plot": {"queue": "io"},
+    "nrc_data.tasks.fit_reactor_forecast": {"queue": "cpu"},
+}
+# Fits take minutes; don't let one worker prefetch a queue's worth of them
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Recycle pool children so memory Prophet/Stan leave behind can't pile up over
+# the nightly loop (the flags above override these per worker)
+CELERY_WORKER_MAX_TASKS_PER_CHILD = int(os.getenv("CELERY_WORKER_MAX_TASKS_PER_CHILD") or 0) or None
+CELERY_WORKER_MAX_MEMORY_PER_CHILD = int(os.getenv("CELERY_WORKER_MAX_MEMORY_PER_CHILD") or 0) or None  # KB
+
+# Limits on a single forecast fit (nrc_data/fit_sandbox.py); 0 disables.
+# A fit over either one is skipped for the night instead of failing the run.
+NRC_FIT_MEMORY_MB = int(os.getenv("NRC_FIT_MEMORY_MB", 2048))
+NRC_FIT_TIME_LIMIT = int(os.getenv("NRC_FIT_TIME_LIMIT", 600))
+
+# Task locks and idempotency keys (nrc_data/locks.py), kept apart from the
+# broker and cache databases. A lock expires after NRC_TASK_LOCK_TIMEOUT even
+# if its worker died, so it must outlast the slowest stage; "done" keys are
+# kept for NRC_IDEMPOTENCY_TTL.
+NRC_LOCK_REDIS_URL = os.getenv("NRC_LOCK_REDIS_URL", "redis://localhost:6379/2")
+NRC_TASK_LOCK_TIMEOUT = 60 * 30
+NRC_IDEMPOTENCY_TTL = 60 * 60 * 24 * 7
+
+# Port of the Prometheus exporter each Celery worker starts (nrc_data/metrics.py);
+# empty to disable. Under the prefork pool it needs PROMETHEUS_MULTIPROC_DIR to
+# see the tasks' metrics. The API serves its metrics at /metrics.
+NRC_WORKER_METRICS_PORT = int(os.getenv("NRC_WORKER_METRICS_PORT") or 0) or None
+# Who may scrape the API's /metrics: requests with "Authorization: Bearer
+# <NRC_METRICS_TOKEN>", or from one of NRC_METRICS_ALLOWED_IPS (comma
+# separated). Behind a reverse proxy every request comes from the proxy's
+# address, so only list addresses that reach the app directly. With neither
+# set, /metrics answers 404.
+NRC_METRICS_TOKEN = os.getenv("NRC_METRICS_TOKEN", "")
+NRC_METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("NRC_METRICS_ALLOWED_IPS", "").split(",") if ip.strip()]
+
+# API response cache, in the same Redis instance as Celery (separate db)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_CACHE_URL", "redis://localhost:6379/1"),
+        "KEY_PREFIX": "nucleartimeseries",
+    }
+}
+
+# Cache lifetimes (seconds) for the date-keyed reactor endpoints. Dates older
+# than NRC_CACHE_RECENT_DAYS are historical and get the long TTL.
+NRC_CACHE_HISTORICAL_TTL = 60 * 60 * 24 * 30
+NRC_CACHE_RECENT_TTL = 60 * 5
+NRC_CACHE_RECENT_DAYS = 2
+
+# Serve the async read views (nrc_data/async_views.py) at the regular /api/
+# paths. Enable when deploying with an ASGI server, e.g.
+#   NRC_ASYNC_API=1 uvicorn nucleartimeseries_api.asgi:application --workers 2
+NRC_ASYNC_API = os.getenv("NRC_ASYNC_API", "") == "1"
+
+# Forecast retention: runs trained in the last NRC_FORECAST_FULL_DAYS keep every
+# horizon; older ones are compacted to NRC_FORECAST_KEEP_HORIZONS (days ahead),
+# enough to track accuracy (see nrc_data/forecast_runs.py)
+NRC_FORECAST_FULL_DAYS = 30
+NRC_FORECAST_KEEP_HORIZONS = [1, 7, 30]
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "nrc_data.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
 # CORS settings for frontend
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",  # Vite dev server